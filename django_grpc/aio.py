@@ -0,0 +1,59 @@
+"""
+Event loop helpers for server in async mode
+"""
+import asyncio
+import logging
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+logger = logging.getLogger(__name__)
+
+
+def new_event_loop(name: str = 'asyncio') -> 'asyncio.AbstractEventLoop':
+    """
+    Creates event loop configured in GRPCSERVER['event_loop']
+    """
+    if name == 'asyncio':
+        return asyncio.new_event_loop()
+    if name == 'uvloop':
+        try:
+            import uvloop
+        except ImportError:
+            raise ImproperlyConfigured(
+                "Failed to create uvloop event loop. "
+                "Install `uvloop` package or remove \"event_loop\" from settings."
+            )
+        return uvloop.new_event_loop()
+    raise ImproperlyConfigured("Unknown event loop '%s', use 'asyncio' or 'uvloop'" % name)
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up a sleeping task.
+    Large lag means that something blocks the loop, e.g. synchronous ORM calls in async handlers.
+    """
+
+    def __init__(self, interval: float = 1.0, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def record(self, lag: float):
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag > self.threshold:
+            logger.warning("Event loop lag is %.3fs, something blocks the loop", lag)
+        else:
+            logger.debug("Event loop lag is %.3fs", lag)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - started - self.interval)
+
+
+loop_lag_monitor = LoopLagMonitor()
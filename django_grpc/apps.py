@@ -5,3 +5,7 @@ from django.apps import AppConfig
 class DjangoGrpcConfig(AppConfig):
     name = 'django_grpc'
     verbose_name = 'Django gRPC server'
+
+    def ready(self):
+        # Connect signal receivers that close outbound channels on shutdown
+        from django_grpc import channels  # noqa: F401
@@ -0,0 +1,117 @@
+"""
+Background processing of items produced by RPC handlers, shared by access log, capture and tracing.
+"""
+import logging
+import os
+import threading
+from collections import deque
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundBatcher:
+    """
+    Bounded buffer of items that a background thread processes in batches of `batch_size`,
+    at least every `flush_interval` seconds. Items are dropped and counted when the buffer is full,
+    so producers never block.
+
+    `deque.append()` and `deque.popleft()` are atomic, so producers and the thread don't take locks.
+    Subclasses implement `process()`.
+    """
+    name = 'grpc-batcher'
+
+    def __init__(self, buffer_size: int = 10000, batch_size: int = 1000, flush_interval: float = 1.0):
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = deque()
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._start_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._stopped = threading.Event()
+        # Flushes are numbered, `force_flush()` waits for an iteration that started after its request
+        self._flush_condition = threading.Condition()
+        self._requested_flushes = 0
+        self._completed_flushes = 0
+        self._thread = None
+        self._pid = None
+
+    def _ensure_thread(self):
+        # Thread doesn't survive fork, so it is started in each process on demand
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid != os.getpid():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                self._pid = os.getpid()
+
+    def append(self, item):
+        self._ensure_thread()
+        if len(self.buffer) >= self.buffer_size:
+            self.dropped += 1
+            return
+        self.buffer.append(item)
+        if len(self.buffer) >= self.batch_size:
+            self._flush_requested.set()
+
+    def process(self, batch: list):
+        raise NotImplementedError
+
+    def _process_batch(self) -> bool:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.buffer.popleft())
+            except IndexError:
+                break
+        if batch:
+            try:
+                self.process(batch)
+            except Exception:
+                logger.exception("%s failed to process %s items", self.name, len(batch))
+        return len(batch) == self.batch_size
+
+    def _report_dropped(self):
+        dropped = self.dropped
+        if dropped != self._reported_dropped:
+            logger.warning(
+                "Buffer of %s is full, %s items were dropped", self.name, dropped - self._reported_dropped,
+            )
+            self._reported_dropped = dropped
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._flush_requested.wait(self.flush_interval)
+            self._flush_requested.clear()
+            # Items appended before this number was requested are in the buffer already
+            with self._flush_condition:
+                flush = self._requested_flushes
+            while self._process_batch():
+                pass
+            self._report_dropped()
+            with self._flush_condition:
+                self._completed_flushes = flush
+                self._flush_condition.notify_all()
+
+    def force_flush(self, timeout: float = 5.0):
+        """
+        Processes items appended so far, waits up to `timeout` seconds for the background thread
+        """
+        if self._thread is None or self._pid != os.getpid():
+            while self._process_batch():
+                pass
+            return
+        with self._flush_condition:
+            self._requested_flushes += 1
+            flush = self._requested_flushes
+        self._flush_requested.set()
+        with self._flush_condition:
+            self._flush_condition.wait_for(lambda: self._completed_flushes >= flush, timeout)
+
+    def shutdown(self, **kwargs):
+        self.force_flush()
+        self._stopped.set()
+        self._flush_requested.set()
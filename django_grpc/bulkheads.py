@@ -0,0 +1,213 @@
+"""
+Per-method bulkheads that keep slow methods from taking every worker of the server, enabled with::
+
+    GRPCSERVER = {
+        ...
+        'bulkheads': {
+            # name: methods matched with fnmatch, first matching bulkhead is used
+            'reports': {'methods': ['/reports.Reports/*'], 'max_workers': 4, 'max_queue': 8, 'timeout': 5},
+            'lookups': {'methods': ['/users.Users/Get*'], 'max_workers': 16},
+        },
+    }
+
+Methods that don't match any pattern share the rest of the server's workers without limits.
+
+Queued synchronous calls block the worker of the server they were dispatched to until a slot is free, so
+`max_queue` calls of every bulkhead take workers from other methods. Keep queues short, `max_queue` 0 rejects
+calls right away. Coroutines of async server wait on the event loop and don't hold a worker.
+"""
+import asyncio
+import fnmatch
+import inspect
+import threading
+from functools import wraps
+
+import grpc
+from django.core.exceptions import ImproperlyConfigured
+
+
+class Bulkhead:
+    """
+    Allows `max_workers` calls to run at once and `max_queue` calls to wait for a free slot up to `timeout` seconds,
+    other calls are rejected right away. Sync and async calls of the bulkhead share its slots.
+    """
+
+    def __init__(self, name: str, methods=(), max_workers: int = 1, max_queue: int = 0, timeout: float = None):
+        if max_workers < 1:
+            raise ImproperlyConfigured("Bulkhead '%s' must have at least one worker" % name)
+        self.name = name
+        self.methods = list(methods)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+        self._condition = threading.Condition()
+        # (loop, future) of coroutines waiting for a slot
+        self._waiters = []
+
+    def matches(self, method: str) -> bool:
+        return any(fnmatch.fnmatchcase(method, pattern) for pattern in self.methods)
+
+    def acquire(self) -> bool:
+        with self._condition:
+            if self.active >= self.max_workers:
+                if self.queued >= self.max_queue:
+                    self.rejected += 1
+                    return False
+                self.queued += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: self.active < self.max_workers, self.timeout)
+                finally:
+                    self.queued -= 1
+                if not admitted:
+                    self.rejected += 1
+                    return False
+            self.active += 1
+            return True
+
+    async def acquire_async(self) -> bool:
+        """
+        Same as `acquire()`, but waits without blocking the event loop
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+        with self._condition:
+            if self.active < self.max_workers:
+                self.active += 1
+                return True
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                return False
+            self.queued += 1
+
+        try:
+            while True:
+                waiter = (loop, loop.create_future())
+                with self._condition:
+                    if self.active < self.max_workers:
+                        self.active += 1
+                        return True
+                    self._waiters.append(waiter)
+                try:
+                    await asyncio.wait_for(waiter[1], None if deadline is None else deadline - loop.time())
+                except asyncio.TimeoutError:
+                    with self._condition:
+                        self.rejected += 1
+                    return False
+                finally:
+                    with self._condition:
+                        if waiter in self._waiters:
+                            self._waiters.remove(waiter)
+        finally:
+            with self._condition:
+                self.queued -= 1
+
+    def release(self):
+        with self._condition:
+            self.active -= 1
+            self.completed += 1
+            self._condition.notify()
+            # Waiting coroutines check the slot again, ones that don't get it wait further
+            for loop, future in self._waiters:
+                loop.call_soon_threadsafe(_wake, future)
+            self._waiters.clear()
+
+    def state(self) -> dict:
+        return {
+            'max_workers': self.max_workers,
+            'active': self.active,
+            'max_queue': self.max_queue,
+            'queued': self.queued,
+            'rejected': self.rejected,
+            'completed': self.completed,
+        }
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def load_bulkheads(config: dict) -> list:
+    return [Bulkhead(name, **options) for name, options in config.items()]
+
+
+def find_bulkhead(bulkheads: list, method: str):
+    for bulkhead in bulkheads:
+        if bulkhead.matches(method):
+            return bulkhead
+    return None
+
+
+def _reject(context, bulkhead: 'Bulkhead'):
+    context.abort(
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        "Bulkhead '%s' is full. Try again later." % bulkhead.name,
+    )
+
+
+async def _reject_async(context, bulkhead: 'Bulkhead'):
+    await context.abort(
+        grpc.StatusCode.RESOURCE_EXHAUSTED,
+        "Bulkhead '%s' is full. Try again later." % bulkhead.name,
+    )
+
+
+def bulkhead_wrapper(func, bulkhead: 'Bulkhead', stream: bool = False):
+    """
+    Limits concurrency of handler, both sync handlers and coroutines of async server
+    """
+    if func is None:
+        return func
+
+    if inspect.isasyncgenfunction(func):
+        @wraps(func)
+        async def async_stream_inner(request, context):
+            if not await bulkhead.acquire_async():
+                await _reject_async(context, bulkhead)
+            try:
+                async for response in func(request, context):
+                    yield response
+            finally:
+                bulkhead.release()
+
+        return async_stream_inner
+
+    # Also covers streaming handlers that write responses with `context.write()`
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_unary_inner(request, context):
+            if not await bulkhead.acquire_async():
+                await _reject_async(context, bulkhead)
+            try:
+                return await func(request, context)
+            finally:
+                bulkhead.release()
+
+        return async_unary_inner
+
+    if stream:
+        @wraps(func)
+        def stream_inner(request, context):
+            if not bulkhead.acquire():
+                _reject(context, bulkhead)
+            try:
+                yield from func(request, context)
+            finally:
+                bulkhead.release()
+
+        return stream_inner
+
+    @wraps(func)
+    def unary_inner(request, context):
+        if not bulkhead.acquire():
+            _reject(context, bulkhead)
+        try:
+            return func(request, context)
+        finally:
+            bulkhead.release()
+
+    return unary_inner
@@ -0,0 +1,264 @@
+"""
+Process-wide registry of outbound gRPC channels.
+
+Channels are configured in ``GRPCCHANNELS`` setting the same way databases are
+configured in ``DATABASES``::
+
+    GRPCCHANNELS = {
+        'default': {
+            'target': 'users.internal:50051',
+            'subchannels': 2,           # optional, number of connections to round-robin over
+            'options': [],              # optional, extra channel arguments
+            'credentials': {            # optional, TLS is used when present
+                'root_certificates': 'ca.pem',
+                'private_key': 'client_key.pem',
+                'certificate_chain': 'client_chain.pem',
+            },
+        },
+    }
+
+Channels are created lazily on first access and are shared by all threads of the process.
+Aio channels are bound to an event loop, so every running loop gets its own channels.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import threading
+
+import grpc
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+
+from django_grpc.signals import grpc_shutdown
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL_ALIAS = 'default'
+
+# Keep idle HTTP/2 connections alive and spread calls across all resolved addresses
+DEFAULT_OPTIONS = (
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.lb_policy_name', 'round_robin'),
+)
+
+
+def _read_file(path):
+    if path is None:
+        return None
+    with open(path, 'rb') as fp:
+        return fp.read()
+
+
+class _ChannelPool:
+    """
+    Fixed set of channels to the same target that are handed out in round-robin order.
+    """
+
+    def __init__(self, channels, loop=None):
+        self.channels = channels
+        # Event loop aio channels were created in
+        self.loop = loop
+        self._cycle = itertools.cycle(channels)
+
+    def next(self):
+        return next(self._cycle)
+
+
+class ChannelHandler:
+    """
+    Lazily creates and caches channels declared in ``GRPCCHANNELS`` setting.
+    """
+    insecure_channel = staticmethod(grpc.insecure_channel)
+    secure_channel = staticmethod(grpc.secure_channel)
+
+    def __init__(self, config=None):
+        self._config = config
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> dict:
+        if self._config is not None:
+            return self._config
+        return getattr(settings, 'GRPCCHANNELS', dict())
+
+    def __getitem__(self, alias: str):
+        key = self._pool_key(alias)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    pool = self._pools[key] = self._create_pool(alias)
+        return pool.next()
+
+    def _pool_key(self, alias: str):
+        return alias
+
+    def __contains__(self, alias: str) -> bool:
+        return alias in self.config
+
+    def _create_pool(self, alias: str) -> '_ChannelPool':
+        try:
+            params = self.config[alias]
+        except KeyError:
+            raise ImproperlyConfigured("The gRPC channel '%s' is not defined in GRPCCHANNELS setting." % alias)
+
+        target = params.get('target')
+        if not target:
+            raise ImproperlyConfigured("The gRPC channel '%s' must define a 'target'." % alias)
+
+        subchannels = params.get('subchannels', 1)
+        if subchannels < 1:
+            raise ImproperlyConfigured("The gRPC channel '%s' must have at least one subchannel." % alias)
+
+        options = dict(DEFAULT_OPTIONS)
+        options.update(params.get('options', []))
+        if subchannels > 1:
+            # Channels with identical arguments share connections via the global subchannel pool,
+            # a local pool gives every channel its own HTTP/2 connection.
+            options['grpc.use_local_subchannel_pool'] = 1
+        options = list(options.items())
+
+        credentials = params.get('credentials', None)
+        logger.debug("Creating %s channel(s) to %s for alias '%s'", subchannels, target, alias)
+        return _ChannelPool([
+            self._create_channel(target, options, credentials)
+            for _ in range(subchannels)
+        ])
+
+    def _create_channel(self, target: str, options: list, credentials: dict = None):
+        if credentials is None:
+            return self.insecure_channel(target, options=options)
+
+        channel_credentials = grpc.ssl_channel_credentials(
+            root_certificates=_read_file(credentials.get('root_certificates')),
+            private_key=_read_file(credentials.get('private_key')),
+            certificate_chain=_read_file(credentials.get('certificate_chain')),
+        )
+        return self.secure_channel(target, channel_credentials, options=options)
+
+    def _pop_pools(self) -> list:
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        return list(pools.values())
+
+    def _pop_all(self) -> list:
+        return [channel for pool in self._pop_pools() for channel in pool.channels]
+
+    def close_all(self):
+        """
+        Close all channels created so far. Next access creates new ones.
+        """
+        for channel in self._pop_all():
+            channel.close()
+
+    def reset(self):
+        """
+        Forget all channels without closing them.
+        Used in forked processes where inherited channels belong to the parent: closing them in the child would
+        send GOAWAY on connections the parent still uses, and event loop of aio channels isn't running in the child.
+        """
+        self._pools = {}
+        self._lock = threading.Lock()
+
+
+class AsyncChannelHandler(ChannelHandler):
+    """
+    Same as :class:`ChannelHandler` but creates ``grpc.aio`` channels.
+    Channels are bound to the event loop they were created in, so they are cached per running loop,
+    e.g. every `asyncio.run()` or `async_to_sync()` call of a sync thread gets new ones.
+    """
+    insecure_channel = staticmethod(grpc.aio.insecure_channel)
+    secure_channel = staticmethod(grpc.aio.secure_channel)
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        # Strong references to tasks of `discard_all()`, the loop only keeps weak ones
+        self._closing = set()
+
+    def _pool_key(self, alias: str):
+        return alias, _get_running_loop()
+
+    def _create_pool(self, alias: str) -> '_ChannelPool':
+        # Channels of finished loops are unusable, grpc closes them when they are garbage collected
+        for key, pool in list(self._pools.items()):
+            if pool.loop is not None and pool.loop.is_closed():
+                del self._pools[key]
+        pool = super()._create_pool(alias)
+        pool.loop = _get_running_loop()
+        return pool
+
+    async def close_all(self, grace=None):
+        """
+        Close channels of the running loop and forget channels of other loops, they can't be awaited here
+        """
+        loop = asyncio.get_running_loop()
+        for pool in self._pop_pools():
+            if pool.loop is loop:
+                for channel in pool.channels:
+                    await channel.close(grace)
+        # Channels discarded from sync code, e.g. by `grpc_shutdown` receiver
+        pending = [task for task in self._closing if task.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending)
+
+    def discard_all(self):
+        """
+        Forget all channels from sync code. Channels of the running loop are closed in background, channels of
+        other loops can't be awaited here and are closed when garbage collected, loops of them are usually gone.
+        """
+        loop = _get_running_loop()
+        for pool in self._pop_pools():
+            if loop is None or pool.loop is not loop:
+                continue
+            for channel in pool.channels:
+                task = loop.create_task(channel.close())
+                self._closing.add(task)
+                task.add_done_callback(self._closing.discard)
+
+
+def _get_running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+channels = ChannelHandler()
+aio_channels = AsyncChannelHandler()
+
+
+def get_channel(alias: str = DEFAULT_CHANNEL_ALIAS):
+    """
+    Shortcut to get a channel from the registry
+    """
+    return channels[alias]
+
+
+def _close_channels(**kwargs):
+    channels.close_all()
+    aio_channels.discard_all()
+
+
+def _reset_channels(**kwargs):
+    if kwargs['setting'] == 'GRPCCHANNELS':
+        channels.close_all()
+        aio_channels.discard_all()
+
+
+def _after_fork():
+    channels.reset()
+    aio_channels.reset()
+
+
+grpc_shutdown.connect(_close_channels)
+setting_changed.connect(_reset_channels)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
@@ -0,0 +1,84 @@
+"""
+Server TLS credentials that follow certificate rotation without restarting the server.
+
+gRPC asks the fetcher for certificates before TLS handshakes. Files listed in ``GRPCSERVER['credentials']``
+are re-read only when their modification time changes, so new handshakes pick up rotated certificates
+while established connections keep running.
+"""
+import logging
+import os
+import threading
+import time
+
+import grpc
+
+
+logger = logging.getLogger(__name__)
+
+
+class CertificateReloader:
+    """
+    Certificate configuration fetcher for `grpc.dynamic_ssl_server_credentials`
+
+    :param credentials: list of dicts with `private_key` and `certificate_chain` paths
+    :param check_interval: seconds between mtime checks, handshakes in between reuse the last result
+    """
+
+    def __init__(self, credentials: list, check_interval: float = 5):
+        self.paths = [
+            (credential.get('private_key'), credential.get('certificate_chain'))
+            for credential in credentials
+        ]
+        self.check_interval = check_interval
+        self._mtimes = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def _stat(self) -> list:
+        return [(os.stat(key).st_mtime_ns, os.stat(chain).st_mtime_ns) for key, chain in self.paths]
+
+    def load(self):
+        """
+        Reads certificate files and returns configuration accepted by gRPC
+        """
+        mtimes = self._stat()
+        pairs = []
+        for key, chain in self.paths:
+            with open(key, 'rb') as pp:
+                private_key = pp.read()
+            with open(chain, 'rb') as cp:
+                certificate_chain = cp.read()
+            pairs.append((private_key, certificate_chain))
+        self._mtimes = mtimes
+        self._checked_at = time.monotonic()
+        return grpc.ssl_server_certificate_configuration(pairs)
+
+    def fetch(self):
+        """
+        Returns new configuration if files were changed, None to keep using the current one
+        """
+        if time.monotonic() - self._checked_at < self.check_interval or not self._lock.acquire(blocking=False):
+            return None
+        try:
+            self._checked_at = time.monotonic()
+            if self._stat() == self._mtimes:
+                return None
+            configuration = self.load()
+            logger.info("Server certificates were reloaded")
+            return configuration
+        except OSError as e:
+            # Files may be missing while they are rotated, next check will retry
+            logger.warning("Failed to reload server certificates: %s", e)
+            return None
+        finally:
+            self._lock.release()
+
+    __call__ = fetch
+
+
+def create_server_credentials(credentials: list, check_interval: float = 5):
+    """
+    Creates TLS credentials that reload certificate files after rotation
+    """
+    reloader = CertificateReloader(credentials, check_interval)
+    return grpc.dynamic_ssl_server_credentials(reloader.load(), reloader)
@@ -1,5 +1,17 @@
-from .ratelimit import ratelimit
+from .concurrencylimit import concurrencylimit
+from .files import ChunkedFile, save_upload, stream_file
+from .idempotency import idempotent
+from .memoize import get_rpc_cache, rpc_memoize
+from .ratelimit import ratelimit, ratelimit_policies
 
 __all__ = [
+    "ChunkedFile",
+    "concurrencylimit",
+    "get_rpc_cache",
+    "idempotent",
     "ratelimit",
+    "ratelimit_policies",
+    "rpc_memoize",
+    "save_upload",
+    "stream_file",
 ]
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import inspect
+import threading
+import time
+import uuid
+from functools import wraps
+from typing import Callable, List, Optional, Union
+
+import grpc
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.helpers.ratelimit import KeysExtractor
+
+
+class LocalBackend:
+    """
+    Counts in-flight calls of the current process.
+    """
+    poll_interval = 0.05
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> [in-flight calls, waiting calls, condition]
+        self._slots = {}
+
+    def acquire(self, key: str, max_calls: int, timeout: float) -> Optional[str]:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = [0, 0, threading.Condition(self._lock)]
+
+            if slot[0] >= max_calls and timeout > 0:
+                deadline = time.monotonic() + timeout
+                slot[1] += 1
+                try:
+                    while slot[0] >= max_calls:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not slot[2].wait(remaining):
+                            break
+                finally:
+                    slot[1] -= 1
+
+            if slot[0] >= max_calls:
+                self._cleanup(key, slot)
+                return None
+            slot[0] += 1
+            return key
+
+    async def aacquire(self, key: str, max_calls: int, timeout: float) -> Optional[str]:
+        # Waiting on the condition would block the event loop, coroutines poll for a free slot instead
+        deadline = time.monotonic() + timeout
+        while True:
+            token = self.acquire(key, max_calls, 0)
+            if token is not None or time.monotonic() + self.poll_interval > deadline:
+                return token
+            await asyncio.sleep(self.poll_interval)
+
+    def release(self, key: str, token: str):
+        with self._lock:
+            slot = self._slots[key]
+            slot[0] -= 1
+            slot[2].notify()
+            self._cleanup(key, slot)
+
+    async def arelease(self, key: str, token: str):
+        self.release(key, token)
+
+    def _cleanup(self, key, slot):
+        # Don't keep counters of idle keys
+        if slot[0] == 0 and slot[1] == 0:
+            del self._slots[key]
+
+
+class CacheBackend:
+    """
+    Shares limit between processes with leases stored in Django's cache.
+    Every lease expires after `lease_ttl` seconds, so slots of crashed processes are recovered.
+
+    Django's cache can't delete a key only if it has the expected value, so a call that outlives its lease
+    can delete the lease another call took after the expiration between the check and the delete.
+    That slot is free again, and the limit is exceeded by one call, until the other call finishes.
+    """
+    poll_interval = 0.05
+
+    def __init__(self, lease_ttl: int = 60):
+        self.lease_ttl = lease_ttl
+
+    @property
+    def cache(self):
+        cache_name = getattr(settings, 'CONCURRENCYLIMIT_USE_CACHE', 'default')
+        return caches[cache_name]
+
+    def acquire(self, key: str, max_calls: int, timeout: float) -> Optional[str]:
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        while True:
+            for i in range(max_calls):
+                slot_key = "%s:%s" % (key, i)
+                # `add()` is atomic, only one caller gets the slot
+                if self.cache.add(slot_key, owner, self.lease_ttl):
+                    return "%s|%s" % (slot_key, owner)
+            if time.monotonic() + self.poll_interval > deadline:
+                return None
+            time.sleep(self.poll_interval)
+
+    async def aacquire(self, key: str, max_calls: int, timeout: float) -> Optional[str]:
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + timeout
+        while True:
+            for i in range(max_calls):
+                slot_key = "%s:%s" % (key, i)
+                if await self.cache.aadd(slot_key, owner, self.lease_ttl):
+                    return "%s|%s" % (slot_key, owner)
+            if time.monotonic() + self.poll_interval > deadline:
+                return None
+            await asyncio.sleep(self.poll_interval)
+
+    def release(self, key: str, token: str):
+        slot_key, owner = token.rsplit("|", 1)
+        # Lease could expire and be taken by another call, check and delete are not atomic (see above)
+        if self.cache.get(slot_key) == owner:
+            self.cache.delete(slot_key)
+
+    async def arelease(self, key: str, token: str):
+        slot_key, owner = token.rsplit("|", 1)
+        if await self.cache.aget(slot_key) == owner:
+            await self.cache.adelete(slot_key)
+
+
+_local_backend = LocalBackend()
+
+
+def get_backend(backend: str, lease_ttl: int):
+    if backend == 'local':
+        return _local_backend
+    if backend == 'cache':
+        return CacheBackend(lease_ttl)
+    raise ImproperlyConfigured("Unknown concurrency limit backend '%s', use 'local' or 'cache'" % backend)
+
+
+def concurrencylimit(
+    max_calls: int,
+    group: Optional[str] = None,
+    keys: List[Union[str, Callable]] = None,
+    backend: str = 'local',
+    timeout: float = 0,
+    lease_ttl: int = 60,
+):
+    """
+    :param max_calls: Max number of calls executed at the same time.
+    :param group: Name of a group of limits to count together.
+        Basically to share the same limit across one or more RPCs.
+    :param keys: Client/s identifier, same syntax as in `ratelimit`.
+    :param backend: "local" counts calls of the current process,
+        "cache" shares limit between processes using Django's cache.
+    :param timeout: Seconds to wait for a free slot before rejecting the call.
+    :param lease_ttl: Seconds after which slot of "cache" backend is released automatically.
+        Must be longer than the slowest call: release of an expired lease isn't atomic and
+        can free the slot another call took meanwhile.
+    """
+    if max_calls <= 0:
+        raise ImproperlyConfigured('max_calls must be greater than 0')
+    limiter = get_backend(backend, lease_ttl)
+    extract_keys = KeysExtractor(keys or [])
+
+    def decorator(fn):
+        # By default group will be RPCs class' and methods name
+        prefix = "concurrencylimit:%s:" % (group or fn.__qualname__)
+
+        def make_key(request, context) -> str:
+            values = ".".join(extract_keys(request, context))
+            return prefix + hashlib.md5(values.encode('utf-8')).hexdigest()
+
+        message = f"Reached limit of {max_calls} concurrent calls. Try again later."
+
+        def acquire(request, context) -> tuple:
+            key = make_key(request, context)
+            token = limiter.acquire(key, max_calls, timeout)
+            if token is None:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, message)
+            return key, token
+
+        async def aacquire(request, context) -> tuple:
+            key = make_key(request, context)
+            token = await limiter.aacquire(key, max_calls, timeout)
+            if token is None:
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, message)
+            return key, token
+
+        if inspect.isasyncgenfunction(fn):
+            @wraps(fn)
+            async def _wrapped(self, request, context):
+                key, token = await aacquire(request, context)
+                try:
+                    async for response in fn(self, request, context):
+                        yield response
+                finally:
+                    await limiter.arelease(key, token)
+        elif inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def _wrapped(self, request, context):
+                key, token = await aacquire(request, context)
+                try:
+                    return await fn(self, request, context)
+                finally:
+                    await limiter.arelease(key, token)
+        elif inspect.isgeneratorfunction(fn):
+            @wraps(fn)
+            def _wrapped(self, request, context):
+                key, token = acquire(request, context)
+                try:
+                    yield from fn(self, request, context)
+                finally:
+                    limiter.release(key, token)
+        else:
+            @wraps(fn)
+            def _wrapped(self, request, context):
+                key, token = acquire(request, context)
+                try:
+                    return fn(self, request, context)
+                finally:
+                    limiter.release(key, token)
+
+        return _wrapped
+
+    return decorator
@@ -0,0 +1,220 @@
+"""
+Streaming of files in chunk messages, e.g.::
+
+    message FileChunk {
+      bytes data = 1;
+      int64 offset = 2;
+    }
+
+Files are never loaded into memory as a whole in either direction.
+"""
+import copy
+import io
+import mmap
+from typing import Iterable, Iterator, Union
+
+from django.core.files.base import File
+from django.core.files.storage import Storage, default_storage
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _chunk(chunk_class, data_field: str, offset_field: str, data: bytes, offset: int):
+    if offset_field is None:
+        return chunk_class(**{data_field: data})
+    return chunk_class(**{data_field: data, offset_field: offset})
+
+
+def _is_active(context) -> bool:
+    # Client went away, there is no reason to read the rest of the file
+    return context is None or context.is_active()
+
+
+def _stream_buffer(buffer, chunk_class, context, offset, chunk_size, data_field, offset_field):
+    # Slicing memoryview and mmap doesn't copy the whole value, only the chunk becomes bytes
+    for position in range(offset, len(buffer), chunk_size):
+        if not _is_active(context):
+            return
+        yield _chunk(chunk_class, data_field, offset_field, bytes(buffer[position:position + chunk_size]), position)
+
+
+def _open_mmap(fp):
+    try:
+        buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        # Remote storages have no file descriptor, empty files can't be mapped
+        return None
+    if hasattr(buffer, 'madvise'):
+        buffer.madvise(mmap.MADV_SEQUENTIAL)
+    return buffer
+
+
+def stream_file(
+    source: Union[str, File, bytes, memoryview],
+    chunk_class,
+    context=None,
+    offset: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    storage: Storage = None,
+    data_field: str = 'data',
+    offset_field: str = 'offset',
+) -> Iterator:
+    """
+    Yields chunk messages with content of the file, use it as a response of server-streaming RPC.
+    Local files are memory-mapped, files of remote storages are read by `chunk_size`.
+
+    :param source: `FileField` value or any Django `File`, name of the file in `storage`
+        or value of `BinaryField`
+    :param offset: position to resume download from, e.g. taken from the request
+    :param context: stream stops when the RPC is no longer active
+    :param offset_field: field of chunk message for position of the chunk, None if there is no such field
+
+    Usage::
+
+        def Download(self, request, context):
+            document = Document.objects.get(pk=request.id)
+            return stream_file(document.file, FileChunk, context, offset=request.offset)
+    """
+    if offset < 0:
+        raise ValueError("Offset can't be negative")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield from _stream_buffer(
+            memoryview(source), chunk_class, context, offset, chunk_size, data_field, offset_field,
+        )
+        return
+
+    if isinstance(source, str):
+        fp = close = (storage or default_storage).open(source, 'rb')
+    else:
+        close = source if source.closed else None
+        source.open('rb')
+        fp = source
+
+    buffer = None
+    try:
+        buffer = _open_mmap(fp)
+        if buffer is not None:
+            yield from _stream_buffer(buffer, chunk_class, context, offset, chunk_size, data_field, offset_field)
+            return
+
+        fp.seek(offset)
+        position = offset
+        while _is_active(context):
+            data = fp.read(chunk_size)
+            if not data:
+                return
+            yield _chunk(chunk_class, data_field, offset_field, data, position)
+            position += len(data)
+    finally:
+        if buffer is not None:
+            buffer.close()
+        if close is not None:
+            close.close()
+
+
+class ChunkedFile(File):
+    """
+    File that takes content from an iterator of bytes, so storage writes it as chunks arrive.
+    Can be saved with `storage.save(name, file)` or `instance.file_field.save(name, file)`.
+    """
+
+    def __init__(self, chunks: Iterable[bytes], name: str = None):
+        super().__init__(None, name)
+        self._chunks = iter(chunks)
+        self._buffer = b''
+        # Known after the content is consumed
+        self.size = 0
+
+    def chunks(self, chunk_size=None):
+        if self._buffer:
+            data, self._buffer = self._buffer, b''
+            yield data
+        for data in self._chunks:
+            self.size += len(data)
+            yield data
+
+    def read(self, size=-1):
+        """
+        For storages that read content instead of iterating chunks
+        """
+        while size is None or size < 0 or len(self._buffer) < size:
+            data = next(self._chunks, None)
+            if data is None:
+                break
+            self.size += len(data)
+            self._buffer += data
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # Storages rewind files before reading, content can only be read once
+        if offset != 0 or whence != io.SEEK_SET or self.size:
+            raise io.UnsupportedOperation("ChunkedFile can't be rewound")
+
+    def tell(self):
+        return self.size - len(self._buffer)
+
+    def close(self):
+        pass
+
+    @property
+    def closed(self):
+        return False
+
+    def open(self, mode=None):
+        return self
+
+
+def save_upload(
+    request_iterator: Iterable,
+    name: str,
+    storage: Storage = None,
+    data_field: str = 'data',
+    max_size: int = None,
+) -> str:
+    """
+    Writes content of chunk messages of client-streaming RPC to storage and returns name of saved file.
+    File is removed if the stream breaks or exceeds `max_size` bytes (ValueError is raised then).
+
+    Usage::
+
+        def Upload(self, request_iterator, context):
+            name = save_upload(request_iterator, 'uploads/report.pdf', max_size=100 * 1024 * 1024)
+            return UploadReply(name=name)
+    """
+    # Storage picks the final name itself and picks another one if a concurrent upload takes it first,
+    # so names it chooses are recorded on a private copy of the storage
+    storage = copy.copy(storage or default_storage)
+    names = []
+    get_available_name = storage.get_available_name
+
+    def record_name(name, max_length=None):
+        names.append(get_available_name(name, max_length=max_length))
+        return names[-1]
+
+    storage.get_available_name = record_name
+    written = []
+
+    def chunks():
+        # Content is consumed once the file is created, under the last name chosen
+        if names:
+            written.append(names[-1])
+        received = 0
+        for message in request_iterator:
+            data = getattr(message, data_field)
+            received += len(data)
+            if max_size is not None and received > max_size:
+                raise ValueError("File is larger than %s bytes" % max_size)
+            yield data
+
+    try:
+        return storage.save(name, ChunkedFile(chunks(), name))
+    except BaseException:
+        # Don't leave partially written file, files of others are never touched
+        for name in written:
+            if storage.exists(name):
+                storage.delete(name)
+        raise
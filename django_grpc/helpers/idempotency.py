@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import inspect
+import time
+import uuid
+from functools import wraps
+from typing import Callable, Optional, Union
+
+import grpc
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from google.protobuf import descriptor_pool, message_factory
+
+from django_grpc.helpers.ratelimit import KeysExtractor
+from django_grpc.interceptors.auth import get_principal
+
+
+REPLAYED_METADATA_KEY = 'idempotency-replayed'
+POLL_INTERVAL = 0.05
+IN_PROGRESS_MESSAGE = "Call with the same idempotency key is in progress. Try again later."
+
+
+def get_cache():
+    cache_name = getattr(settings, 'IDEMPOTENCY_USE_CACHE', 'default')
+    return caches[cache_name]
+
+
+_message_classes = {}
+
+
+def get_message_class(full_name: str):
+    message_class = _message_classes.get(full_name)
+    if message_class is None:
+        descriptor = descriptor_pool.Default().FindMessageTypeByName(full_name)
+        message_class = _message_classes[full_name] = message_factory.GetMessageClass(descriptor)
+    return message_class
+
+
+def default_scope(request, context) -> str:
+    """
+    Authenticated user of the call, address of the client for anonymous calls
+    """
+    principal = get_principal()
+    if principal is not None:
+        return 'user:%s' % principal.user_id
+    # Port differs between connections of the same client
+    return 'peer:%s' % context.peer().rsplit(':', 1)[0]
+
+
+def idempotent(
+    key: Union[str, Callable] = 'metadata:idempotency-key',
+    ttl: int = 24 * 60 * 60,
+    group: str = None,
+    wait_timeout: float = 10,
+    lock_ttl: int = 60,
+    scope: Optional[Callable] = default_scope,
+):
+    """
+    Runs unary RPC once per idempotency key and replays its response to retries.
+
+    :param key: Where idempotency key is taken from, same syntax as in `ratelimit`.
+        Calls without the key are not deduplicated.
+    :param ttl: Seconds the response is stored for.
+    :param group: Namespace of keys, by default RPCs class' and methods name.
+    :param wait_timeout: Seconds a duplicate waits for the first call to finish, it is aborted with ABORTED afterwards.
+    :param lock_ttl: Seconds after which lock of the first call expires if its process crashed.
+        Must be longer than the slowest call.
+    :param scope: Callable that receives request and context and returns owner of the key, so a key sent by one
+        client never replays response of another. By default the authenticated user or client address,
+        None if keys are unique across clients, e.g. taken from the request and generated by the server.
+    """
+    extract_key = KeysExtractor([key], strict=True)
+
+    def decorator(fn):
+        if inspect.isgeneratorfunction(fn) or inspect.isasyncgenfunction(fn):
+            raise ImproperlyConfigured("idempotent supports only RPCs with unary response")
+        prefix = "idempotent:%s:" % (group or fn.__qualname__)
+
+        def make_key(request, context) -> Optional[str]:
+            [value] = extract_key(request, context)
+            if not value:
+                return None
+            if scope is not None:
+                value = '%s:%s' % (scope(request, context), value)
+            return prefix + hashlib.md5(value.encode('utf-8')).hexdigest()
+
+        def replay(stored, context):
+            full_name, data = stored
+            context.set_trailing_metadata(((REPLAYED_METADATA_KEY, 'true'),))
+            return get_message_class(full_name).FromString(data)
+
+        def to_store(response, context):
+            # Failed calls are not stored, so they can be retried
+            if context.code() in (None, grpc.StatusCode.OK):
+                return response.DESCRIPTOR.full_name, response.SerializeToString()
+            return None
+
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def _wrapped(self, request, context):
+                result_key = make_key(request, context)
+                if result_key is None:
+                    return await fn(self, request, context)
+
+                cache = get_cache()
+                lock_key = result_key + ':lock'
+                owner = uuid.uuid4().hex
+                deadline = time.monotonic() + wait_timeout
+                while True:
+                    stored = await cache.aget(result_key)
+                    if stored is not None:
+                        return replay(stored, context)
+                    if await cache.aadd(lock_key, owner, lock_ttl):
+                        break
+                    if time.monotonic() + POLL_INTERVAL > deadline:
+                        await context.abort(grpc.StatusCode.ABORTED, IN_PROGRESS_MESSAGE)
+                    await asyncio.sleep(POLL_INTERVAL)
+
+                try:
+                    stored = await cache.aget(result_key)
+                    if stored is not None:
+                        return replay(stored, context)
+                    response = await fn(self, request, context)
+                    stored = to_store(response, context)
+                    if stored is not None:
+                        await cache.aset(result_key, stored, ttl)
+                    return response
+                finally:
+                    if await cache.aget(lock_key) == owner:
+                        await cache.adelete(lock_key)
+        else:
+            @wraps(fn)
+            def _wrapped(self, request, context):
+                result_key = make_key(request, context)
+                if result_key is None:
+                    return fn(self, request, context)
+
+                cache = get_cache()
+                lock_key = result_key + ':lock'
+                owner = uuid.uuid4().hex
+                deadline = time.monotonic() + wait_timeout
+                while True:
+                    stored = cache.get(result_key)
+                    if stored is not None:
+                        return replay(stored, context)
+                    # `add()` is atomic, only one of concurrent duplicates runs the handler
+                    if cache.add(lock_key, owner, lock_ttl):
+                        break
+                    if time.monotonic() + POLL_INTERVAL > deadline:
+                        context.abort(grpc.StatusCode.ABORTED, IN_PROGRESS_MESSAGE)
+                    time.sleep(POLL_INTERVAL)
+
+                try:
+                    # First call could finish between the check and taking the lock
+                    stored = cache.get(result_key)
+                    if stored is not None:
+                        return replay(stored, context)
+                    response = fn(self, request, context)
+                    stored = to_store(response, context)
+                    if stored is not None:
+                        cache.set(result_key, stored, ttl)
+                    return response
+                finally:
+                    # Lock could expire and be taken by another call
+                    if cache.get(lock_key) == owner:
+                        cache.delete(lock_key)
+
+        return _wrapped
+
+    return decorator
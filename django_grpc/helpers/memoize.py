@@ -0,0 +1,87 @@
+import inspect
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Optional
+
+from django_grpc.signals import grpc_request_started, grpc_request_finished, grpc_got_request_exception
+
+# Storage of the RPC processed by the current thread or task, None outside of RPC
+_rpc_cache = ContextVar('rpc_cache', default=None)
+_missing = object()
+
+
+def get_rpc_cache() -> Optional[dict]:
+    """
+    Returns dict that lives until the current RPC is finished, None outside of RPC
+    """
+    return _rpc_cache.get()
+
+
+def start_rpc_cache(**kwargs):
+    _rpc_cache.set({})
+
+
+def clear_rpc_cache(**kwargs):
+    _rpc_cache.set(None)
+
+
+grpc_request_started.connect(start_rpc_cache, dispatch_uid='django_grpc.helpers.memoize')
+grpc_request_finished.connect(clear_rpc_cache, dispatch_uid='django_grpc.helpers.memoize')
+grpc_got_request_exception.connect(clear_rpc_cache, dispatch_uid='django_grpc.helpers.memoize')
+
+
+def _make_key(fn, args, kwargs, key_func):
+    if key_func is not None:
+        return fn, key_func(*args, **kwargs)
+    key = (fn, args, frozenset(kwargs.items()) if kwargs else None)
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable arguments, result can't be cached
+        return None
+    return key
+
+
+def rpc_memoize(fn: Callable = None, *, key: Callable = None):
+    """
+    Caches result of loader function until the end of the current RPC, so objects like the current user or tenant
+    are loaded once per call. Outside of RPC the function is called every time.
+
+    :param key: Callable that receives arguments of the function and returns hashable cache key,
+        by default arguments themselves are used.
+
+    Usage::
+
+        @rpc_memoize
+        def get_tenant(tenant_id):
+            return Tenant.objects.get(id=tenant_id)
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def _wrapped(*args, **kwargs):
+                cache = _rpc_cache.get()
+                cache_key = None if cache is None else _make_key(fn, args, kwargs, key)
+                if cache_key is None:
+                    return await fn(*args, **kwargs)
+                result = cache.get(cache_key, _missing)
+                if result is _missing:
+                    result = cache[cache_key] = await fn(*args, **kwargs)
+                return result
+        else:
+            @wraps(fn)
+            def _wrapped(*args, **kwargs):
+                cache = _rpc_cache.get()
+                cache_key = None if cache is None else _make_key(fn, args, kwargs, key)
+                if cache_key is None:
+                    return fn(*args, **kwargs)
+                result = cache.get(cache_key, _missing)
+                if result is _missing:
+                    result = cache[cache_key] = fn(*args, **kwargs)
+                return result
+
+        return _wrapped
+
+    if fn is not None:
+        return decorator(fn)
+    return decorator
@@ -28,30 +28,77 @@ def create_cache_key(group: str, values: List[str], time_window: int):
     return hashlib.md5(''.join(parts).encode('utf-8')).hexdigest()
 
 
+def _request_key(fields_dot_path: str) -> Callable:
+    fields = fields_dot_path.split(".")
+
+    def getter(request, context, metadata):
+        return str(reduce(lambda msg, field: getattr(msg, field, ""), fields, request))
+
+    return getter
+
+
+def _metadata_key(metadata_key: str) -> Callable:
+    def getter(request, context, metadata):
+        return metadata.get(metadata_key, "") or ""
+
+    return getter
+
+
+def _callable_key(fn: Callable) -> Callable:
+    def getter(request, context, metadata):
+        return fn(request, context)
+
+    return getter
+
+
+class KeysExtractor:
+    """
+    Keys compiled to getters once, so strings are not parsed on every call.
+    Metadata is converted to dict once per call and only if any key needs it.
+
+    Keys without "request:" or "metadata:" prefix are ignored as they always were by `ratelimit`,
+    with `strict=True` they raise ImproperlyConfigured instead.
+    """
+
+    def __init__(self, keys: List[Union[str, Callable]], strict: bool = False):
+        self.getters = []
+        self.uses_metadata = False
+        for key in keys:
+            # User provided function to get key from request and context
+            if callable(key):
+                self.getters.append(_callable_key(key))
+                continue
+
+            prefix, _, path = key.partition(":")
+            # Gets keys value from gRPCs message
+            if prefix == "request":
+                self.getters.append(_request_key(path))
+            # Gets keys value from gRPCs metadata
+            elif prefix == "metadata":
+                self.getters.append(_metadata_key(path))
+                self.uses_metadata = True
+            elif strict:
+                raise ImproperlyConfigured(
+                    'Unsupported key "%s". Use "request:" or "metadata:" prefix or a callable.' % key
+                )
+
+    def __call__(self, request, context) -> List[str]:
+        metadata = dict(context.invocation_metadata()) if self.uses_metadata else None
+        return [getter(request, context, metadata) for getter in self.getters]
+
+
 def get_keys_values(request, context, keys: List[Union[str, Callable]]) -> List[str]:
-    values = []
-    for key in keys:
-        # User provided function to get key from request and context
-        if callable(key):
-            values.append(key(request, context))
-        # Gets keys value from gRPCs message
-        elif key.startswith("request:"):
-            _, fields_dot_path = key.split(":")
-            value = str(reduce(lambda msg, field: getattr(msg, field, ""), fields_dot_path.split("."), request))
-            values.append(value)
-        # Gets keys value from gRPCs metadata
-        elif key.startswith("metadata:"):
-            _, metadata_key = key.split(":")
-            value = dict(context.invocation_metadata()).get(metadata_key, "") or ""
-            values.append(value)
-
-    return values
+    return KeysExtractor(keys)(request, context)
+
+
+def get_cache():
+    cache_name = getattr(settings, 'RATELIMIT_USE_CACHE', 'default')
+    return caches[cache_name]
 
 
 def save_call(cache_key: str, time_period: int) -> int:
     """Saves current call and returns number of calls for given key."""
-    cache_name = getattr(settings, 'RATELIMIT_USE_CACHE', 'default')
-    cache = caches[cache_name]
+    cache = get_cache()
 
     count = 1
     # Extend the expiration time by a few seconds to avoid misses.
@@ -66,6 +113,44 @@ def save_call(cache_key: str, time_period: int) -> int:
     return count
 
 
+class RateLimitPolicy:
+    """
+    Ratelimit compiled once: keys are turned into getters and group is pre-hashed.
+    """
+
+    def __init__(
+        self,
+        max_calls: int,
+        time_period: int,
+        group: str,
+        keys: List[Union[str, Callable]] = None,
+    ):
+        if time_period <= 0:
+            raise ImproperlyConfigured('time_period must be greater than 0')
+
+        self.max_calls = max_calls
+        self.time_period = time_period
+        self.group = group
+        self.extract_keys = KeysExtractor(keys or [])
+        # Produces the same digest as `create_cache_key()` without hashing group on every call
+        self._group_hash = hashlib.md5(group.encode('utf-8'))
+
+    def cache_key(self, request, context, time_window: int) -> str:
+        key_hash = self._group_hash.copy()
+        key_hash.update((".".join(self.extract_keys(request, context)) + str(time_window)).encode('utf-8'))
+        return key_hash.hexdigest()
+
+    def record(self, request, context) -> Tuple[int, int]:
+        """Records call and returns current calls count and time left until end of time period."""
+        time_window = get_current_time_window(self.time_period)
+        count = save_call(self.cache_key(request, context, time_window), self.time_period)
+        return count, time_window - int(time.time())
+
+    def details(self, time_left: int) -> str:
+        return (f"Reached limit of {self.max_calls} calls per {self.time_period} seconds."
+                f" Resource will be available in {time_left} seconds.")
+
+
 def record_call(
     rpc,
     request,
@@ -89,20 +174,9 @@ def record_call(
     if group is None:
         # By default group will be RPCs class' and methods name
         group = rpc.__qualname__
-    if keys is None:
-        keys = []
-
-    if time_period <= 0:
-        raise ImproperlyConfigured('time_period must be greater than 0')
-
-    time_window = get_current_time_window(time_period)
-    values = get_keys_values(request, context, keys)
 
-    cache_key = create_cache_key(group, values, time_window)
-    count = save_call(cache_key, time_period)
-
-    time_left = time_window - int(time.time())
-    return count, time_left
+    policy = RateLimitPolicy(0, time_period, group, keys)
+    return policy.record(request, context)
 
 
 def ratelimit(max_calls: int, time_period: int, group: Optional[str] = None, keys: List[Union[str, Callable]] = None):
@@ -116,14 +190,103 @@ def ratelimit(max_calls: int, time_period: int, group: Optional[str] = None, key
     """
 
     def decorator(fn):
+        # By default group will be RPCs class' and methods name
+        policy = RateLimitPolicy(max_calls, time_period, group or fn.__qualname__, keys)
+
         @wraps(fn)
         def _wrapped(self, request, context):
-            current_calls, time_left = record_call(fn, request, context, time_period, group, keys)
+            current_calls, time_left = policy.record(request, context)
 
             if current_calls > max_calls:
-                details = (f"Reached limit of {max_calls} calls per {time_period} seconds."
-                           f" Resource will be available in {time_left} seconds.")
-                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, details)
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, policy.details(time_left))
+
+            return fn(self, request, context)
+
+        return _wrapped
+
+    return decorator
+
+
+def get_policy(name: str) -> RateLimitPolicy:
+    """
+    Builds policy declared in `RATELIMIT_POLICIES` setting.
+    Policy name is used as a group unless group is set explicitly.
+    """
+    policies = getattr(settings, 'RATELIMIT_POLICIES', dict())
+    try:
+        params = dict(policies[name])
+    except KeyError:
+        raise ImproperlyConfigured("Ratelimit policy '%s' is not defined in RATELIMIT_POLICIES setting." % name)
+    params.setdefault('group', name)
+    return RateLimitPolicy(**params)
+
+
+def increment_call(cache, cache_key: str, time_period: int) -> int:
+    """
+    Counts call with a single `incr()` once the window is started and returns number of calls for given key.
+    """
+    try:
+        return cache.incr(cache_key)
+    except ValueError:
+        # First call of the window, or memcached is unavailable
+        pass
+    # Extend the expiration time by a few seconds to avoid misses.
+    if cache.add(cache_key, 1, time_period + 3):
+        return 1
+    try:
+        # Concurrent call started the window in between
+        return cache.incr(cache_key)
+    except ValueError:
+        return 1
+
+
+def check_policies(policies: List[RateLimitPolicy], request, context) -> Optional[Tuple[RateLimitPolicy, int]]:
+    """
+    Counts the call in all policies first and takes it back if any of them is exceeded,
+    so concurrent calls can't pass between a check and a write. Rejected calls are not counted.
+
+    :returns: First exceeded policy and time left until its limit resets or None
+    """
+    now = int(time.time())
+    cache = get_cache()
+    windows = [get_current_time_window(policy.time_period) for policy in policies]
+    cache_keys = [
+        policy.cache_key(request, context, time_window)
+        for policy, time_window in zip(policies, windows)
+    ]
+    counts = [
+        increment_call(cache, cache_key, policy.time_period)
+        for policy, cache_key in zip(policies, cache_keys)
+    ]
+
+    for policy, count, time_window in zip(policies, counts, windows):
+        if count > policy.max_calls:
+            for cache_key in cache_keys:
+                try:
+                    cache.decr(cache_key)
+                except ValueError:
+                    # Window expired in between
+                    pass
+            return policy, time_window - now
+    return None
+
+
+def ratelimit_policies(*names: str):
+    """
+    Applies several policies from `RATELIMIT_POLICIES` setting at once,
+    e.g. per-user, per-tenant and global quotas.
+
+    :param names: Names of policies in `RATELIMIT_POLICIES` setting.
+    """
+    policies = [get_policy(name) for name in names]
+
+    def decorator(fn):
+        @wraps(fn)
+        def _wrapped(self, request, context):
+            exceeded = check_policies(policies, request, context)
+            if exceeded is not None:
+                policy, time_left = exceeded
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, policy.details(time_left))
 
             return fn(self, request, context)
 
@@ -0,0 +1,6 @@
+from .base import BehaviorInterceptor, wrap_method_handler
+
+__all__ = [
+    "BehaviorInterceptor",
+    "wrap_method_handler",
+]
@@ -0,0 +1,166 @@
+"""
+Access log of synchronous server, enabled with ``GRPCSERVER['access_log']``::
+
+    GRPCSERVER = {
+        ...
+        'access_log': {
+            'path': '/var/log/app/grpc-access.jsonl',   # default: stdout
+            'sample_rate': 1.0,                         # share of calls that are logged
+            'sample_rates': {'OK': 0.1},                # per status code, overrides `sample_rate`
+            'buffer_size': 10000,                       # records waiting for the writer
+            'batch_size': 1000,
+            'flush_interval': 1.0,                      # seconds
+        },
+    }
+
+Worker threads only append fixed-shape records to an in-memory buffer, formatting and I/O are done by a background
+writer thread in JSON lines. Records are dropped and counted when the buffer is full, so logging never blocks RPCs.
+"""
+import json
+import logging
+import random
+import sys
+import time
+from functools import wraps
+from typing import NamedTuple
+
+import grpc
+
+from django_grpc.batcher import BackgroundBatcher
+from django_grpc.interceptors.base import BehaviorInterceptor
+from django_grpc.signals import grpc_shutdown
+
+
+logger = logging.getLogger(__name__)
+
+
+class AccessRecord(NamedTuple):
+    time: float
+    method: str
+    status: str
+    duration: float
+    request_size: int
+    response_size: int
+    peer: str
+
+
+class AccessLogWriter(BackgroundBatcher):
+    """
+    Buffers access records and writes them in JSON lines from a background thread in batches.
+    """
+    name = 'grpc-access-log'
+
+    def __init__(
+        self, path: str = None, buffer_size: int = 10000, batch_size: int = 1000, flush_interval: float = 1.0,
+    ):
+        super().__init__(buffer_size, batch_size, flush_interval)
+        self.path = path
+        self.written = 0
+
+    @staticmethod
+    def format(record: 'AccessRecord') -> str:
+        return json.dumps(record._asdict()) + '\n'
+
+    def process(self, records: list):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                # Record that can't be formatted is skipped, the rest of the batch is written
+                logger.exception("%s failed to format a record of %s", self.name, record.method)
+        if lines:
+            self.write(lines)
+            self.written += len(lines)
+
+    def write(self, lines: list):
+        if self.path is None:
+            sys.stdout.writelines(lines)
+            sys.stdout.flush()
+        else:
+            with open(self.path, 'a') as fp:
+                fp.writelines(lines)
+
+    def state(self) -> dict:
+        return {'buffered': len(self.buffer), 'written': self.written, 'dropped': self.dropped}
+
+
+def _message_size(message) -> int:
+    return message.ByteSize() if hasattr(message, 'ByteSize') else 0
+
+
+class AccessLogInterceptor(BehaviorInterceptor):
+    def __init__(
+        self,
+        path: str = None,
+        sample_rate: float = 1.0,
+        sample_rates: dict = None,
+        buffer_size: int = 10000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+    ):
+        self.sample_rate = sample_rate
+        self.sample_rates = sample_rates or {}
+        self.writer = AccessLogWriter(path, buffer_size, batch_size, flush_interval)
+        grpc_shutdown.connect(self.writer.shutdown)
+
+    def should_log(self, status: str) -> bool:
+        rate = self.sample_rates.get(status, self.sample_rate)
+        return rate >= 1 or random.random() < rate
+
+    def log(self, method, context, started, duration, error, request_size, response_size):
+        status = context.code()
+        if status is None:
+            status = grpc.StatusCode.UNKNOWN if error else grpc.StatusCode.OK
+        if not self.should_log(status.name):
+            return
+        self.writer.append(AccessRecord(
+            started, method, status.name, duration, request_size, response_size, context.peer(),
+        ))
+
+    def wrap(self, behavior, handler_call_details, method_handler):
+        method = handler_call_details.method
+
+        def count_requests(request_iterator, sizes):
+            for request in request_iterator:
+                sizes[0] += _message_size(request)
+                yield request
+
+        def measure(request_or_iterator, sizes):
+            if method_handler.request_streaming:
+                return count_requests(request_or_iterator, sizes)
+            sizes[0] = _message_size(request_or_iterator)
+            return request_or_iterator
+
+        if method_handler.response_streaming:
+            @wraps(behavior)
+            def inner(request_or_iterator, context):
+                started, start = time.time(), time.monotonic()
+                sizes = [0, 0]
+                error = False
+                try:
+                    for response in behavior(measure(request_or_iterator, sizes), context):
+                        sizes[1] += _message_size(response)
+                        yield response
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    self.log(method, context, started, time.monotonic() - start, error, *sizes)
+        else:
+            @wraps(behavior)
+            def inner(request_or_iterator, context):
+                started, start = time.time(), time.monotonic()
+                sizes = [0, 0]
+                error = False
+                try:
+                    response = behavior(measure(request_or_iterator, sizes), context)
+                    sizes[1] = _message_size(response)
+                    return response
+                except BaseException:
+                    error = True
+                    raise
+                finally:
+                    self.log(method, context, started, time.monotonic() - start, error, *sizes)
+
+        return inner
@@ -0,0 +1,388 @@
+"""
+Authentication for synchronous server, enabled with ``GRPCSERVER['authentication']``::
+
+    GRPCSERVER = {
+        ...
+        'authentication': {
+            'authenticators': [
+                # Bearer token stored in a model, e.g. `Authorization: Bearer <key>`
+                {'class': 'django_grpc.interceptors.auth.ModelTokenAuthenticator', 'model': 'authtoken.Token'},
+                # API key stored in a model, e.g. `x-api-key: <key>`
+                {'class': 'django_grpc.interceptors.auth.ModelTokenAuthenticator', 'model': 'myapp.ApiKey',
+                 'metadata_key': 'x-api-key', 'prefix': '', 'scheme': 'api_key'},
+                # JWT signed with SECRET_KEY, requires `PyJWT`
+                {'class': 'django_grpc.interceptors.auth.JWTAuthenticator', 'algorithms': ['HS256']},
+            ],
+            'required': True,                 # reject calls without credentials
+            'exempt_methods': ['/grpc.health.v1.Health/*'],
+            'cache_size': 10000,              # verified credentials kept in process memory
+            'ttl': 300,                       # seconds
+            'shared_cache': 'default',        # optional, Django cache shared by processes
+        },
+    }
+
+Verified credentials are mapped to `Principal` and kept in a bounded TTL-LRU, so most calls don't hit the database.
+Entries of a user are invalidated when the user or its token is saved or deleted.
+Principal of the current call is returned by `get_principal()`.
+"""
+import fnmatch
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from typing import NamedTuple, Optional
+
+import grpc
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+
+from django_grpc.interceptors.base import BehaviorInterceptor
+
+
+logger = logging.getLogger(__name__)
+
+_current_principal = ContextVar('current_principal', default=None)
+
+
+class Principal(NamedTuple):
+    """
+    Lightweight identity of the caller, cheap to cache and pickle
+    """
+    user_id: object
+    username: str = ''
+    scheme: str = ''
+    # Payload of token-based credentials such as JWT
+    claims: Optional[dict] = None
+
+    def get_user(self):
+        return get_user_model()._default_manager.get(pk=self.user_id)
+
+
+def get_principal() -> Optional['Principal']:
+    """
+    Returns principal of the RPC processed by the current thread, None for anonymous calls
+    """
+    return _current_principal.get()
+
+
+class ModelTokenAuthenticator:
+    """
+    Looks up token stored in a model, suits bearer tokens and API keys
+    """
+
+    def __init__(
+        self,
+        model: str,
+        key_field: str = 'key',
+        user_field: str = 'user',
+        metadata_key: str = 'authorization',
+        prefix: str = 'Bearer ',
+        scheme: str = 'bearer',
+    ):
+        self.model = apps.get_model(model)
+        self.key_field = key_field
+        self.user_field = user_field
+        self.metadata_key = metadata_key
+        self.prefix = prefix
+        self.scheme = scheme
+
+    def authenticate(self, credential: str) -> Optional['Principal']:
+        try:
+            token = self.model._default_manager.select_related(self.user_field).get(**{self.key_field: credential})
+        except ObjectDoesNotExist:
+            return None
+        user = getattr(token, self.user_field)
+        if not user.is_active:
+            return None
+        return Principal(user.pk, user.get_username(), self.scheme)
+
+    def user_id_of(self, instance):
+        """
+        Returns id of the user whose cached credentials must be invalidated when token changes
+        """
+        return getattr(instance, self.user_field + '_id')
+
+
+class JWTAuthenticator:
+    """
+    Verifies JWT signature and expiration, principal is built from claims without database queries
+    """
+
+    def __init__(
+        self,
+        secret: str = None,
+        algorithms: list = None,
+        user_id_claim: str = 'sub',
+        username_claim: str = 'username',
+        audience: str = None,
+        metadata_key: str = 'authorization',
+        prefix: str = 'Bearer ',
+        scheme: str = 'jwt',
+    ):
+        try:
+            import jwt
+        except ImportError:
+            raise ImproperlyConfigured(
+                "Failed to enable JWT authentication. "
+                "Install `PyJWT` package or remove JWTAuthenticator from settings."
+            )
+        self.jwt = jwt
+        self.secret = secret or settings.SECRET_KEY
+        self.algorithms = algorithms or ['HS256']
+        self.user_id_claim = user_id_claim
+        self.username_claim = username_claim
+        self.audience = audience
+        self.metadata_key = metadata_key
+        self.prefix = prefix
+        self.scheme = scheme
+        self.model = None
+
+    def authenticate(self, credential: str) -> Optional['Principal']:
+        try:
+            claims = self.jwt.decode(credential, self.secret, algorithms=self.algorithms, audience=self.audience)
+        except self.jwt.InvalidTokenError:
+            return None
+        if self.user_id_claim not in claims:
+            return None
+        return Principal(claims[self.user_id_claim], claims.get(self.username_claim, ''), self.scheme, claims)
+
+    def get_ttl(self, principal: 'Principal', ttl: float) -> float:
+        # Token must not outlive its expiration in cache
+        expires = principal.claims.get('exp')
+        return ttl if expires is None else min(ttl, expires - time.time())
+
+
+class PrincipalCache:
+    """
+    TTL-LRU of verified credentials, optionally backed by Django's cache shared between processes.
+    Entries of a user are invalidated by bumping user's generation in the shared cache, local entries remember
+    the generation they were read with, so hits of every process check it.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300, shared_cache: str = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared_cache = shared_cache
+        self._entries = OrderedDict()
+        self._user_keys = {}
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self):
+        return caches[self.shared_cache] if self.shared_cache else None
+
+    @staticmethod
+    def make_key(scheme: str, credential: str) -> str:
+        # Credentials are not kept in memory and cache as is
+        return 'grpc-auth:%s:%s' % (scheme, hashlib.sha256(credential.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def _generation_key(user_id) -> str:
+        return 'grpc-auth-user:%s' % user_id
+
+    def _generation(self, user_id) -> Optional[int]:
+        if self.shared is None:
+            return None
+        return self.shared.get(self._generation_key(user_id), 0)
+
+    def get(self, key: str) -> Optional['Principal']:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._remove(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            _, principal, generation = entry
+            # User could be invalidated by another process
+            if self._generation(principal.user_id) == generation:
+                return principal
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    self._remove(key)
+            return None
+
+        if self.shared is None:
+            return None
+        entry = self.shared.get(key)
+        if entry is None:
+            return None
+        principal, generation, expires_at = entry
+        if self._generation(principal.user_id) != generation:
+            return None
+        # Local copy lives only as long as the shared entry, not another `ttl`
+        ttl = expires_at - time.time()
+        if ttl <= 0:
+            return None
+        self._store(key, principal, ttl, generation)
+        return principal
+
+    def set(self, key: str, principal: 'Principal', ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        generation = self._generation(principal.user_id)
+        self._store(key, principal, ttl, generation)
+        if self.shared is not None:
+            self.shared.set(key, (principal, generation, time.time() + ttl), ttl)
+
+    def _store(self, key: str, principal: 'Principal', ttl: float, generation: Optional[int]):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, principal, generation)
+            self._user_keys.setdefault(principal.user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._user_keys.get(entry[1].user_id)
+            keys.discard(key)
+            if not keys:
+                del self._user_keys[entry[1].user_id]
+
+    def invalidate_user(self, user_id):
+        """
+        Drops cached credentials of the user. Without shared cache other processes drop them after `ttl`,
+        with it their next lookup sees the new generation.
+        """
+        with self._lock:
+            for key in list(self._user_keys.get(user_id, ())):
+                self._remove(key)
+        if self.shared is not None:
+            generation_key = self._generation_key(user_id)
+            self.shared.add(generation_key, 0, None)
+            try:
+                self.shared.incr(generation_key)
+            except ValueError:
+                # Key was evicted in between
+                self.shared.set(generation_key, 1, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+
+
+# Interceptors whose caches are invalidated by model signals, dropped with their server
+_interceptors = weakref.WeakSet()
+
+
+def _invalidate_user(sender, instance, **kwargs):
+    for interceptor in list(_interceptors):
+        interceptor.cache.invalidate_user(instance.pk)
+
+
+def _invalidate_token(sender, instance, **kwargs):
+    for interceptor in list(_interceptors):
+        for authenticator in interceptor.authenticators:
+            if getattr(authenticator, 'model', None) is sender:
+                interceptor.cache.invalidate_user(authenticator.user_id_of(instance))
+
+
+class AuthenticationInterceptor(BehaviorInterceptor):
+    def __init__(
+        self,
+        authenticators: list,
+        required: bool = False,
+        exempt_methods: list = None,
+        cache_size: int = 10000,
+        ttl: float = 300,
+        shared_cache: str = None,
+    ):
+        self.authenticators = [self._load_authenticator(options) for options in authenticators]
+        self.required = required
+        self.exempt_methods = exempt_methods or []
+        self.cache = PrincipalCache(cache_size, ttl, shared_cache)
+        self._connect_invalidation()
+
+    @staticmethod
+    def _load_authenticator(options):
+        if not isinstance(options, dict):
+            return options
+        options = dict(options)
+        return import_string(options.pop('class'))(**options)
+
+    def _connect_invalidation(self):
+        _interceptors.add(self)
+        # Receivers are module level and connected once, no matter how many servers are created
+        post_save.connect(_invalidate_user, sender=get_user_model(), dispatch_uid='django_grpc.auth.user')
+        post_delete.connect(_invalidate_user, sender=get_user_model(), dispatch_uid='django_grpc.auth.user')
+        for authenticator in self.authenticators:
+            if getattr(authenticator, 'model', None) is not None:
+                post_save.connect(_invalidate_token, sender=authenticator.model, dispatch_uid='django_grpc.auth.token')
+                post_delete.connect(
+                    _invalidate_token, sender=authenticator.model, dispatch_uid='django_grpc.auth.token',
+                )
+
+    def _is_exempt(self, method: str) -> bool:
+        return any(fnmatch.fnmatchcase(method, pattern) for pattern in self.exempt_methods)
+
+    def authenticate(self, invocation_metadata) -> tuple:
+        """
+        Returns (principal, whether credentials were provided)
+        """
+        metadata = dict(invocation_metadata or ())
+        provided = False
+        for authenticator in self.authenticators:
+            value = metadata.get(authenticator.metadata_key)
+            if value is None or not value.startswith(authenticator.prefix):
+                continue
+            provided = True
+            credential = value[len(authenticator.prefix):]
+            key = self.cache.make_key(authenticator.scheme, credential)
+            principal = self.cache.get(key)
+            if principal is None:
+                principal = authenticator.authenticate(credential)
+                if principal is None:
+                    continue
+                ttl = self.cache.ttl
+                if hasattr(authenticator, 'get_ttl'):
+                    ttl = authenticator.get_ttl(principal, ttl)
+                self.cache.set(key, principal, ttl)
+            return principal, True
+        return None, provided
+
+    def wrap(self, behavior, handler_call_details, method_handler):
+        if self._is_exempt(handler_call_details.method):
+            return behavior
+        invocation_metadata = handler_call_details.invocation_metadata
+
+        def authenticate(context):
+            principal, provided = self.authenticate(invocation_metadata)
+            if principal is None and (provided or self.required):
+                context.abort(grpc.StatusCode.UNAUTHENTICATED, "Invalid or missing credentials")
+            return _current_principal.set(principal)
+
+        if method_handler.response_streaming:
+            # Responses are produced while the server iterates the generator
+            @wraps(behavior)
+            def inner(request_or_iterator, context):
+                token = authenticate(context)
+                try:
+                    yield from behavior(request_or_iterator, context)
+                finally:
+                    _current_principal.reset(token)
+        else:
+            @wraps(behavior)
+            def inner(request_or_iterator, context):
+                token = authenticate(context)
+                try:
+                    return behavior(request_or_iterator, context)
+                finally:
+                    _current_principal.reset(token)
+
+        return inner
@@ -0,0 +1,41 @@
+from typing import Callable
+
+import grpc
+
+from django_grpc.signals.wrapper import SignalWrapper
+
+
+def wrap_method_handler(method_handler: 'grpc.RpcMethodHandler', wrapper: Callable) -> 'grpc.RpcMethodHandler':
+    """
+    Creates copy of RpcMethodHandler() with every defined behavior replaced by `wrapper(behavior)`.
+    """
+    return method_handler._replace(**{
+        prop: wrapper(getattr(method_handler, prop))
+        for prop in SignalWrapper.METHOD_PROPERTIES
+        if getattr(method_handler, prop) is not None
+    })
+
+
+class BehaviorInterceptor(grpc.ServerInterceptor):
+    """
+    Base class for interceptors that need to run code in worker thread together with RPC.
+
+    `intercept_service()` of synchronous server is called by the thread that polls for new calls,
+    before RPC is queued for a worker. Slow code there (metadata parsing, database queries)
+    delays all incoming calls, so subclasses wrap RPC behavior instead.
+    """
+
+    def intercept_service(self, continuation, handler_call_details):
+        method_handler = continuation(handler_call_details)
+        if method_handler is None:
+            return None
+        return wrap_method_handler(
+            method_handler,
+            lambda behavior: self.wrap(behavior, handler_call_details, method_handler),
+        )
+
+    def wrap(self, behavior: Callable, handler_call_details, method_handler) -> Callable:
+        """
+        Returns callable with the same signature as `behavior`, i.e. (request_or_iterator, context)
+        """
+        raise NotImplementedError()
@@ -0,0 +1,210 @@
+"""
+Capture of incoming requests for load testing, enabled for synchronous server with ``GRPCSERVER['capture']``::
+
+    GRPCSERVER = {
+        ...
+        'capture': {
+            'path': '/var/tmp/grpc-capture-{pid}.bin',  # `{pid}` keeps processes in separate files
+            'sample_rate': 0.01,
+            'methods': ['/library.Library/*'],          # fnmatch patterns, default: all methods
+            'exclude_metadata': ['authorization', 'cookie'],
+        },
+    }
+
+Requests are captured as received bytes, they are not serialized again. Only unary requests are captured.
+Capture files are replayed with ``python manage.py grpcreplay``.
+
+File starts with a header (magic and capture start time) followed by length-prefixed records::
+
+    >I length | >d offset from start | >B kind | >H method length | method
+    | >H number of metadata items | (>H key length | key | >H value length | value)* | request bytes
+"""
+import fnmatch
+import os
+import random
+import struct
+import time
+from typing import Iterator, NamedTuple
+
+import grpc
+
+from django_grpc.interceptors.accesslog import AccessLogWriter
+from django_grpc.signals import grpc_shutdown
+
+
+MAGIC = b'DJGRPCC1'
+HEADER = struct.Struct('>8sd')
+LENGTH = struct.Struct('>I')
+RECORD = struct.Struct('>dBH')
+SHORT = struct.Struct('>H')
+
+UNARY_UNARY = 0
+UNARY_STREAM = 1
+
+# Set by gRPC itself, they must not be replayed
+RESERVED_METADATA = ('user-agent', 'grpc-')
+
+
+class CaptureRecord(NamedTuple):
+    time: float
+    kind: int
+    method: str
+    metadata: tuple
+    request: bytes
+
+
+def _pack_string(value) -> bytes:
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return SHORT.pack(len(value)) + value
+
+
+def pack_record(record: 'CaptureRecord', start_time: float) -> bytes:
+    parts = [
+        RECORD.pack(record.time - start_time, record.kind, len(record.method)),
+        record.method.encode('utf-8'),
+        SHORT.pack(len(record.metadata)),
+    ]
+    for key, value in record.metadata:
+        parts.append(_pack_string(key))
+        parts.append(_pack_string(value))
+    parts.append(record.request)
+    body = b''.join(parts)
+    return LENGTH.pack(len(body)) + body
+
+
+def unpack_record(body: bytes, start_time: float) -> 'CaptureRecord':
+    offset, kind, method_length = RECORD.unpack_from(body)
+    position = RECORD.size
+    method = body[position:position + method_length].decode('utf-8')
+    position += method_length
+    metadata = []
+    (count,) = SHORT.unpack_from(body, position)
+    position += SHORT.size
+    for _ in range(count):
+        item = []
+        for _ in range(2):
+            (length,) = SHORT.unpack_from(body, position)
+            position += SHORT.size
+            item.append(body[position:position + length])
+            position += length
+        key = item[0].decode('utf-8')
+        # Binary headers keep bytes values
+        value = item[1] if key.endswith('-bin') else item[1].decode('utf-8')
+        metadata.append((key, value))
+    return CaptureRecord(start_time + offset, kind, method, tuple(metadata), body[position:])
+
+
+def read_capture(path: str) -> Iterator['CaptureRecord']:
+    """
+    Yields records of the capture file, `time` of records is absolute
+    """
+    with open(path, 'rb') as fp:
+        header = fp.read(HEADER.size)
+        if len(header) < HEADER.size or not header.startswith(MAGIC):
+            raise ValueError("%s is not a capture file" % path)
+        start_time = HEADER.unpack(header)[1]
+        while True:
+            prefix = fp.read(LENGTH.size)
+            if len(prefix) < LENGTH.size:
+                return
+            (length,) = LENGTH.unpack(prefix)
+            body = fp.read(length)
+            if len(body) < length:
+                # Last record was not written completely
+                return
+            yield unpack_record(body, start_time)
+
+
+class CaptureWriter(AccessLogWriter):
+    """
+    Writes captured requests from a background thread, records are dropped when the buffer is full
+    """
+    name = 'grpc-capture'
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(path, **kwargs)
+        self._start_times = {}
+
+    def get_path(self) -> str:
+        return self.path.format(pid=os.getpid())
+
+    def get_start_time(self, path: str, default: float) -> float:
+        """
+        Offsets are relative to the time in the header of existing file, or to the first record of a new file
+        """
+        if path not in self._start_times:
+            start_time = default
+            try:
+                with open(path, 'rb') as fp:
+                    header = fp.read(HEADER.size)
+                if len(header) == HEADER.size and header.startswith(MAGIC):
+                    start_time = HEADER.unpack(header)[1]
+            except FileNotFoundError:
+                pass
+            self._start_times[path] = start_time
+        return self._start_times[path]
+
+    def format(self, record: 'CaptureRecord') -> bytes:
+        return pack_record(record, self.get_start_time(self.get_path(), record.time))
+
+    def write(self, lines: list):
+        path = self.get_path()
+        with open(path, 'ab') as fp:
+            if fp.tell() == 0:
+                fp.write(HEADER.pack(MAGIC, self._start_times[path]))
+            fp.writelines(lines)
+
+
+class CaptureInterceptor(grpc.ServerInterceptor):
+    """
+    Samples calls in `intercept_service()` and captures request bytes when worker deserializes them
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sample_rate: float = 0.01,
+        methods: list = None,
+        exclude_metadata: list = ('authorization', 'cookie'),
+        buffer_size: int = 10000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+    ):
+        self.sample_rate = sample_rate
+        self.methods = methods
+        self.exclude_metadata = set(exclude_metadata)
+        self.writer = CaptureWriter(
+            path, buffer_size=buffer_size, batch_size=batch_size, flush_interval=flush_interval,
+        )
+        grpc_shutdown.connect(self.writer.shutdown)
+
+    def should_capture(self, method: str) -> bool:
+        if self.methods is not None and not any(fnmatch.fnmatchcase(method, it) for it in self.methods):
+            return False
+        return random.random() < self.sample_rate
+
+    def filter_metadata(self, invocation_metadata) -> tuple:
+        return tuple(
+            (key, value) for key, value in invocation_metadata or ()
+            if key not in self.exclude_metadata and not key.startswith(RESERVED_METADATA)
+        )
+
+    def intercept_service(self, continuation, handler_call_details):
+        method_handler = continuation(handler_call_details)
+        if method_handler is None or method_handler.request_streaming:
+            return method_handler
+        method = handler_call_details.method
+        if not self.should_capture(method):
+            return method_handler
+
+        started = time.time()
+        kind = UNARY_STREAM if method_handler.response_streaming else UNARY_UNARY
+        deserializer = method_handler.request_deserializer
+        invocation_metadata = handler_call_details.invocation_metadata
+
+        def capture(data: bytes):
+            self.writer.append(CaptureRecord(started, kind, method, self.filter_metadata(invocation_metadata), data))
+            return data if deserializer is None else deserializer(data)
+
+        return method_handler._replace(request_deserializer=capture)
@@ -0,0 +1,111 @@
+"""
+Per-method compression of responses for synchronous server, enabled with ``GRPCSERVER['compression']``::
+
+    GRPCSERVER = {
+        ...
+        'compression': {
+            # methods are matched with fnmatch, the first matching policy is used
+            'methods': {
+                '/library.Library/List*': {'algorithm': 'gzip', 'min_size': 4096},
+                '/library.Library/Export': {'algorithm': 'deflate'},
+            },
+            'default': None,        # policy of other methods, e.g. {'algorithm': 'gzip', 'min_size': 65536}
+            'sample_rate': 0.01,    # share of compressed messages used to estimate ratio and CPU cost
+        },
+    }
+
+Messages smaller than `min_size` bytes (measured with `ByteSize()`) are sent uncompressed.
+gRPC sends uncompressed messages to clients that don't advertise the algorithm in `grpc-accept-encoding`.
+Compression ratio and CPU cost are estimated by compressing sampled messages with zlib and reported by
+`django_grpc.stats.registry`.
+"""
+import fnmatch
+import random
+import time
+import zlib
+from functools import wraps
+
+import grpc
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.interceptors.base import BehaviorInterceptor
+from django_grpc.stats import registry
+
+
+ALGORITHMS = {
+    'gzip': grpc.Compression.Gzip,
+    'deflate': grpc.Compression.Deflate,
+    'none': grpc.Compression.NoCompression,
+}
+
+
+class CompressionPolicy:
+    __slots__ = ('algorithm', 'compression', 'min_size')
+
+    def __init__(self, algorithm: str = 'gzip', min_size: int = 0):
+        if algorithm not in ALGORITHMS:
+            raise ImproperlyConfigured(
+                "Unknown compression algorithm '%s', expected one of: %s" % (algorithm, ', '.join(ALGORITHMS))
+            )
+        self.algorithm = algorithm
+        self.compression = ALGORITHMS[algorithm]
+        self.min_size = min_size
+
+
+class CompressionInterceptor(BehaviorInterceptor):
+    def __init__(self, methods: dict = None, default: dict = None, sample_rate: float = 0.01):
+        self.policies = [(pattern, CompressionPolicy(**policy)) for pattern, policy in (methods or {}).items()]
+        self.default = CompressionPolicy(**default) if default is not None else None
+        self.sample_rate = sample_rate
+
+    def find_policy(self, method: str):
+        for pattern, policy in self.policies:
+            if fnmatch.fnmatchcase(method, pattern):
+                return policy
+        return self.default
+
+    def sample(self, method: str, message):
+        """
+        Estimates compression ratio and CPU cost of the message
+        """
+        data = message.SerializeToString()
+        started = time.thread_time()
+        compressed = zlib.compress(data)
+        registry.record_compression(method, True, len(data), len(compressed), time.thread_time() - started)
+
+    def should_compress(self, method: str, policy: 'CompressionPolicy', message) -> bool:
+        if message is None or message.ByteSize() < policy.min_size:
+            registry.record_compression(method, False)
+            return False
+        if self.sample_rate and random.random() < self.sample_rate:
+            self.sample(method, message)
+        else:
+            registry.record_compression(method, True)
+        return True
+
+    def wrap(self, behavior, handler_call_details, method_handler):
+        method = handler_call_details.method
+        policy = self.find_policy(method)
+        if policy is None or policy.compression == grpc.Compression.NoCompression:
+            return behavior
+
+        if method_handler.response_streaming:
+            @wraps(behavior)
+            def inner(request_or_iterator, context):
+                context.set_compression(policy.compression)
+                for message in behavior(request_or_iterator, context):
+                    if not self.should_compress(method, policy, message):
+                        context.disable_next_message_compression()
+                    yield message
+        else:
+            @wraps(behavior)
+            def inner(request_or_iterator, context):
+                response = behavior(request_or_iterator, context)
+                # Response is not sent yet, so compression of the call can still be chosen
+                if self.should_compress(method, policy, response):
+                    context.set_compression(policy.compression)
+                else:
+                    context.disable_next_message_compression()
+                return response
+
+        return inner
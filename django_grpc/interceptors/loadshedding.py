@@ -0,0 +1,153 @@
+"""
+Load shedding for synchronous server, enabled with ``GRPCSERVER['load_shedding']``::
+
+    GRPCSERVER = {
+        ...
+        'load_shedding': {
+            'target_delay': 0.005,          # acceptable time in queue, seconds
+            'interval': 0.1,                # window to detect standing queue, seconds
+            'priority_metadata': 'x-priority',
+            # Max time in queue per priority class while server is overloaded
+            'priorities': {'interactive': 0.1, 'default': 0.005, 'batch': 0},
+            'default_priority': 'default',
+        },
+    }
+
+RPC is dropped right after a worker takes it from the queue when:
+
+* client's deadline can't cover typical (p50) latency of the method, result would be thrown away;
+* queue is overloaded (CoDel: minimal queue delay over the last interval was above `target_delay`)
+  and the RPC waited longer than its priority class allows.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+import grpc
+
+from django_grpc.interceptors.base import BehaviorInterceptor
+
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """
+    Last `size` latencies of a method with lazily recalculated median.
+    """
+
+    def __init__(self, size: int = 100):
+        self.samples = deque(maxlen=size)
+        self._p50 = None
+
+    def add(self, duration: float):
+        self.samples.append(duration)
+        self._p50 = None
+
+    @property
+    def p50(self):
+        if self._p50 is None and self.samples:
+            ordered = sorted(self.samples)
+            self._p50 = ordered[len(ordered) // 2]
+        return self._p50
+
+
+class CoDelController:
+    """
+    Detects standing queue: server is overloaded if the smallest queue delay
+    observed during the last interval is above target.
+    """
+
+    def __init__(self, target_delay: float, interval: float):
+        self.target_delay = target_delay
+        self.interval = interval
+        self.overloaded = False
+        self._lock = threading.Lock()
+        self._interval_end = time.monotonic() + interval
+        self._min_delay = None
+
+    def observe(self, queue_delay: float, now: float) -> bool:
+        """
+        Records queue delay of dequeued RPC and returns whether server is overloaded
+        """
+        with self._lock:
+            if self._min_delay is None or queue_delay < self._min_delay:
+                self._min_delay = queue_delay
+            if now >= self._interval_end:
+                self.overloaded = self._min_delay > self.target_delay
+                self._min_delay = None
+                self._interval_end = now + self.interval
+            return self.overloaded
+
+
+class LoadSheddingInterceptor(BehaviorInterceptor):
+    def __init__(
+        self,
+        target_delay: float = 0.005,
+        interval: float = 0.1,
+        priority_metadata: str = 'x-priority',
+        priorities: dict = None,
+        default_priority: str = 'default',
+        latency_samples: int = 100,
+    ):
+        self.codel = CoDelController(target_delay, interval)
+        self.priority_metadata = priority_metadata
+        if priorities is None:
+            priorities = {'interactive': interval, 'default': target_delay, 'batch': 0}
+        self.priorities = priorities
+        self.default_priority = default_priority
+        self.latency_samples = latency_samples
+        self.latencies = {}
+        self.shed_deadline = 0
+        self.shed_overload = 0
+
+    def _get_latency_window(self, method: str) -> 'LatencyWindow':
+        window = self.latencies.get(method)
+        if window is None:
+            window = self.latencies.setdefault(method, LatencyWindow(self.latency_samples))
+        return window
+
+    def _get_priority(self, handler_call_details) -> str:
+        for key, value in handler_call_details.invocation_metadata or ():
+            if key == self.priority_metadata:
+                return value if value in self.priorities else self.default_priority
+        return self.default_priority
+
+    def wrap(self, behavior, handler_call_details, method_handler):
+        # Called when RPC arrives, before it is queued for a worker
+        arrived = time.monotonic()
+        priority = self._get_priority(handler_call_details)
+        latency = self._get_latency_window(handler_call_details.method)
+        record_latency = not method_handler.response_streaming
+
+        @wraps(behavior)
+        def inner(request_or_iterator, context):
+            started = time.monotonic()
+            self.admit(started - arrived, priority, latency, context)
+            if not record_latency:
+                return behavior(request_or_iterator, context)
+
+            response = behavior(request_or_iterator, context)
+            latency.add(time.monotonic() - started)
+            return response
+
+        return inner
+
+    def admit(self, queue_delay: float, priority: str, latency: 'LatencyWindow', context):
+        """
+        Aborts RPC that should be dropped
+        """
+        time_remaining = context.time_remaining()
+        p50 = latency.p50
+        if time_remaining is not None and p50 is not None and time_remaining < p50:
+            self.shed_deadline += 1
+            logger.debug("Dropped RPC with %.3fs left, p50 is %.3fs", time_remaining, p50)
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, "Deadline is too short to complete the call")
+
+        overloaded = self.codel.observe(queue_delay, time.monotonic())
+        if overloaded and queue_delay > self.priorities.get(priority, 0):
+            self.shed_overload += 1
+            logger.debug("Dropped %s RPC after %.3fs in queue", priority, queue_delay)
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Server is overloaded, try again later")
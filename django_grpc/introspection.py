@@ -0,0 +1,96 @@
+"""
+Opt-in gRPC service that exposes live stats of the server, enabled with::
+
+    GRPCSERVER = {
+        ...
+        'introspection': {
+            'address': 'unix:/run/app/grpc-introspection.sock',  # or '127.0.0.1:50099'
+        },
+    }
+
+It runs as a separate server, so it responds even when all workers of the main server are busy.
+Methods accept `google.protobuf.Empty` and return `google.protobuf.Struct`:
+
+* `/django_grpc.Introspection/GetStats` - per-method counters and latency, in-flight calls, pools state
+* `/django_grpc.Introspection/GetThreads` - stack of every thread and RPC it is processing
+"""
+import logging
+import sys
+import threading
+import traceback
+from concurrent import futures
+
+import grpc
+from google.protobuf import empty_pb2, struct_pb2
+
+from django_grpc.aio import loop_lag_monitor
+from django_grpc.signals import grpc_shutdown
+from django_grpc.stats import registry
+
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = 'django_grpc.Introspection'
+
+
+def get_stats() -> dict:
+    stats = registry.snapshot()
+    stats['loop_lag'] = {'lag': loop_lag_monitor.lag, 'max_lag': loop_lag_monitor.max_lag}
+    return stats
+
+
+def get_threads(max_depth: int = 30) -> dict:
+    methods = {call.thread_id: call.method for call in registry.get_active_calls()}
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    return {
+        'threads': [
+            {
+                'name': names.get(thread_id, ''),
+                'thread_id': thread_id,
+                'method': methods.get(thread_id, ''),
+                'stack': [line.rstrip() for line in traceback.format_stack(frame, limit=max_depth)],
+            }
+            for thread_id, frame in sys._current_frames().items()
+        ]
+    }
+
+
+def _struct_handler(fn):
+    def handler(request, context):
+        response = struct_pb2.Struct()
+        response.update(fn())
+        return response
+
+    return grpc.unary_unary_rpc_method_handler(
+        handler,
+        request_deserializer=empty_pb2.Empty.FromString,
+        response_serializer=struct_pb2.Struct.SerializeToString,
+    )
+
+
+def get_generic_handler() -> 'grpc.GenericRpcHandler':
+    return grpc.method_handlers_generic_handler(SERVICE_NAME, {
+        'GetStats': _struct_handler(get_stats),
+        'GetThreads': _struct_handler(get_threads),
+    })
+
+
+def start_introspection_server(address: str) -> 'grpc.Server':
+    """
+    Starts introspection service on a separate port or unix socket and stops it on `grpc_shutdown`
+    """
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='grpc-introspection'))
+    server.add_generic_rpc_handlers((get_generic_handler(),))
+    server.add_insecure_port(address)
+    server.start()
+    logger.info("gRPC introspection service is listening %s", address)
+
+    # Receiver is unique per server and disconnects itself, so restarted servers don't pile up receivers
+    dispatch_uid = 'django_grpc.introspection.%s' % id(server)
+
+    def stop(**kwargs):
+        grpc_shutdown.disconnect(dispatch_uid=dispatch_uid)
+        server.stop(None)
+
+    grpc_shutdown.connect(stop, weak=False, dispatch_uid=dispatch_uid)
+    return server
@@ -0,0 +1,53 @@
+import grpc
+from django.core.management.base import BaseCommand, CommandError
+
+from django_grpc.replay import Replayer, read_captures
+
+
+def speed(value):
+    if value == "max":
+        return None
+    return float(value)
+
+
+class Command(BaseCommand):
+    help = "Replay requests captured by GRPCSERVER['capture'] against gRPC server and report latencies"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Capture files")
+        parser.add_argument("--target", default="localhost:50051", help="Address of the server")
+        parser.add_argument(
+            "--speed",
+            type=speed,
+            default=1.0,
+            help="Multiplier of captured request rate, e.g. 1, 10 or 'max' to send requests without delays",
+        )
+        parser.add_argument("--concurrency", type=int, default=10, help="Maximum number of calls in flight")
+        parser.add_argument("--timeout", type=float, default=None, help="Deadline of every call, seconds")
+        parser.add_argument("--limit", type=int, default=None, help="Replay only first N requests")
+
+    def handle(self, *args, **options):
+        with grpc.insecure_channel(options["target"]) as channel:
+            replayer = Replayer(
+                channel, speed=options["speed"], concurrency=options["concurrency"], timeout=options["timeout"],
+            )
+            try:
+                report = replayer.replay(read_captures(options["paths"]), limit=options["limit"])
+            except (OSError, ValueError) as e:
+                raise CommandError("Failed to read capture: %s" % e)
+        self.write_report(report.as_dict())
+
+    def write_report(self, report: dict):
+        self.stdout.write("%(calls)s calls in %(duration).2fs, %(rate).1f calls/s" % report)
+        self.stdout.write("Status codes: %s" % ", ".join("%s=%s" % it for it in sorted(report["codes"].items())))
+        row = "%-50s %8s %10s %10s %10s %10s"
+        self.stdout.write(row % ("method", "calls", "p50, ms", "p90, ms", "p99, ms", "max, ms"))
+        for method, latency in list(report["methods"].items()) + [("total", report["latency"])]:
+            self.stdout.write(row % (
+                method,
+                latency["calls"],
+                "%.2f" % (latency["p50"] * 1000),
+                "%.2f" % (latency["p90"] * 1000),
+                "%.2f" % (latency["p99"] * 1000),
+                "%.2f" % (latency["max"] * 1000),
+            ))
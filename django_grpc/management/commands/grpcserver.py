@@ -8,8 +8,13 @@ from django.core.management.base import BaseCommand
 from django.utils import autoreload
 from django.conf import settings
 
+from django_grpc.aio import loop_lag_monitor, new_event_loop
+from django_grpc.channels import aio_channels
+from django_grpc.introspection import start_introspection_server
+from django_grpc.profiler import SamplingProfiler
 from django_grpc.signals import grpc_shutdown
 from django_grpc.utils import create_server, extract_handlers
+from django_grpc.warmup import run_warmup
 
 
 class Command(BaseCommand):
@@ -22,6 +27,11 @@ class Command(BaseCommand):
         self._shutdown_event = threading.Event()
         self._server = None
         self._original_sigterm_handler = None
+        # Event loop and its shutdown event in async mode
+        self._loop = None
+        self._async_shutdown_event = None
+        # Sampling profiler, started with --profile or SIGUSR2
+        self._profiler = None
 
     def add_arguments(self, parser):
         parser.add_argument("--max_workers", type=int, help="Number of workers")
@@ -33,6 +43,14 @@ class Command(BaseCommand):
             default=False,
             help="Print all registered endpoints",
         )
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            default=False,
+            help="Sample stacks of RPCs and write flamegraph files per method on shutdown",
+        )
+        parser.add_argument("--profile-dir", default="grpc-profile", help="Directory for flamegraph files")
+        parser.add_argument("--profile-interval", type=float, default=0.01, help="Sampling interval, seconds")
 
     def handle(self, *args, **options):
         is_async = self.config.get("async", False)
@@ -57,6 +75,10 @@ class Command(BaseCommand):
         
         # Also set SIGINT handler (Ctrl+C)
         signal.signal(signal.SIGINT, self._handle_sigterm)
+
+        # Start or stop profiler at runtime
+        if self._profiler is not None:
+            signal.signal(signal.SIGUSR2, self._profiler.toggle)
         
         self.stdout.write("Signal handlers registered for graceful shutdown")
 
@@ -64,6 +86,35 @@ class Command(BaseCommand):
         """Handle SIGTERM signal to start graceful shutdown"""
         self.stdout.write(f"Received signal {signum}. Starting graceful shutdown...")
         self._shutdown_event.set()
+        if self._loop is not None and self._async_shutdown_event is not None:
+            # Wake up the loop instead of polling the threading event
+            self._loop.call_soon_threadsafe(self._async_shutdown_event.set)
+
+    def _setup_profiler(self, profile=False, profile_dir="grpc-profile", profile_interval=0.01, **kwargs):
+        """Create profiler that can be toggled with SIGUSR2, start it right away with --profile"""
+        self._profiler = SamplingProfiler(profile_dir, interval=profile_interval)
+        if profile:
+            self._profiler.start()
+            self.stdout.write("Profiler is writing flamegraphs to %s" % profile_dir)
+
+    def _stop_profiler(self):
+        if self._profiler is not None and self._profiler.is_running:
+            for path in self._profiler.stop():
+                self.stdout.write("Flamegraph saved to %s" % path)
+
+    def _start_introspection(self):
+        """Start introspection service if it is enabled in settings"""
+        introspection = self.config.get("introspection", None)
+        if introspection is not None:
+            start_introspection_server(introspection["address"])
+            self.stdout.write("gRPC introspection service is listening %s" % introspection["address"])
+
+    def _warmup(self, server):
+        """Run warmup steps if they are enabled in settings, server starts serving only afterwards"""
+        warmup = self.config.get("warmup", None)
+        if warmup is not None:
+            self.stdout.write("Warming up...")
+            run_warmup(server, warmup)
 
     def _graceful_shutdown(self, server):
         """Gracefully shutdown the server"""
@@ -98,6 +149,9 @@ class Command(BaseCommand):
             
             # Send Django signal
             grpc_shutdown.send(None)
+
+            # Outbound aio channels can be closed only from the event loop
+            await aio_channels.close_all()
             
             self.stdout.write("Async graceful shutdown completed")
             
@@ -111,6 +165,8 @@ class Command(BaseCommand):
         autoreload.raise_last_exception()
         self.stdout.write("gRPC server starting at %s" % datetime.datetime.now())
 
+        self._setup_profiler(**kwargs)
+
         # Only setup signal handlers when not in autoreload mode
         # autoreload runs in a separate thread, not the main thread, so signal handlers cannot be registered
         if not kwargs.get("autoreload", False):
@@ -118,10 +174,12 @@ class Command(BaseCommand):
 
         server = create_server(max_workers, port)
         self._server = server
+        self._warmup(server)
 
         server.start()
 
         self.stdout.write("gRPC server is listening port %s" % port)
+        self._start_introspection()
 
         # Print handler list if list_handlers option is enabled (default: False)
         if kwargs.get("list_handlers", False):
@@ -146,6 +204,7 @@ class Command(BaseCommand):
             server.wait_for_termination()
             # Send shutdown signal to all connected receivers
             grpc_shutdown.send(None)
+        self._stop_profiler()
 
     def _serve_async(self, max_workers, port, *args, **kwargs):
         """
@@ -153,6 +212,8 @@ class Command(BaseCommand):
         """
         self.stdout.write("gRPC async server starting  at %s" % datetime.datetime.now())
 
+        self._setup_profiler(**kwargs)
+
         # Only setup signal handlers when not in autoreload mode
         # autoreload runs in a separate thread, not the main thread, so signal handlers cannot be registered
         if not kwargs.get("autoreload", False):
@@ -161,12 +222,21 @@ class Command(BaseCommand):
         # Coroutines to be invoked when the event loop is shutting down.
         _cleanup_coroutines = []
 
+        loop = new_event_loop(self.config.get("event_loop", "asyncio"))
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        loop_lag_monitor.interval = self.config.get("loop_lag_interval", loop_lag_monitor.interval)
+        loop_lag_monitor.threshold = self.config.get("loop_lag_threshold", loop_lag_monitor.threshold)
+
         server = create_server(max_workers, port)
         self._server = server
+        self._warmup(server)
 
         async def _main_routine():
             await server.start()
             self.stdout.write("gRPC async server is listening port %s" % port)
+            self._start_introspection()
+            lag_monitor_task = asyncio.create_task(loop_lag_monitor.run())
 
             # Print handler list if list_handlers option is enabled (default: False)
             if kwargs.get("list_handlers", False):
@@ -177,21 +247,22 @@ class Command(BaseCommand):
             # Only execute graceful shutdown logic when not in autoreload mode
             if not kwargs.get("autoreload", False):
                 # Wait for graceful shutdown
-                while not self._shutdown_event.is_set():
-                    await asyncio.sleep(0.1)
+                self._async_shutdown_event = asyncio.Event()
+                if not self._shutdown_event.is_set():
+                    await self._async_shutdown_event.wait()
 
                 # Perform graceful shutdown
                 await self._graceful_shutdown_async(server)
             else:
                 # Use original wait_for_termination for autoreload mode
                 await server.wait_for_termination()
+            lag_monitor_task.cancel()
 
         async def _graceful_shutdown():
             # Send the signal to all connected receivers on server shutdown.
             # https://github.com/gluk-w/django-grpc/issues/31
             grpc_shutdown.send(None)
 
-        loop = asyncio.get_event_loop()
         try:
             loop.run_until_complete(_main_routine())
         except KeyboardInterrupt:
@@ -203,5 +274,8 @@ class Command(BaseCommand):
                 # Ignore KeyboardInterrupt in autoreload mode and exit normally
                 pass
         finally:
-            loop.run_until_complete(*_cleanup_coroutines)
+            for coroutine in _cleanup_coroutines:
+                loop.run_until_complete(coroutine)
             loop.close()
+            self._loop = None
+            self._stop_profiler()
@@ -0,0 +1,136 @@
+"""
+In-process sampling profiler that attributes stacks to RPC methods.
+
+Started by `grpcserver --profile` or toggled at runtime with `kill -USR2 <pid>`. Each method gets a file
+in collapsed stack format that can be rendered with `flamegraph.pl` or https://www.speedscope.app/
+"""
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+
+from django_grpc.stats import registry
+
+
+logger = logging.getLogger(__name__)
+
+# Thread serves several RPCs at once, e.g. the event loop of async server
+MULTIPLE_CALLS = 'multiple'
+# Distinct stacks that don't fit into `max_stacks` are counted under this name
+TRUNCATED = '[truncated]'
+
+
+def collapse_stack(frame, max_depth: int) -> str:
+    names = []
+    while frame is not None and len(names) < max_depth:
+        code = frame.f_code
+        names.append('%s (%s)' % (code.co_name, code.co_filename))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Samples stacks of threads processing RPCs every `interval` seconds.
+    Memory is bounded by `max_stacks` distinct stacks per method.
+    """
+
+    def __init__(self, output_dir: str, interval: float = 0.01, max_stacks: int = 5000, max_depth: int = 64):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.max_depth = max_depth
+        self.samples = {}
+        self._lock = threading.Lock()
+        # Reentrant, toggle() runs as a signal handler and may interrupt start() or stop() of the main thread
+        self._state_lock = threading.RLock()
+        self._stopped = None
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        with self._state_lock:
+            if self._thread is not None:
+                return
+            # Each run has its own event, so a new run isn't affected by the previous one that is still stopping
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stopped,), name='grpc-profiler', daemon=True)
+            self._thread.start()
+        logger.info("Profiler started, sampling every %ss", self.interval)
+
+    def _detach(self):
+        """
+        Swaps out the running thread, so only one of concurrent stops gets it
+        """
+        with self._state_lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._stopped.set()
+        return thread
+
+    def _finish(self, thread) -> list:
+        thread.join()
+        return self.write()
+
+    def stop(self) -> list:
+        """
+        Stops sampling and writes collected stacks, returns list of written files
+        """
+        thread = self._detach()
+        if thread is None:
+            return []
+        return self._finish(thread)
+
+    def toggle(self, *args):
+        """
+        Can be used as a signal handler
+        """
+        thread = self._detach()
+        if thread is None:
+            self.start()
+        else:
+            # Signal handler doesn't wait for the last sample and writing of files
+            threading.Thread(target=self._finish, args=(thread,), name='grpc-profiler-stop').start()
+
+    def _run(self, stopped):
+        while not stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        methods = {}
+        for call in registry.get_active_calls():
+            methods[call.thread_id] = MULTIPLE_CALLS if call.thread_id in methods else call.method
+
+        own_thread = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            method = methods.get(thread_id)
+            if method is None or thread_id == own_thread:
+                continue
+            self.add(method, collapse_stack(frame, self.max_depth))
+
+    def add(self, method: str, stack: str):
+        with self._lock:
+            counter = self.samples.get(method)
+            if counter is None:
+                counter = self.samples[method] = Counter()
+            if stack not in counter and len(counter) >= self.max_stacks:
+                stack = TRUNCATED
+            counter[stack] += 1
+
+    def write(self) -> list:
+        with self._lock:
+            samples, self.samples = self.samples, {}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for method, counter in samples.items():
+            path = os.path.join(self.output_dir, '%s.collapsed' % method.strip('/').replace('/', '.'))
+            with open(path, 'w') as fp:
+                fp.writelines('%s %d\n' % (stack, count) for stack, count in counter.most_common())
+            paths.append(path)
+        logger.info("Profiler wrote %s files to %s", len(paths), self.output_dir)
+        return paths
@@ -0,0 +1,137 @@
+"""
+Replay of captured requests (see `django_grpc.interceptors.capture`) against a running server.
+"""
+import heapq
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent import futures
+from typing import Iterable, Union
+
+import grpc
+
+from django_grpc.interceptors.capture import UNARY_STREAM, CaptureRecord, read_capture
+
+# Code of calls that failed in the client without a status, e.g. broken metadata
+CLIENT_ERROR = 'CLIENT_ERROR'
+
+def read_captures(paths: list) -> Iterable['CaptureRecord']:
+    """
+    Merges capture files of several processes in the order requests were received
+    """
+    return heapq.merge(*(read_capture(path) for path in paths), key=lambda record: record.time)
+
+
+def _percentile(ordered: list, q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ReplayReport:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.codes = Counter()
+        self.started = time.monotonic()
+        self.duration = 0.0
+
+    def add(self, method: str, latency: float, code: Union['grpc.StatusCode', str]):
+        with self._lock:
+            self.latencies[method].append(latency)
+            self.codes[code.name if isinstance(code, grpc.StatusCode) else code] += 1
+
+    def summary(self, latencies: list) -> dict:
+        ordered = sorted(latencies)
+        return {
+            'calls': len(ordered),
+            'p50': _percentile(ordered, 0.5),
+            'p90': _percentile(ordered, 0.9),
+            'p99': _percentile(ordered, 0.99),
+            'max': ordered[-1] if ordered else 0.0,
+        }
+
+    def as_dict(self) -> dict:
+        calls = sum(self.codes.values())
+        return {
+            'calls': calls,
+            'duration': self.duration,
+            'rate': calls / self.duration if self.duration else 0.0,
+            'codes': dict(self.codes),
+            'latency': self.summary([it for latencies in self.latencies.values() for it in latencies]),
+            'methods': {method: self.summary(latencies) for method, latencies in sorted(self.latencies.items())},
+        }
+
+
+class Replayer:
+    """
+    Sends captured requests keeping their original timing divided by `speed`, `speed=None` sends them
+    as fast as `concurrency` allows. Requests and responses are not deserialized.
+
+    With `speed` latency is measured from the time a call was scheduled for, so when calls wait for a free slot
+    the delay is included in percentiles instead of being hidden by the late start (coordinated omission).
+    """
+
+    def __init__(self, channel: 'grpc.Channel', speed: float = 1.0, concurrency: int = 10, timeout: float = None):
+        self.channel = channel
+        self.speed = speed
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._callables = {}
+
+    def _get_callable(self, record: 'CaptureRecord'):
+        key = (record.kind, record.method)
+        if key not in self._callables:
+            if record.kind == UNARY_STREAM:
+                self._callables[key] = self.channel.unary_stream(record.method)
+            else:
+                self._callables[key] = self.channel.unary_unary(record.method)
+        return self._callables[key]
+
+    def call(self, record: 'CaptureRecord', report: 'ReplayReport', scheduled: float = None):
+        """
+        :param scheduled: `time.monotonic()` the call should have started at, now by default
+        """
+        started = time.monotonic() if scheduled is None else scheduled
+        code = grpc.StatusCode.OK
+        try:
+            response = self._get_callable(record)(record.request, metadata=record.metadata, timeout=self.timeout)
+            if record.kind == UNARY_STREAM:
+                # Latency of streams includes all responses
+                for _ in response:
+                    pass
+        except grpc.RpcError as e:
+            code = e.code()
+        except Exception:
+            # Would be swallowed by the future of the pool
+            code = CLIENT_ERROR
+        report.add(record.method, time.monotonic() - started, code)
+
+    def replay(self, records: Iterable['CaptureRecord'], limit: int = None) -> 'ReplayReport':
+        report = ReplayReport()
+        # Bounds calls in flight, so scheduler falls behind instead of queueing without limit
+        slots = threading.BoundedSemaphore(self.concurrency)
+        first_time = None
+
+        def run(record, scheduled):
+            try:
+                self.call(record, report, scheduled)
+            finally:
+                slots.release()
+
+        with futures.ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='grpc-replay') as pool:
+            for number, record in enumerate(records):
+                if limit is not None and number >= limit:
+                    break
+                if first_time is None:
+                    first_time = record.time
+                scheduled = None
+                if self.speed:
+                    scheduled = report.started + (record.time - first_time) / self.speed
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                slots.acquire()
+                pool.submit(run, record, scheduled)
+        report.duration = time.monotonic() - report.started
+        return report
@@ -1,12 +1,35 @@
+from functools import lru_cache
+
+from .aio import aiter_serialized, aserialize_instances, aserialize_model, aserialize_queryset  # noqa: F401
 from .base import BaseModelSerializer, message_to_python
+from .fieldmask import apply_field_mask, get_field_mask, parse_field_mask  # noqa: F401
+from .ingest import BulkIngest, IngestSummary, bulk_ingest  # noqa: F401
+from .packing import MessagePacker, apack_messages, aunpack_messages, pack_messages, unpack_messages  # noqa: F401
+from .pagination import InvalidPageToken, KeysetPaginator, Page, paginate  # noqa: F401
+from .values import ValuesSerializer
 
 
-def serialize_model(message_class, instance, serializers):
+def serialize_model(message_class, instance, serializers, field_mask=None):
     """
     Shortcut
     """
-    return BaseModelSerializer.serialize_model(message_class, instance, serializers)
+    return BaseModelSerializer.serialize_model(message_class, instance, serializers, field_mask)
 
 
 def deserialize_message(message) -> dict:
     return message_to_python(message)
+
+
+@lru_cache(maxsize=None)
+def get_values_serializer(message_class, model_class) -> ValuesSerializer:
+    """
+    Returns serializer with columns plan compiled once per message and model
+    """
+    return ValuesSerializer(message_class, model_class)
+
+
+def serialize_values(message_class, queryset) -> list:
+    """
+    Serialize queryset to a list of messages using `values_list()` instead of model instances
+    """
+    return get_values_serializer(message_class, queryset.model).serialize(queryset)
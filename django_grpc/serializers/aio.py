@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import prefetch_related_objects
+
+from .base import BaseModelSerializer
+from .fieldmask import filter_fields, parse_field_mask
+
+try:
+    from django.db.models import aprefetch_related_objects
+except ImportError:
+    # Django < 5.0
+    aprefetch_related_objects = sync_to_async(prefetch_related_objects)
+
+
+def get_relation_lookups(
+    message_class, model_class, field_mask=None, prefix: str = '', ancestors: frozenset = frozenset(),
+) -> list:
+    """
+    Returns `prefetch_related()` lookups of all relations the message is built from.
+    Without field mask self-referential relations (`Category.parent`) are prefetched one level deep,
+    deeper levels are prefetched only when the mask names them.
+    """
+    mask = parse_field_mask(field_mask)
+    # Mask is finite, but relations of a message that is already expanded above would be followed forever
+    if not mask and (message_class, model_class) in ancestors:
+        return []
+    ancestors = ancestors | {(message_class, model_class)}
+    lookups = []
+    for name, grpc_field in filter_fields(message_class.DESCRIPTOR.fields_by_name.items(), mask):
+        try:
+            field_meta = model_class._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+        if not field_meta.is_relation or grpc_field.message_type is None:
+            continue
+        lookups.append(prefix + name)
+        lookups += get_relation_lookups(
+            grpc_field.message_type._concrete_class,
+            field_meta.related_model,
+            mask[name] if mask else None,
+            prefix + name + '__',
+            ancestors,
+        )
+    return lookups
+
+
+async def aserialize_instances(message_class, instances: list, serializers=(), field_mask=None) -> list:
+    """
+    Prefetches relations of all instances at once and serializes them without further queries.
+    `get_<name>` methods of custom serializers must not query the database.
+    """
+    if not instances:
+        return []
+    lookups = get_relation_lookups(message_class, instances[0].__class__, field_mask)
+    if lookups:
+        await aprefetch_related_objects(instances, *lookups)
+    return [
+        BaseModelSerializer.serialize_model(message_class, instance, serializers, field_mask)
+        for instance in instances
+    ]
+
+
+async def aserialize_model(message_class, instance, serializers=(), field_mask=None):
+    messages = await aserialize_instances(message_class, [instance], serializers, field_mask)
+    return messages[0]
+
+
+async def aserialize_queryset(message_class, queryset, serializers=(), field_mask=None) -> list:
+    instances = [instance async for instance in queryset]
+    return await aserialize_instances(message_class, instances, serializers, field_mask)
+
+
+async def aiter_serialized(message_class, queryset, serializers=(), field_mask=None, chunk_size: int = 2000):
+    """
+    Streams messages from `QuerySet.aiterator()`, relations are prefetched per chunk
+    """
+    # Older Django doesn't support prefetch_related() with aiterator(), so lookups are applied per chunk
+    lookups = list(queryset._prefetch_related_lookups)
+    lookups += get_relation_lookups(message_class, queryset.model, field_mask)
+    queryset = queryset.prefetch_related(None)
+
+    chunk = []
+    async for instance in queryset.aiterator(chunk_size=chunk_size):
+        chunk.append(instance)
+        if len(chunk) == chunk_size:
+            async for message in _aserialize_chunk(message_class, chunk, lookups, serializers, field_mask):
+                yield message
+            chunk = []
+    async for message in _aserialize_chunk(message_class, chunk, lookups, serializers, field_mask):
+        yield message
+
+
+async def _aserialize_chunk(message_class, instances, lookups, serializers, field_mask):
+    if instances and lookups:
+        await aprefetch_related_objects(instances, *lookups)
+    for instance in instances:
+        yield BaseModelSerializer.serialize_model(message_class, instance, serializers, field_mask)
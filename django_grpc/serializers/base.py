@@ -4,19 +4,21 @@ from typing import Iterable
 from django.db.models import ForeignKey, Model
 from django.db.models.fields.reverse_related import ForeignObjectRel
 
+from .fieldmask import filter_fields, parse_field_mask
+
 
 class BaseModelSerializer:
     def __init__(self, model_class, serializers=None):
         self.model_class = model_class
         self.serializers = serializers
 
-    def _to_dict(self, grpc_fields, instance):
+    def _to_dict(self, grpc_fields, instance, mask=None):
         return {
-            name: self._get_field_value(grpc_field, name, instance)
-            for name, grpc_field in grpc_fields
+            name: self._get_field_value(grpc_field, name, instance, mask[name] if mask else None)
+            for name, grpc_field in filter_fields(grpc_fields, mask)
         }
 
-    def _get_field_value(self, grpc_field, name, instance):
+    def _get_field_value(self, grpc_field, name, instance, mask=None):
         if instance is None:
             return None
 
@@ -29,12 +31,13 @@ class BaseModelSerializer:
         field_value = getattr(instance, name)
         field_meta = instance._meta.get_field(name)
         if isinstance(field_meta, ForeignObjectRel):
-            return self._serialize_model_relations(grpc_field, field_value.all(), self.serializers)
+            return self._serialize_model_relations(grpc_field, field_value.all(), self.serializers, mask)
         elif isinstance(field_meta, ForeignKey):
             return self.serialize_model(
                 self.get_grpc_message_class(grpc_field),
                 field_value,
-                self.serializers
+                self.serializers,
+                mask,
             )
         else:
             return field_value
@@ -45,16 +48,21 @@ class BaseModelSerializer:
         return serializer_candidates[0] if len(serializer_candidates) else cls(instance.__class__, serializers)
 
     @classmethod
-    def serialize_model(cls, message_class, instance: 'Model', serializers):
+    def serialize_model(cls, message_class, instance: 'Model', serializers, field_mask=None):
+        """
+        Fields outside of `field_mask` are neither evaluated nor set in the message
+        """
         serializer = cls.find_for_model(instance, serializers)
         serializer.serializers = serializers
-        return message_class(**serializer._to_dict(message_class.DESCRIPTOR.fields_by_name.items(), instance))
+        return message_class(**serializer._to_dict(
+            message_class.DESCRIPTOR.fields_by_name.items(), instance, parse_field_mask(field_mask),
+        ))
 
     @classmethod
-    def _serialize_model_relations(cls, grpc_field, related_items, serializers):
+    def _serialize_model_relations(cls, grpc_field, related_items, serializers, mask=None):
         message_class = cls.get_grpc_message_class(grpc_field)
         return [
-            cls.serialize_model(message_class, it, serializers)
+            cls.serialize_model(message_class, it, serializers, mask)
             for it in related_items
         ]
 
@@ -0,0 +1,148 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignKey, Prefetch
+from django.db.models.fields.reverse_related import ForeignObjectRel
+from google.protobuf.field_mask_pb2 import FieldMask
+
+# Metadata key with comma-separated paths, used when request message has no FieldMask field
+FIELD_MASK_METADATA_KEY = 'x-field-mask'
+
+
+def parse_field_mask(field_mask) -> dict:
+    """
+    Converts `FieldMask`, list of paths or comma-separated string to a tree, e.g.
+    ``['title', 'author.name']`` -> ``{'title': {}, 'author': {'name': {}}}``.
+    Empty subtree means that all fields of the nested message are requested.
+    """
+    if field_mask is None or isinstance(field_mask, dict):
+        return field_mask
+    if isinstance(field_mask, FieldMask):
+        paths = field_mask.paths
+    elif isinstance(field_mask, str):
+        paths = field_mask.split(',')
+    else:
+        paths = field_mask
+
+    tree = {}
+    for path in paths:
+        parts = path.strip().split('.')
+        if not parts[0]:
+            continue
+        node = tree
+        for name in parts[:-1]:
+            if node.get(name, None) == {}:
+                # Whole message is already requested
+                break
+            node = node.setdefault(name, {})
+        else:
+            node[parts[-1]] = {}
+    return tree
+
+
+def get_field_mask(request, context, field: str = 'field_mask', metadata_key: str = FIELD_MASK_METADATA_KEY):
+    """
+    Returns tree of requested fields from `request.<field>` or invocation metadata, None if fields are not limited
+    """
+    if field in request.DESCRIPTOR.fields_by_name and request.HasField(field):
+        return parse_field_mask(getattr(request, field))
+    for key, value in context.invocation_metadata() or ():
+        if key == metadata_key:
+            return parse_field_mask(value)
+    return None
+
+
+def filter_fields(fields, mask: dict):
+    """
+    Leaves message fields listed in the mask
+    """
+    if not mask:
+        return fields
+    return [(name, grpc_field) for name, grpc_field in fields if name in mask]
+
+
+def apply_field_mask(queryset, message_class, field_mask):
+    """
+    Narrows queryset to columns and relations needed for the masked message:
+    `only()` concrete fields, `select_related()` masked foreign keys and `prefetch_related()` masked
+    reverse relations. Existing prefetches of relations outside the mask are dropped.
+    Columns are not narrowed if the mask names no concrete fields, e.g. only computed ones.
+    """
+    mask = parse_field_mask(field_mask)
+    if not mask:
+        return queryset
+    return _narrow(queryset, message_class, mask)
+
+
+def _narrow(queryset, message_class, mask: dict, extra_only=(), ancestors=frozenset(), follow_relations=True):
+    only, select_related, prefetches = _plan(
+        queryset.model, message_class, mask, '', ancestors, follow_relations,
+    )
+    lookups = [
+        lookup for lookup in queryset._prefetch_related_lookups
+        if _lookup_path(lookup).split('__')[0] in mask
+    ]
+    prefetched = {_lookup_path(lookup) for lookup in lookups}
+    lookups += [prefetch for prefetch in prefetches if prefetch.prefetch_through not in prefetched]
+
+    queryset = queryset.prefetch_related(None)
+    # Mask of computed fields and relations only, instances would load every other column one by one
+    if only:
+        queryset = queryset.only(*only, *extra_only)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups)
+    return queryset
+
+
+def _lookup_path(lookup) -> str:
+    return lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+
+
+def _plan(model_class, message_class, mask: dict, prefix: str, ancestors: frozenset, follow_relations: bool):
+    ancestors = ancestors | {(message_class, model_class)}
+    only = []
+    select_related = []
+    prefetches = []
+    for name, grpc_field in filter_fields(message_class.DESCRIPTOR.fields_by_name.items(), mask):
+        try:
+            field_meta = model_class._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Computed by serializer method, fields it needs are unknown
+            continue
+
+        if grpc_field.message_type is not None and field_meta.is_relation:
+            if not follow_relations:
+                if isinstance(field_meta, ForeignKey):
+                    only.append(prefix + name)
+                continue
+            nested_message = grpc_field.message_type._concrete_class
+            nested_mask = mask.get(name)
+            # Whole message of a self-referential relation (`Category.parent`) is expanded one level deep,
+            # otherwise its relations would be expanded forever
+            nested_follow = bool(nested_mask) or (nested_message, field_meta.related_model) not in ancestors
+            nested_mask = nested_mask or {field.name: {} for field in grpc_field.message_type.fields}
+        if isinstance(field_meta, ForeignKey) and grpc_field.message_type is not None:
+            only.append(prefix + name)
+            select_related.append(prefix + name)
+            nested_only, nested_select, nested_prefetches = _plan(
+                field_meta.related_model, nested_message, nested_mask, prefix + name + '__',
+                ancestors, nested_follow,
+            )
+            only += nested_only
+            select_related += nested_select
+            prefetches += nested_prefetches
+        elif isinstance(field_meta, ForeignObjectRel) or field_meta.many_to_many:
+            if grpc_field.message_type is None:
+                continue
+            # Prefetch matches related rows to parents by the foreign key
+            extra_only = ()
+            if isinstance(field_meta, ForeignObjectRel) and not field_meta.many_to_many:
+                extra_only = (field_meta.field.name,)
+            related_queryset = _narrow(
+                field_meta.related_model._default_manager.all(), nested_message, nested_mask, extra_only,
+                ancestors, nested_follow,
+            )
+            prefetches.append(Prefetch(prefix + name, queryset=related_queryset))
+        elif field_meta.concrete:
+            only.append(prefix + name)
+    return only, select_related, prefetches
@@ -0,0 +1,159 @@
+from typing import Iterable, List, NamedTuple, Optional
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+
+
+class IngestSummary(NamedTuple):
+    received: int
+    saved: int
+    batches: int
+
+
+class BulkIngest:
+    """
+    Saves messages from client stream to database in batches.
+
+    Messages are converted to model instances through the mapping of descriptor fields to model fields.
+    Scalar message fields are matched by model field name or attname, so foreign keys can be passed
+    as `author` or `author_id`. Only one batch is kept in memory at a time.
+
+    Every mapped field is taken from the message, proto3 zero values included, so updates write what the client
+    sent instead of model defaults. Fields with presence (`optional`) are taken only when set. Zero primary key
+    and foreign key mean that they are not set.
+    """
+    MODES = ('create', 'update')
+
+    def __init__(
+        self,
+        model_class,
+        batch_size: int = 1000,
+        mode: str = 'create',
+        ignore_conflicts: bool = False,
+        update_conflicts: bool = False,
+        unique_fields: Optional[List[str]] = None,
+        update_fields: Optional[List[str]] = None,
+        using: Optional[str] = None,
+    ):
+        """
+        :param model_class: Django model to save messages as
+        :param batch_size: Number of instances written by a single query
+        :param mode: "create" uses `bulk_create()`, "update" uses `bulk_update()` and requires primary key in messages
+        :param ignore_conflicts: Skip rows that violate unique constraints (create mode)
+        :param update_conflicts: Update existing rows on conflict, aka upsert (create mode)
+        :param unique_fields: Fields that identify conflicting rows for upsert
+        :param update_fields: Fields to update on conflict or in "update" mode
+        :param using: Database alias
+        """
+        if mode not in self.MODES:
+            raise ImproperlyConfigured("Unknown ingest mode '%s', use one of %s" % (mode, self.MODES))
+        if batch_size <= 0:
+            raise ImproperlyConfigured('batch_size must be greater than 0')
+        if mode == 'update' and not update_fields:
+            raise ImproperlyConfigured('update_fields are required in "update" mode')
+
+        self.model_class = model_class
+        self.batch_size = batch_size
+        self.mode = mode
+        self.ignore_conflicts = ignore_conflicts
+        self.update_conflicts = update_conflicts
+        self.unique_fields = unique_fields
+        self.update_fields = update_fields
+        self.using = using
+        # Message full name -> {message field: (model attname, whether field has presence, whether zero is unset)}
+        self._mappings = {}
+
+    def _get_mapping(self, descriptor) -> dict:
+        mapping = self._mappings.get(descriptor.full_name)
+        if mapping is None:
+            mapping = self._mappings[descriptor.full_name] = self._build_mapping(descriptor)
+        return mapping
+
+    def _build_mapping(self, descriptor) -> dict:
+        mapping = {}
+        for name, grpc_field in descriptor.fields_by_name.items():
+            if grpc_field.message_type is not None:
+                # Nested and repeated messages can't be stored in a single row
+                continue
+            try:
+                field_meta = self.model_class._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if not field_meta.concrete or field_meta.many_to_many:
+                continue
+            # Foreign keys are found by name and attname, both are stored as id
+            mapping[name] = (
+                field_meta.attname, grpc_field.has_presence, field_meta.primary_key or field_meta.is_relation,
+            )
+        return mapping
+
+    def to_instance(self, message):
+        kwargs = {}
+        for name, (attname, has_presence, zero_is_unset) in self._get_mapping(message.DESCRIPTOR).items():
+            if has_presence and not message.HasField(name):
+                continue
+            value = getattr(message, name)
+            if zero_is_unset and not value:
+                value = None
+            # Another alias of the field, e.g. `author` and `author_id`, could be set already
+            if value is None and kwargs.get(attname) is not None:
+                continue
+            kwargs[attname] = value
+        return self.model_class(**kwargs)
+
+    def flush(self, instances: list) -> int:
+        """
+        Writes batch of instances and returns number of saved rows.
+        With `ignore_conflicts` databases don't report skipped rows, so every instance of the batch is counted.
+        """
+        manager = self.model_class._default_manager
+        if self.using is not None:
+            manager = manager.db_manager(self.using)
+
+        if self.mode == 'update':
+            return manager.bulk_update(instances, self.update_fields)
+
+        manager.bulk_create(
+            instances,
+            ignore_conflicts=self.ignore_conflicts,
+            update_conflicts=self.update_conflicts,
+            unique_fields=self.unique_fields,
+            update_fields=self.update_fields,
+        )
+        return len(instances)
+
+    def ingest(self, request_iterator: Iterable) -> IngestSummary:
+        received = saved = batches = 0
+        batch = []
+        for message in request_iterator:
+            received += 1
+            batch.append(self.to_instance(message))
+            if len(batch) >= self.batch_size:
+                saved += self.flush(batch)
+                batches += 1
+                batch = []
+
+        if batch:
+            saved += self.flush(batch)
+            batches += 1
+
+        return IngestSummary(received=received, saved=saved, batches=batches)
+
+
+def bulk_ingest(request_iterator: Iterable, model_class, response_class=None, **kwargs):
+    """
+    Consumes client stream and saves messages with batched `bulk_create()` or `bulk_update()`.
+    Returns `IngestSummary` or, if `response_class` is given, message filled with summary values
+    of the fields it declares.
+
+    Keyword arguments are passed to `BulkIngest`.
+    """
+    summary = BulkIngest(model_class, **kwargs).ingest(request_iterator)
+    if response_class is None:
+        return summary
+
+    fields = response_class.DESCRIPTOR.fields_by_name
+    return response_class(**{
+        name: value
+        for name, value in summary._asdict().items()
+        if name in fields
+    })
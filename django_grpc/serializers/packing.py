@@ -0,0 +1,104 @@
+from django.conf import settings
+
+# Default `grpc.max_receive_message_length` of clients
+DEFAULT_MAX_MESSAGE_LENGTH = 4 * 1024 * 1024
+
+
+def get_max_message_length() -> int:
+    """
+    Returns `grpc.max_send_message_length` from GRPCSERVER['options'] or the default receive limit of clients
+    """
+    options = dict(getattr(settings, 'GRPCSERVER', dict()).get('options', []))
+    limit = options.get('grpc.max_send_message_length', -1)
+    return min(limit, DEFAULT_MAX_MESSAGE_LENGTH) if limit > 0 else DEFAULT_MAX_MESSAGE_LENGTH
+
+
+def _varint_size(value: int) -> int:
+    return max(1, (value.bit_length() + 6) // 7)
+
+
+class MessagePacker:
+    """
+    Packs messages into repeated field of an envelope message up to `max_rows` items or `max_bytes` of
+    serialized envelope. Item that alone exceeds `max_bytes` is sent in its own envelope.
+    """
+
+    def __init__(self, envelope_class, field: str = 'items', max_rows: int = 1000, max_bytes: int = None):
+        self.envelope_class = envelope_class
+        self.field = field
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes or get_max_message_length()
+        self._tag_size = _varint_size(envelope_class.DESCRIPTOR.fields_by_name[field].number << 3)
+        self._batch = []
+        self._size = 0
+
+    def add(self, message):
+        """
+        Returns full envelope that must be sent before the message, otherwise None
+        """
+        # Size of length-delimited field: tag, length and payload
+        size = message.ByteSize()
+        size += self._tag_size + _varint_size(size)
+        envelope = None
+        if self._batch and (len(self._batch) >= self.max_rows or self._size + size > self.max_bytes):
+            envelope = self.flush()
+        self._batch.append(message)
+        self._size += size
+        return envelope
+
+    def flush(self):
+        """
+        Returns envelope with pending messages, None if there are none
+        """
+        if not self._batch:
+            return None
+        envelope = self.envelope_class()
+        getattr(envelope, self.field).extend(self._batch)
+        self._batch = []
+        self._size = 0
+        return envelope
+
+
+def pack_messages(messages, envelope_class, field: str = 'items', max_rows: int = 1000, max_bytes: int = None):
+    """
+    Packs iterable of messages into envelopes for server-streaming responses
+    """
+    packer = MessagePacker(envelope_class, field, max_rows, max_bytes)
+    for message in messages:
+        envelope = packer.add(message)
+        if envelope is not None:
+            yield envelope
+    envelope = packer.flush()
+    if envelope is not None:
+        yield envelope
+
+
+async def apack_messages(messages, envelope_class, field: str = 'items', max_rows: int = 1000, max_bytes: int = None):
+    """
+    Same as `pack_messages()` for async iterables, e.g. `aiter_serialized()`
+    """
+    packer = MessagePacker(envelope_class, field, max_rows, max_bytes)
+    async for message in messages:
+        envelope = packer.add(message)
+        if envelope is not None:
+            yield envelope
+    envelope = packer.flush()
+    if envelope is not None:
+        yield envelope
+
+
+def unpack_messages(envelopes, field: str = 'items'):
+    """
+    Client side: iterates over messages of a packed stream
+    """
+    for envelope in envelopes:
+        yield from getattr(envelope, field)
+
+
+async def aunpack_messages(envelopes, field: str = 'items'):
+    """
+    Same as `unpack_messages()` for streams of `grpc.aio` stubs
+    """
+    async for envelope in envelopes:
+        for message in getattr(envelope, field):
+            yield message
@@ -0,0 +1,132 @@
+import datetime
+import json
+from typing import NamedTuple
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+from .values import ValuesSerializer
+
+SALT = 'django_grpc.serializers.pagination'
+
+
+class InvalidPageToken(ValueError):
+    """
+    Token is malformed, forged or was issued for another ordering
+    """
+
+
+class Page(NamedTuple):
+    items: list
+    next_page_token: str
+
+
+class _KeyEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder cuts microseconds, seek from a rounded value would return the same rows again
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _TokenSerializer:
+    """
+    JSON that also accepts dates, decimals and UUIDs without loss of precision.
+    They are decoded as strings and converted back by model fields of the seek lookups.
+    """
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'), cls=_KeyEncoder).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+class KeysetPaginator:
+    """
+    Pages through queryset with keyset seeks (`WHERE (a, b) > (last_a, last_b)`) instead of OFFSET,
+    so the cost of a page does not depend on its depth.
+
+    Primary key is appended to `ordering` to make it unique. Fields of `ordering` must not be NULL.
+    """
+
+    def __init__(self, queryset, message_class, ordering, page_size: int = 100, max_page_size: int = 1000):
+        self.ordering = tuple(ordering)
+        if not {'pk', 'id', '-pk', '-id'} & set(self.ordering):
+            self.ordering += ('pk',)
+        self.queryset = queryset.order_by(*self.ordering)
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.serializer = ValuesSerializer(message_class, queryset.model)
+        self._keys = [field.lstrip('-') for field in self.ordering]
+        # Key values are fetched after message columns
+        self._columns = self.serializer.columns + self._keys
+
+    def encode_token(self, values) -> str:
+        return signing.dumps(
+            {'o': self.ordering, 'k': list(values)}, salt=SALT, serializer=_TokenSerializer, compress=True,
+        )
+
+    def decode_token(self, token: str) -> list:
+        try:
+            data = signing.loads(token, salt=SALT, serializer=_TokenSerializer)
+        except (signing.BadSignature, ValueError):
+            raise InvalidPageToken("Invalid page token")
+        if tuple(data['o']) != self.ordering or len(data['k']) != len(self.ordering):
+            raise InvalidPageToken("Page token was issued for another ordering")
+        return data['k']
+
+    def seek(self, queryset, values):
+        """
+        Filters rows that follow `values` in the ordering
+        """
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            lookup = '%s__%s' % (self._keys[i], 'lt' if field.startswith('-') else 'gt')
+            step = Q(**{lookup: values[i]})
+            for key, value in zip(self._keys[:i], values[:i]):
+                step &= Q(**{key: value})
+            condition |= step
+        return queryset.filter(condition)
+
+    def _fetch(self, values, limit: int) -> list:
+        queryset = self.queryset if values is None else self.seek(self.queryset, values)
+        return list(queryset.values_list(*self._columns)[:limit])
+
+    def _row_keys(self, row) -> list:
+        return list(row[len(self.serializer.columns):])
+
+    def page(self, page_token: str = '', page_size: int = None) -> 'Page':
+        """
+        Returns serialized messages and token of the next page, empty if this page is the last
+        """
+        page_size = min(page_size or self.page_size, self.max_page_size)
+        values = self.decode_token(page_token) if page_token else None
+        # One extra row tells whether the next page exists
+        rows = self._fetch(values, page_size + 1)
+        next_page_token = ''
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_page_token = self.encode_token(self._row_keys(rows[-1]))
+        return Page([self.serializer._build(row) for row in rows], next_page_token)
+
+    def iterator(self, chunk_size: int = 1000, page_token: str = ''):
+        """
+        Walks whole keyset range, every chunk is a separate short query
+        """
+        values = self.decode_token(page_token) if page_token else None
+        while True:
+            rows = self._fetch(values, chunk_size)
+            for row in rows:
+                yield self.serializer._build(row)
+            if len(rows) < chunk_size:
+                return
+            values = self._row_keys(rows[-1])
+
+
+def paginate(queryset, message_class, ordering, page_token: str = '', page_size: int = 100) -> 'Page':
+    """
+    Shortcut for list RPCs, raises `InvalidPageToken`
+    """
+    return KeysetPaginator(queryset, message_class, ordering, page_size=page_size).page(page_token)
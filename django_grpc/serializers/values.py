@@ -0,0 +1,80 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import ForeignKey
+from google.protobuf.descriptor import FieldDescriptor
+
+
+class ValuesSerializer:
+    """
+    Serializes querysets to gRPC messages without instantiating models.
+
+    Columns are taken from the message descriptor and fetched with ``values_list()``.
+    Nested messages of foreign keys are filled from joined columns (``author__name``).
+    Message fields that are not backed by a column (reverse relations, many-to-many,
+    fields missing on the model) are left empty. Self-referential relations
+    (``Category.parent``) are filled one level deep.
+    """
+
+    def __init__(self, message_class, model_class):
+        self.message_class = message_class
+        self.model_class = model_class
+        self.columns = []
+        self._column_index = {}
+        self._build = self._compile(message_class, model_class, '', frozenset())
+
+    def _column(self, path: str) -> int:
+        """
+        Returns position of the column in fetched rows
+        """
+        index = self._column_index.get(path)
+        if index is None:
+            index = self._column_index[path] = len(self.columns)
+            self.columns.append(path)
+        return index
+
+    def _compile(self, message_class, model_class, prefix: str, ancestors: frozenset):
+        scalars = []
+        nested = []
+        # Relations of a message that is already being compiled above would be followed forever
+        follow_relations = (message_class, model_class) not in ancestors
+        ancestors = ancestors | {(message_class, model_class)}
+        for name, grpc_field in message_class.DESCRIPTOR.fields_by_name.items():
+            try:
+                field_meta = model_class._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if not field_meta.concrete or field_meta.many_to_many:
+                continue
+
+            path = prefix + name
+            if isinstance(field_meta, ForeignKey) and grpc_field.type == FieldDescriptor.TYPE_MESSAGE:
+                if not follow_relations:
+                    continue
+                # Value of FK column tells whether related row exists
+                nested.append((
+                    name,
+                    self._column(path),
+                    self._compile(
+                        grpc_field.message_type._concrete_class, field_meta.related_model, path + '__', ancestors,
+                    ),
+                ))
+            else:
+                scalars.append((name, self._column(path)))
+
+        def build(row):
+            kwargs = {name: row[index] for name, index in scalars}
+            for name, index, build_nested in nested:
+                if row[index] is not None:
+                    kwargs[name] = build_nested(row)
+            return message_class(**kwargs)
+
+        return build
+
+    def serialize(self, queryset) -> list:
+        return [self._build(row) for row in queryset.values_list(*self.columns)]
+
+    def iterator(self, queryset, chunk_size: int = 2000):
+        """
+        Same as `serialize()` but streams rows from database cursor
+        """
+        for row in queryset.values_list(*self.columns).iterator(chunk_size=chunk_size):
+            yield self._build(row)
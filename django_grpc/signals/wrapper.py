@@ -1,42 +1,58 @@
+import inspect
 from functools import wraps
 from typing import Dict
 
 import grpc
 from grpc._utilities import RpcMethodHandler
 
+from django_grpc.bulkheads import bulkhead_wrapper, find_bulkhead
 from django_grpc.signals import grpc_request_started, grpc_got_request_exception, grpc_request_finished
+from django_grpc.stats import registry
 
 
 class SignalWrapper:
     """
-    Wraps all RPC handlers to emit signal before and after each RPC
+    Wraps all RPC handlers to emit signal before and after each RPC and count them in `django_grpc.stats`
     """
     # Names of properties that can hold RPC callback
     METHOD_PROPERTIES = ('unary_unary', 'unary_stream', 'stream_unary', 'stream_stream')
 
-    def __init__(self, server: 'grpc.Server'):
+    def __init__(self, server: 'grpc.Server', bulkheads: list = None):
         self.server = server
+        self.is_async = isinstance(server, grpc.aio.Server)
+        self.bulkheads = bulkheads or []
 
     def add_generic_rpc_handlers(self, generic_rpc_handlers: tuple):
         """
         This method does the magic. It must have same interface as `grpc.Server.add_generic_rpc_handlers`
         """
         generic_rpc_handlers[0]._method_handlers = {
-            key: self._replace_method_handler(method_handler)
+            key: self._replace_method_handler(key, method_handler)
             for key, method_handler in generic_rpc_handlers[0]._method_handlers.items()
         }
         self.server.add_generic_rpc_handlers(generic_rpc_handlers)
 
-    def _replace_method_handler(self, method_handler: 'RpcMethodHandler') -> 'RpcMethodHandler':
+    def _replace_method_handler(self, method: str, method_handler: 'RpcMethodHandler') -> 'RpcMethodHandler':
         """
         Creates identical instance of RpcMethodHandler() with wrapped method handler.
         """
+        registry.register(method)
         kwargs = {
             prop: getattr(method_handler, prop)
             for prop in method_handler._fields
         }
-        kwargs['unary_unary'] = _unary_unary(kwargs['unary_unary'])
-        kwargs['unary_stream'] = _unary_stream(kwargs['unary_stream'])
+        bulkhead = find_bulkhead(self.bulkheads, method)
+        if bulkhead is not None:
+            # Calls wait for a slot inside of signals, so waiting time is included in stats
+            kwargs['unary_unary'] = bulkhead_wrapper(kwargs['unary_unary'], bulkhead)
+            kwargs['unary_stream'] = bulkhead_wrapper(kwargs['unary_stream'], bulkhead, stream=True)
+        if self.is_async:
+            # Sync handlers are run by grpc.aio in the thread pool, so signals are sent from the same thread
+            kwargs['unary_unary'] = _aio_wrapper(kwargs['unary_unary'], method, _unary_unary)
+            kwargs['unary_stream'] = _aio_wrapper(kwargs['unary_stream'], method, _unary_stream)
+        else:
+            kwargs['unary_unary'] = _unary_unary(kwargs['unary_unary'], method)
+            kwargs['unary_stream'] = _unary_stream(kwargs['unary_stream'], method)
         # @TODO add support for stream-unary and stream-stream methods
         # kwargs['stream_unary'] = _unary_stream(kwargs['stream_unary'])
         # kwargs['stream_stream'] = _unary_stream(kwargs['stream_stream'])
@@ -53,39 +69,101 @@ class SignalWrapper:
         pass
 
 
-def _unary_unary(func):
+def _unary_unary(func, method):
     if func is None:
         return
 
     @wraps(func)
     def inner(*args, **kwargs):
+        registry.start(method)
         grpc_request_started.send(None, request=args[0], context=args[1])
         try:
             response = func(*args, **kwargs)
         except Exception as exc:
+            registry.finish(exception=exc)
             grpc_got_request_exception.send(None, request=args[0], context=args[1], exception=exc)
             raise
         else:
+            registry.finish()
             grpc_request_finished.send(None, request=args[0], context=args[1])
         return response
 
     return inner
 
 
-def _unary_stream(func):
+def _unary_stream(func, method):
     if func is None:
         return
 
     @wraps(func)
     def inner(*args, **kwargs):
+        call = registry.start(method)
         grpc_request_started.send(None, request=args[0], context=args[1])
         try:
             for it in func(*args, **kwargs):
                 yield it
         except Exception as exc:
+            registry.finish(call, exc)
+            grpc_got_request_exception.send(None, request=args[0], context=args[1], exception=exc)
+            raise
+        else:
+            registry.finish(call)
+            grpc_request_finished.send(None, request=args[0], context=args[1])
+        finally:
+            # Does nothing unless generator was closed early, e.g. client went away
+            registry.finish(call)
+
+    return inner
+
+
+def _aio_wrapper(func, method, sync_wrapper):
+    """
+    Picks wrapper by handler type, so sync and async handlers can be mixed in one servicer
+    """
+    if inspect.isasyncgenfunction(func):
+        return _async_unary_stream(func, method)
+    # Also covers streaming handlers that write responses with `context.write()`
+    if inspect.iscoroutinefunction(func):
+        return _async_unary_unary(func, method)
+    return sync_wrapper(func, method)
+
+
+def _async_unary_unary(func, method):
+    @wraps(func)
+    async def inner(*args, **kwargs):
+        registry.start(method)
+        grpc_request_started.send(None, request=args[0], context=args[1])
+        try:
+            response = await func(*args, **kwargs)
+        except Exception as exc:
+            registry.finish(exception=exc)
+            grpc_got_request_exception.send(None, request=args[0], context=args[1], exception=exc)
+            raise
+        else:
+            registry.finish()
+            grpc_request_finished.send(None, request=args[0], context=args[1])
+        return response
+
+    return inner
+
+
+def _async_unary_stream(func, method):
+    @wraps(func)
+    async def inner(*args, **kwargs):
+        call = registry.start(method)
+        grpc_request_started.send(None, request=args[0], context=args[1])
+        try:
+            async for it in func(*args, **kwargs):
+                yield it
+        except Exception as exc:
+            registry.finish(call, exc)
             grpc_got_request_exception.send(None, request=args[0], context=args[1], exception=exc)
             raise
         else:
+            registry.finish(call)
             grpc_request_finished.send(None, request=args[0], context=args[1])
+        finally:
+            # Does nothing unless generator was closed early, e.g. client went away
+            registry.finish(call)
 
     return inner
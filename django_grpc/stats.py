@@ -0,0 +1,204 @@
+"""
+Always-on counters of RPCs updated by the wrapper layer (see `django_grpc.signals.wrapper`).
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+# Upper bounds of latency buckets, seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'),
+)
+
+# Call that is being processed by the current thread or task
+current_call = ContextVar('current_call', default=None)
+
+
+class ActiveCall:
+    __slots__ = ('method', 'started', 'thread_id')
+
+    def __init__(self, method: str):
+        self.method = method
+        self.started = time.monotonic()
+        self.thread_id = threading.get_ident()
+
+
+class MethodStats:
+    __slots__ = ('calls', 'errors', 'in_flight', 'total_time', 'max_time', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def percentile(self, q: float) -> float:
+        """
+        Approximate percentile, upper bound of the bucket it falls into
+        """
+        threshold = q * self.calls
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            cumulative += count
+            if cumulative >= threshold and cumulative:
+                return min(bound, self.max_time)
+        return 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'latency': {
+                'mean': self.total_time / self.calls if self.calls else 0.0,
+                'max': self.max_time,
+                'p50': self.percentile(0.5),
+                'p90': self.percentile(0.9),
+                'p99': self.percentile(0.99),
+            },
+        }
+
+
+class CompressionStats:
+    __slots__ = ('compressed', 'skipped', 'sampled', 'sampled_bytes', 'sampled_compressed_bytes', 'sampled_cpu_time')
+
+    def __init__(self):
+        self.compressed = 0
+        self.skipped = 0
+        self.sampled = 0
+        self.sampled_bytes = 0
+        self.sampled_compressed_bytes = 0
+        self.sampled_cpu_time = 0.0
+
+    def as_dict(self) -> dict:
+        megabytes = self.sampled_bytes / (1024 * 1024)
+        return {
+            'compressed': self.compressed,
+            'skipped': self.skipped,
+            'sampled': self.sampled,
+            'ratio': self.sampled_compressed_bytes / self.sampled_bytes if self.sampled_bytes else None,
+            'cpu_seconds_per_mb': self.sampled_cpu_time / megabytes if megabytes else None,
+        }
+
+
+class StatsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.methods = {}
+        self.active_calls = {}
+        self.pools = {}
+        self.bulkheads = {}
+        self.compression = {}
+
+    def register(self, method: str):
+        with self._lock:
+            self.methods.setdefault(method, MethodStats())
+
+    def track_pool(self, name: str, pool):
+        """
+        Registers ThreadPoolExecutor to report its state
+        """
+        self.pools[name] = pool
+
+    def track_bulkhead(self, bulkhead):
+        self.bulkheads[bulkhead.name] = bulkhead
+
+    def record_compression(
+        self, method: str, compressed: bool, size: int = None, compressed_size: int = None, cpu_time: float = None,
+    ):
+        """
+        Counts response message that was or wasn't compressed, sampled messages also have sizes and CPU time
+        """
+        with self._lock:
+            stats = self.compression.get(method)
+            if stats is None:
+                stats = self.compression[method] = CompressionStats()
+            if not compressed:
+                stats.skipped += 1
+                return
+            stats.compressed += 1
+            if size is not None:
+                stats.sampled += 1
+                stats.sampled_bytes += size
+                stats.sampled_compressed_bytes += compressed_size
+                stats.sampled_cpu_time += cpu_time
+
+    def start(self, method: str) -> 'ActiveCall':
+        call = ActiveCall(method)
+        current_call.set(call)
+        with self._lock:
+            stats = self.methods.get(method)
+            if stats is None:
+                stats = self.methods[method] = MethodStats()
+            stats.in_flight += 1
+            self.active_calls[id(call)] = call
+        return call
+
+    def finish(self, call: 'ActiveCall' = None, exception: Exception = None):
+        """
+        Records finished call, by default the one started in current thread or task.
+        Calls that are already finished are ignored.
+        """
+        if call is None:
+            call = current_call.get()
+            if call is None:
+                return
+        if current_call.get() is call:
+            current_call.set(None)
+        duration = time.monotonic() - call.started
+        with self._lock:
+            if self.active_calls.pop(id(call), None) is None:
+                return
+            stats = self.methods[call.method]
+            stats.in_flight -= 1
+            stats.calls += 1
+            if exception is not None:
+                stats.errors += 1
+            stats.total_time += duration
+            if duration > stats.max_time:
+                stats.max_time = duration
+            stats.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+
+    def get_active_calls(self) -> list:
+        with self._lock:
+            return list(self.active_calls.values())
+
+    def get_pools_state(self) -> dict:
+        return {
+            name: {
+                'max_workers': pool._max_workers,
+                'threads': len(pool._threads),
+                'queued': pool._work_queue.qsize(),
+            }
+            for name, pool in self.pools.items()
+        }
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            methods = {method: stats.as_dict() for method, stats in self.methods.items()}
+            active_calls = [
+                {'method': call.method, 'age': now - call.started, 'thread_id': call.thread_id}
+                for call in self.active_calls.values()
+            ]
+            compression = {method: stats.as_dict() for method, stats in self.compression.items()}
+        return {
+            'methods': methods,
+            'active_calls': active_calls,
+            'pools': self.get_pools_state(),
+            'bulkheads': {name: bulkhead.state() for name, bulkhead in self.bulkheads.items()},
+            'compression': compression,
+        }
+
+    def reset(self):
+        with self._lock:
+            for method, old in self.methods.items():
+                stats = self.methods[method] = MethodStats()
+                stats.in_flight = old.in_flight
+            self.compression = {}
+
+
+registry = StatsRegistry()
@@ -0,0 +1,377 @@
+"""
+Lightweight tracing of server calls, enabled with::
+
+    GRPCSERVER = {
+        ...
+        'tracing': {
+            'sample_rate': 0.01,                                  # head sampling of calls without parent
+            'exporter': 'django_grpc.tracing.FileExporter',       # or dotted path to your exporter
+            'exporter_options': {'path': '/var/log/app/spans.jsonl'},
+            'batch_size': 512,
+            'flush_interval': 5.0,
+            'queue_size': 2048,
+        },
+    }
+
+W3C `traceparent` is extracted from invocation metadata, the RPC gets a server span and every database query
+executed while handling it gets a child span. Spans are exported in batches by a background thread as
+dicts shaped like OTLP/JSON spans. Calls that are not sampled only pay for the sampling decision.
+"""
+import inspect
+import json
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Optional
+
+import grpc
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from django_grpc.batcher import BackgroundBatcher
+from django_grpc.interceptors.base import BehaviorInterceptor, wrap_method_handler
+from django_grpc.signals import grpc_shutdown
+
+
+TRACEPARENT_HEADER = 'traceparent'
+SPAN_KIND_SERVER = 'SPAN_KIND_SERVER'
+SPAN_KIND_CLIENT = 'SPAN_KIND_CLIENT'
+
+current_span = ContextVar('current_span', default=None)
+
+
+def _generate_id(bits: int) -> str:
+    return '%0*x' % (bits // 4, random.getrandbits(bits))
+
+
+def parse_traceparent(value: str):
+    """
+    Returns (trace_id, parent span_id, sampled) or None if header is invalid
+    """
+    parts = value.strip().split('-')
+    if len(parts) < 4 or len(parts[0]) != 2 or parts[0] == 'ff':
+        return None
+    trace_id, span_id, flags = parts[1], parts[2], parts[3]
+    if len(trace_id) != 32 or len(span_id) != 16 or len(flags) != 2:
+        return None
+    if trace_id == '0' * 32 or span_id == '0' * 16:
+        return None
+    try:
+        int(trace_id, 16), int(span_id, 16)
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return trace_id, span_id, sampled
+
+
+class Span:
+    __slots__ = (
+        'trace_id', 'span_id', 'parent_span_id', 'name', 'kind',
+        'start_time', 'end_time', 'attributes', 'error',
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str = '', kind: str = SPAN_KIND_SERVER):
+        self.trace_id = trace_id
+        self.span_id = _generate_id(64)
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.kind = kind
+        self.start_time = time.time_ns()
+        self.end_time = None
+        self.attributes = {}
+        self.error = None
+
+    def end(self, error: BaseException = None):
+        self.end_time = time.time_ns()
+        if error is not None:
+            self.error = '%s: %s' % (error.__class__.__name__, error)
+
+    @property
+    def traceparent(self) -> str:
+        return '00-%s-%s-01' % (self.trace_id, self.span_id)
+
+    def to_dict(self) -> dict:
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_span_id,
+            'name': self.name,
+            'kind': self.kind,
+            'startTimeUnixNano': self.start_time,
+            'endTimeUnixNano': self.end_time,
+            'attributes': self.attributes,
+            'status': (
+                {'code': 'STATUS_CODE_ERROR', 'message': self.error} if self.error else {'code': 'STATUS_CODE_OK'}
+            ),
+        }
+
+
+class InMemoryExporter:
+    """
+    Keeps exported spans in a list, useful in tests
+    """
+
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans: list):
+        self.spans.extend(span.to_dict() for span in spans)
+
+    def shutdown(self):
+        pass
+
+
+class FileExporter:
+    """
+    Appends spans to a file in JSON lines format
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: list):
+        with open(self.path, 'a') as fp:
+            fp.writelines(json.dumps(span.to_dict()) + '\n' for span in spans)
+
+    def shutdown(self):
+        pass
+
+
+class BatchSpanProcessor(BackgroundBatcher):
+    """
+    Collects finished spans in a bounded queue and exports them from a background thread.
+    Spans are dropped when the queue is full, so tracing never blocks RPCs.
+    """
+    name = 'grpc-tracing'
+
+    def __init__(self, exporter, batch_size: int = 512, flush_interval: float = 5.0, queue_size: int = 2048):
+        super().__init__(queue_size, batch_size, flush_interval)
+        self.exporter = exporter
+
+    def on_end(self, span: 'Span'):
+        self.append(span)
+
+    def process(self, spans: list):
+        self.exporter.export(spans)
+
+    def shutdown(self):
+        super().shutdown()
+        self.exporter.shutdown()
+
+
+class Tracer:
+    def __init__(self, processor: 'BatchSpanProcessor', sample_rate: float = 1.0):
+        self.processor = processor
+        self.sample_rate = sample_rate
+
+    def should_sample(self, parent) -> bool:
+        if parent is not None:
+            # Respect decision made by the caller
+            return parent[2]
+        return random.random() < self.sample_rate
+
+    def start_span(self, method: str, context) -> Optional['Span']:
+        """
+        Returns server span of the call or None if it is not sampled
+        """
+        parent = None
+        for key, value in context.invocation_metadata() or ():
+            if key == TRACEPARENT_HEADER:
+                parent = parse_traceparent(value)
+                break
+
+        if not self.should_sample(parent):
+            return None
+
+        span = Span(
+            method,
+            trace_id=parent[0] if parent else _generate_id(128),
+            parent_span_id=parent[1] if parent else '',
+        )
+        span.attributes['rpc.system'] = 'grpc'
+        return span
+
+    def end_span(self, span: 'Span', error: BaseException = None):
+        span.end(error)
+        self.processor.on_end(span)
+
+    @contextmanager
+    def trace_queries(self):
+        """
+        Installs query wrapper to connections of the current thread for the duration of the block
+        """
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self._query_wrapper))
+            yield
+
+    def wrap(self, behavior: Callable, method: str, streaming: bool = False) -> Callable:
+        """
+        Returns behavior that runs in a server span. Span and query wrappers live exactly as long as the behavior,
+        so they are removed and the span is ended even when a stream is closed early or cancelled.
+        Queries of async handlers are executed by other threads and are not traced.
+        """
+        if inspect.isasyncgenfunction(behavior):
+            @wraps(behavior)
+            async def async_stream(request, context):
+                span = self.start_span(method, context)
+                if span is None:
+                    async for response in behavior(request, context):
+                        yield response
+                    return
+                token = current_span.set(span)
+                error = None
+                try:
+                    async for response in behavior(request, context):
+                        yield response
+                except BaseException as exc:
+                    error = exc
+                    raise
+                finally:
+                    current_span.reset(token)
+                    self.end_span(span, error)
+
+            return async_stream
+
+        if inspect.iscoroutinefunction(behavior):
+            @wraps(behavior)
+            async def coroutine(request, context):
+                span = self.start_span(method, context)
+                if span is None:
+                    return await behavior(request, context)
+                token = current_span.set(span)
+                error = None
+                try:
+                    return await behavior(request, context)
+                except BaseException as exc:
+                    error = exc
+                    raise
+                finally:
+                    current_span.reset(token)
+                    self.end_span(span, error)
+
+            return coroutine
+
+        if streaming:
+            @wraps(behavior)
+            def stream(request, context):
+                span = self.start_span(method, context)
+                if span is None:
+                    yield from behavior(request, context)
+                    return
+                current_span.set(span)
+                error = None
+                try:
+                    with self.trace_queries():
+                        yield from behavior(request, context)
+                except BaseException as exc:
+                    # GeneratorExit when client went away
+                    error = exc
+                    raise
+                finally:
+                    # Not reset with token, abandoned generator can be closed by another thread
+                    current_span.set(None)
+                    self.end_span(span, error)
+
+            return stream
+
+        @wraps(behavior)
+        def unary(request, context):
+            span = self.start_span(method, context)
+            if span is None:
+                return behavior(request, context)
+            token = current_span.set(span)
+            error = None
+            try:
+                with self.trace_queries():
+                    return behavior(request, context)
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                current_span.reset(token)
+                self.end_span(span, error)
+
+        return unary
+
+    def _query_wrapper(self, execute, sql, params, many, context):
+        parent = current_span.get()
+        if parent is None:
+            return execute(sql, params, many, context)
+
+        span = Span('db.query', trace_id=parent.trace_id, parent_span_id=parent.span_id, kind=SPAN_KIND_CLIENT)
+        span.attributes['db.system'] = context['connection'].vendor
+        span.attributes['db.statement'] = sql
+        try:
+            result = execute(sql, params, many, context)
+        except Exception as exc:
+            span.end(exc)
+            self.processor.on_end(span)
+            raise
+        span.end()
+        self.processor.on_end(span)
+        return result
+
+    def shutdown(self, **kwargs):
+        self.processor.shutdown()
+
+
+class TracingInterceptor(BehaviorInterceptor):
+    def __init__(self, tracer: 'Tracer'):
+        self.tracer = tracer
+
+    def wrap(self, behavior, handler_call_details, method_handler):
+        return self.tracer.wrap(behavior, handler_call_details.method, method_handler.response_streaming)
+
+
+class AioTracingInterceptor(grpc.aio.ServerInterceptor):
+    """
+    Same as `TracingInterceptor` for asynchronous server, both sync and async handlers are traced
+    """
+
+    def __init__(self, tracer: 'Tracer'):
+        self.tracer = tracer
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method_handler = await continuation(handler_call_details)
+        if method_handler is None:
+            return None
+        method = handler_call_details.method
+        streaming = method_handler.response_streaming
+        return wrap_method_handler(method_handler, lambda behavior: self.tracer.wrap(behavior, method, streaming))
+
+
+tracer = None
+
+
+def setup_tracing(config: dict) -> 'Tracer':
+    """
+    Creates tracer from GRPCSERVER['tracing'] settings, calls are traced by `TracingInterceptor`
+    """
+    global tracer
+
+    exporter_class = import_string(config.get('exporter', 'django_grpc.tracing.InMemoryExporter'))
+    processor = BatchSpanProcessor(
+        exporter_class(**config.get('exporter_options', {})),
+        batch_size=config.get('batch_size', 512),
+        flush_interval=config.get('flush_interval', 5.0),
+        queue_size=config.get('queue_size', 2048),
+    )
+    if tracer is not None:
+        tracer.shutdown()
+    tracer = Tracer(processor, sample_rate=config.get('sample_rate', 1.0))
+
+    grpc_shutdown.connect(tracer.shutdown, weak=False, dispatch_uid='django_grpc.tracing')
+    return tracer
+
+
+def teardown_tracing():
+    global tracer
+
+    if tracer is None:
+        return
+    grpc_shutdown.disconnect(dispatch_uid='django_grpc.tracing')
+    tracer.shutdown()
+    tracer = None
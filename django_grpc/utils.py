@@ -6,6 +6,15 @@ import grpc
 from django.core.exceptions import ImproperlyConfigured
 
 from django.utils.module_loading import import_string
+from django_grpc import stats
+from django_grpc.bulkheads import load_bulkheads
+from django_grpc.credentials import create_server_credentials
+from django_grpc.tracing import AioTracingInterceptor, TracingInterceptor, setup_tracing
+from django_grpc.interceptors.accesslog import AccessLogInterceptor
+from django_grpc.interceptors.auth import AuthenticationInterceptor
+from django_grpc.interceptors.capture import CaptureInterceptor
+from django_grpc.interceptors.compression import CompressionInterceptor
+from django_grpc.interceptors.loadshedding import LoadSheddingInterceptor
 from django_grpc.signals.wrapper import SignalWrapper
 from django.conf import settings
 
@@ -16,7 +25,7 @@ logger = logging.getLogger(__name__)
 def create_server(max_workers, port, interceptors=None):
     config = getattr(settings, 'GRPCSERVER', dict())
     servicers_list = config.get('servicers', [])  # callbacks to add servicers to the server
-    interceptors = load_interceptors(config.get('interceptors', []))
+    interceptors = load_interceptors(config.get('interceptors', []), config)
     maximum_concurrent_rpcs = config.get('maximum_concurrent_rpcs', None)
     options = config.get('options', [])
     credentials = config.get('credentials', None)
@@ -25,20 +34,28 @@ def create_server(max_workers, port, interceptors=None):
 
     # create a gRPC server
     if is_async is True:
+        # Sync handlers are executed in this pool to keep event loop free
+        thread_pool = futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='grpc-sync')
         server = grpc.aio.server(
+            migration_thread_pool=thread_pool,
             interceptors=interceptors,
             maximum_concurrent_rpcs=maximum_concurrent_rpcs,
             options=options
         )
     else:
+        thread_pool = futures.ThreadPoolExecutor(max_workers=max_workers)
         server = grpc.server(
-            thread_pool=futures.ThreadPoolExecutor(max_workers=max_workers),
+            thread_pool=thread_pool,
             interceptors=interceptors,
             maximum_concurrent_rpcs=maximum_concurrent_rpcs,
             options=options
         )
 
-    add_servicers(server, servicers_list)
+    stats.registry.track_pool('default', thread_pool)
+    bulkheads = load_bulkheads(config.get('bulkheads', {}))
+    for bulkhead in bulkheads:
+        stats.registry.track_bulkhead(bulkhead)
+    add_servicers(server, servicers_list, bulkheads)
 
     if need_reflection:
         enable_reflection(server)
@@ -46,19 +63,9 @@ def create_server(max_workers, port, interceptors=None):
     if credentials is None:
         server.add_insecure_port('[::]:%s' % port)
     else:
-        credential_data = list()
-        for credential in credentials:
-            # read in key and certificate
-            with open(credential.get('private_key'), 'rb') as pp:
-                private_key = pp.read()
-            with open(credential.get('certificate_chain'), 'rb') as cp:
-                certificate_chain = cp.read()
-
-            credential_data.append((private_key, certificate_chain,))
-
-        # create server credentials
+        # Certificate files are re-read after rotation, no restart is needed
         logger.debug("Adding server credentials...")
-        server_credentials = grpc.ssl_server_credentials(credential_data)
+        server_credentials = create_server_credentials(credentials, config.get('credentials_check_interval', 5))
 
         # add secure port with credentials
         server.add_secure_port('[::]:%s' % port, server_credentials)
@@ -66,11 +73,11 @@ def create_server(max_workers, port, interceptors=None):
     return server
 
 
-def add_servicers(server, servicers_list: list[str]):
+def add_servicers(server, servicers_list: list[str], bulkheads: list = None):
     """
     Add servicers to the server
     """
-    ps = SignalWrapper(server)
+    ps = SignalWrapper(server, bulkheads)
     if len(servicers_list) == 0:
         logger.warning("No servicers configured. Did you add GRPSERVER['servicers'] list to settings?")
 
@@ -80,9 +87,9 @@ def add_servicers(server, servicers_list: list[str]):
         callback(ps)
 
 
-def load_interceptors(strings) -> list:
+def load_interceptors(strings, config=None) -> list:
     # Default interceptors
-    result = []
+    result = load_default_interceptors(config or dict())
     # User defined interceptors
     for path in strings:
         logger.debug("Initializing interceptor from %s", path)
@@ -90,8 +97,57 @@ def load_interceptors(strings) -> list:
     return result
 
 
+def load_default_interceptors(config: dict) -> list:
+    """
+    Built-in interceptors enabled in GRPCSERVER settings
+    """
+    result = []
+    access_log = config.get('access_log', None)
+    if access_log is not None:
+        if config.get('async', False):
+            raise ImproperlyConfigured("GRPCSERVER['access_log'] is supported only by synchronous server.")
+        # Goes first to measure time spent by other interceptors too
+        result.append(AccessLogInterceptor(**access_log))
+    tracing = config.get('tracing', None)
+    if tracing is not None:
+        tracer = setup_tracing(tracing)
+        # Span covers the rest of interceptors
+        result.append(AioTracingInterceptor(tracer) if config.get('async', False) else TracingInterceptor(tracer))
+    load_shedding = config.get('load_shedding', None)
+    if load_shedding is not None:
+        if config.get('async', False):
+            raise ImproperlyConfigured("GRPCSERVER['load_shedding'] is supported only by synchronous server.")
+        result.append(LoadSheddingInterceptor(**load_shedding))
+    authentication = config.get('authentication', None)
+    if authentication is not None:
+        if config.get('async', False):
+            raise ImproperlyConfigured("GRPCSERVER['authentication'] is supported only by synchronous server.")
+        result.append(AuthenticationInterceptor(**authentication))
+    compression = config.get('compression', None)
+    if compression is not None:
+        if config.get('async', False):
+            raise ImproperlyConfigured("GRPCSERVER['compression'] is supported only by synchronous server.")
+        result.append(CompressionInterceptor(**compression))
+    capture = config.get('capture', None)
+    if capture is not None:
+        if config.get('async', False):
+            raise ImproperlyConfigured("GRPCSERVER['capture'] is supported only by synchronous server.")
+        result.append(CaptureInterceptor(**capture))
+    return result
+
+
+def get_generic_handlers(server) -> list:
+    """
+    Returns generic RPC handlers added to synchronous server.
+
+    grpc has no public API to list them, so this reads private `server._state`.
+    Everything else goes through this function, so a grpc release that changes it breaks one place.
+    """
+    return server._state.generic_handlers
+
+
 def extract_handlers(server):
-    for handler in server._state.generic_handlers:
+    for handler in get_generic_handlers(server):
         for path, it in handler._method_handlers.items():
             unary = it.unary_unary
             if unary is None:
@@ -129,7 +185,7 @@ def enable_reflection(server):
 
     service_names = [
         handler.service_name()
-        for handler in server._state.generic_handlers
+        for handler in get_generic_handlers(server)
     ]
 
     service_names.append(reflection.SERVICE_NAME)
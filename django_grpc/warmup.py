@@ -0,0 +1,227 @@
+"""
+Warmup performed by `grpcserver` after the server is created and before it starts serving, enabled with::
+
+    GRPCSERVER = {
+        ...
+        'warmup': {
+            'connections': True,  # open database connections in every worker thread, requires CONN_MAX_AGE > 0
+            'hooks': [            # callables without arguments: prime caches, build serializer plans, etc.
+                'django_grpc.warmup.prime_models_meta',
+                'myapp.grpc.warmup',
+            ],
+            'requests': [         # canned requests replayed in-process, message or dotted path to its factory
+                ('/helloworld.Greeter/SayHello', 'myapp.grpc.warmup_hello_request'),
+            ],
+        },
+    }
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import grpc
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from django_grpc.stats import registry
+from django_grpc.utils import get_generic_handlers
+
+
+logger = logging.getLogger(__name__)
+
+
+class _HandlerCallDetails(
+    namedtuple('_HandlerCallDetails', ('method', 'invocation_metadata')),
+    grpc.HandlerCallDetails,
+):
+    pass
+
+
+class _WarmupContext(grpc.ServicerContext):
+    """
+    Context of canned request, there is no client, so nothing is sent anywhere
+    """
+
+    def __init__(self):
+        self._code = None
+        self._details = None
+        self._callbacks = []
+
+    def abort(self, code, details):
+        self._code, self._details = code, details
+        raise grpc.RpcError("Warmup request aborted with %s: %s" % (code, details))
+
+    def abort_with_status(self, status):
+        self.abort(status.code, status.details)
+
+    def set_code(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+    def set_details(self, details):
+        self._details = details
+
+    def details(self):
+        return self._details
+
+    def add_callback(self, callback):
+        self._callbacks.append(callback)
+        return True
+
+    def finish(self):
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def invocation_metadata(self):
+        return ()
+
+    def is_active(self):
+        return True
+
+    def time_remaining(self):
+        return None
+
+    def cancel(self):
+        pass
+
+    def peer(self):
+        return 'warmup'
+
+    def peer_identities(self):
+        return None
+
+    def peer_identity_key(self):
+        return None
+
+    def auth_context(self):
+        return {}
+
+    def send_initial_metadata(self, initial_metadata):
+        pass
+
+    def set_trailing_metadata(self, trailing_metadata):
+        pass
+
+    def set_compression(self, compression):
+        pass
+
+    def disable_next_message_compression(self):
+        pass
+
+
+def _is_persistent(connection) -> bool:
+    # close_old_connections() on grpc_request_started closes connections with CONN_MAX_AGE=0,
+    # connection opened in advance would be dropped by the first RPC of the thread
+    return connection.settings_dict['CONN_MAX_AGE'] != 0
+
+
+def _ensure_connections():
+    for connection in connections.all():
+        if _is_persistent(connection):
+            connection.ensure_connection()
+
+
+def warm_connections(pool, timeout: float = 10.0) -> int:
+    """
+    Opens database connections in every thread of ThreadPoolExecutor.
+    Tasks wait for each other, so each of them lands in a separate thread.
+    """
+    workers = pool._max_workers
+    barrier = threading.Barrier(workers, timeout=timeout)
+
+    def task():
+        _ensure_connections()
+        barrier.wait()
+
+    for future in [pool.submit(task) for _ in range(workers)]:
+        future.result()
+    return workers
+
+
+def prime_models_meta():
+    """
+    Builds field caches of all models that are otherwise populated by the first query
+    """
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta.concrete_fields
+        model._meta._forward_fields_map
+
+
+def find_method_handler(server, method: str) -> 'grpc.RpcMethodHandler':
+    details = _HandlerCallDetails(method, ())
+    for generic_handler in get_generic_handlers(server):
+        method_handler = generic_handler.service(details)
+        if method_handler is not None:
+            return method_handler
+    raise ImproperlyConfigured("Warmup request refers to unknown method %s" % method)
+
+
+def replay_request(server, method: str, request):
+    """
+    Calls method handler in the current thread, including (de)serialization of messages
+    """
+    if isinstance(request, str):
+        request = import_string(request)()
+    method_handler = find_method_handler(server, method)
+    if method_handler.request_deserializer is not None:
+        request = method_handler.request_deserializer(request.SerializeToString())
+
+    context = _WarmupContext()
+    try:
+        if method_handler.unary_unary is not None:
+            responses = [method_handler.unary_unary(request, context)]
+        elif method_handler.unary_stream is not None:
+            responses = list(method_handler.unary_stream(request, context))
+        else:
+            raise ImproperlyConfigured("Warmup supports only unary requests, %s is streaming" % method)
+    finally:
+        context.finish()
+
+    if method_handler.response_serializer is not None:
+        for response in responses:
+            method_handler.response_serializer(response)
+
+
+def run_warmup(server, config: dict):
+    """
+    Runs warmup steps configured in GRPCSERVER['warmup']. Failed requests are logged and do not stop the server.
+    """
+    started = time.monotonic()
+    if config.get('connections', False):
+        skipped = [connection.alias for connection in connections.all() if not _is_persistent(connection)]
+        if skipped:
+            logger.warning(
+                "Connections to %s are not opened in advance, they are closed by the first RPC with CONN_MAX_AGE=0",
+                ', '.join(skipped),
+            )
+        workers = warm_connections(registry.pools['default'])
+        logger.debug("Opened database connections in %s workers", workers)
+
+    for path in config.get('hooks', []):
+        logger.debug("Running warmup hook %s", path)
+        import_string(path)()
+
+    requests = config.get('requests', [])
+    if requests:
+        if isinstance(server, grpc.aio.Server):
+            raise ImproperlyConfigured("GRPCSERVER['warmup']['requests'] are supported only by synchronous server.")
+        for method, request in requests:
+            try:
+                replay_request(server, method, request)
+            except ImproperlyConfigured:
+                raise
+            except Exception:
+                logger.exception("Warmup request to %s failed", method)
+        # Canned requests must not skew the stats
+        registry.reset()
+        # Connections of the main thread are not used by workers
+        connections.close_all()
+
+    logger.info("Warmup completed in %.3fs", time.monotonic() - started)
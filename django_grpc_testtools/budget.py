@@ -0,0 +1,128 @@
+"""
+Performance budgets of RPCs in tests::
+
+    from django_grpc_testtools.budget import call_rpc
+
+    def test_list_books(db):
+        response = call_rpc(
+            LibraryServicer().ListBooks, ListBooksRequest(),
+            max_queries=2, max_time=0.1, max_response_size=64 * 1024,
+        )
+
+Method is called in the same process with `FakeServicerContext`, responses of streaming methods are collected
+into a list. Async methods are run to completion with `async_to_sync`, so queries of their `sync_to_async` calls
+are counted too. When `django_grpc_testtools.pytest_plugin` is enabled, calls are recorded for its report.
+"""
+import inspect
+import time
+from contextlib import ExitStack
+from typing import NamedTuple
+
+from asgiref.sync import async_to_sync
+from django.db import connections
+
+from django_grpc_testtools.context import FakeServicerContext
+
+
+class RpcMeasurement(NamedTuple):
+    method: str
+    queries: int
+    time: float
+    response_size: int
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+# List of measurements of the current test, set by pytest plugin. Calls are not recorded without the plugin
+collector = None
+
+
+class QueryCounter:
+    """
+    Counts queries with `execute_wrapper()`, so connection is not opened when RPC doesn't use database
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+def _message_size(message) -> int:
+    return message.ByteSize() if hasattr(message, 'ByteSize') else 0
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+async def _collect(stream) -> list:
+    return [message async for message in stream]
+
+
+def _method_name(method) -> str:
+    return getattr(method, '__qualname__', None) or repr(method)
+
+
+def call_rpc(
+    method,
+    request,
+    context: FakeServicerContext = None,
+    max_queries: int = None,
+    max_time: float = None,
+    max_response_size: int = None,
+    using: list = None,
+):
+    """
+    Calls servicer method and checks its budget, raises `BudgetExceeded` when it is overrun.
+
+    :param using: aliases of databases to count queries in, all by default
+    """
+    if context is None:
+        context = FakeServicerContext()
+    counter = QueryCounter()
+    aliases = using if using is not None else [connection.alias for connection in connections.all()]
+
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(counter))
+        started = time.perf_counter()
+        try:
+            response = method(request, context)
+            # Thread-sensitive `sync_to_async` calls run in this thread, where queries are counted
+            if inspect.isawaitable(response):
+                response = async_to_sync(_await)(response)
+            elif inspect.isasyncgen(response):
+                response = async_to_sync(_collect)(response)
+            elif inspect.isgenerator(response):
+                response = list(response)
+        finally:
+            duration = time.perf_counter() - started
+            context.finish()
+
+    if isinstance(response, list):
+        response_size = sum(_message_size(message) for message in response)
+    else:
+        response_size = _message_size(response)
+    measurement = RpcMeasurement(_method_name(method), len(counter.queries), duration, response_size)
+    if collector is not None:
+        collector.append(measurement)
+
+    errors = []
+    if max_queries is not None and measurement.queries > max_queries:
+        errors.append("%s queries executed, %s expected at most:\n%s" % (
+            measurement.queries, max_queries, '\n'.join(
+                '%s. %s' % (number, sql) for number, sql in enumerate(counter.queries, start=1)
+            ),
+        ))
+    if max_time is not None and measurement.time > max_time:
+        errors.append("took %.4fs, %.4fs expected at most" % (measurement.time, max_time))
+    if max_response_size is not None and measurement.response_size > max_response_size:
+        errors.append("response is %s bytes, %s expected at most" % (measurement.response_size, max_response_size))
+    if errors:
+        raise BudgetExceeded("%s exceeded its budget: %s" % (measurement.method, '; '.join(errors)))
+    return response
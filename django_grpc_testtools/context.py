@@ -1,5 +1,6 @@
+import time
 from datetime import datetime
-from typing import NoReturn
+from typing import NoReturn, Optional
 from grpc import RpcError, StatusCode
 from collections.abc import Sequence, Mapping
 from grpc import ServicerContext
@@ -20,11 +21,19 @@ class FakeServicerContext(ServicerContext):
     for validation in tests
     """
 
-    def __init__(self):
-        self.abort_status: StatusCode = StatusCode.UNKNOWN
+    def __init__(self, timeout: float = None, peer: str = "ipv4:127.0.0.1:50000"):
+        # Like in real context, code is None until RPC sets it
+        self.abort_status: Optional[StatusCode] = None
         self.abort_message: str = ""
         self._invocation_metadata: MetadataType = tuple()
         self._trailing_metadata: Mapping[str, str] = dict()
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        self._peer = peer
+        self._active = True
+        self._callbacks = []
+        self.initial_metadata: MetadataType = tuple()
+        self.compression = None
+        self.uncompressed_messages: int = 0
 
     def abort(self, status: StatusCode, message: str) -> NoReturn:
         """
@@ -88,7 +97,7 @@ class FakeServicerContext(ServicerContext):
         """
         self.abort_message = details
 
-    def code(self) -> StatusCode:
+    def code(self) -> Optional[StatusCode]:
         """Accesses the value to be used as status code upon RPC completion.
 
         Returns:
@@ -105,37 +114,60 @@ class FakeServicerContext(ServicerContext):
         return self.abort_message
 
     def peer(self):
-        raise NotImplementedError()
+        return self._peer
 
     def peer_identities(self):
-        raise NotImplementedError()
+        return None
 
     def peer_identity_key(self):
-        raise NotImplementedError()
+        return None
 
     def auth_context(self):
-        raise NotImplementedError()
+        return dict()
 
     def set_compression(self, compression):
-        raise NotImplementedError()
+        self.compression = compression
 
     def send_initial_metadata(self, initial_metadata):
-        raise NotImplementedError()
+        self.initial_metadata = initial_metadata
 
     def abort_with_status(self, status):
-        raise NotImplementedError()
+        self.set_trailing_metadata(status.trailing_metadata or ())
+        self.abort(status.code, status.details)
 
     def disable_next_message_compression(self):
-        raise NotImplementedError()
+        self.uncompressed_messages += 1
 
     def is_active(self):
-        raise NotImplementedError()
+        """
+        True until RPC is cancelled or finished with `.finish()`
+        """
+        return self._active
 
     def time_remaining(self):
-        raise NotImplementedError()
+        """
+        Seconds left until deadline set with `timeout` argument, None if there is no deadline
+        """
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
 
     def cancel(self):
-        raise NotImplementedError()
+        self.finish()
 
     def add_callback(self, callback):
-        raise NotImplementedError()
+        if not self._active:
+            return False
+        self._callbacks.append(callback)
+        return True
+
+    def finish(self):
+        """
+        Helper to emulate termination of RPC, calls callbacks registered with `.add_callback()`
+        """
+        if not self._active:
+            return
+        self._active = False
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,59 @@
+"""
+Pytest plugin that collects measurements of `django_grpc_testtools.budget.call_rpc()` across the suite.
+
+Enable it in ``conftest.py``::
+
+    pytest_plugins = ['django_grpc_testtools.pytest_plugin']
+
+and run ``pytest --grpc-budget-report=budget.json``. Report is a JSON object with tests as keys and their calls
+(method, queries, time, response_size) as values, keys are sorted so reports of two commits can be diffed.
+"""
+import json
+
+import pytest
+
+report_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('django-grpc')
+    group.addoption(
+        '--grpc-budget-report',
+        metavar='PATH',
+        default=None,
+        help='Write queries, time and response size of RPCs called with call_rpc() to JSON file',
+    )
+
+
+def pytest_configure(config):
+    config.stash[report_key] = {}
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    from django_grpc_testtools import budget
+
+    budget.collector = measurements = []
+    try:
+        yield
+    finally:
+        budget.collector = None
+    if measurements:
+        item.config.stash[report_key][item.nodeid] = [measurement._asdict() for measurement in measurements]
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption('grpc_budget_report')
+    report = session.config.stash.get(report_key, {})
+    if path is None:
+        return
+    with open(path, 'w') as fp:
+        json.dump(report, fp, indent=2, sort_keys=True)
+        fp.write('\n')
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    path = config.getoption('grpc_budget_report')
+    if path is not None:
+        calls = sum(len(it) for it in config.stash.get(report_key, {}).values())
+        terminalreporter.write_line('gRPC budget report of %s calls written to %s' % (calls, path))
@@ -32,6 +32,14 @@ def local_grpc_server():
     server.stop(True)
 
 
+@pytest.fixture
+def grpc_signals(db):
+    """
+    Database access for tests that send request signals: their receivers close old database connections,
+    which checks connection left open by a previous test
+    """
+
+
 @pytest.fixture(autouse=True)
 def clear_cache():
     """Clears django cache before and after test."""
@@ -1,7 +1,12 @@
+from collections import namedtuple
+
 import grpc
 
 from tests.sampleapp import helloworld_pb2_grpc, helloworld_pb2
 
+# Stand-in for grpc.HandlerCallDetails passed to interceptors
+HandlerCallDetails = namedtuple('HandlerCallDetails', ('method', 'invocation_metadata'))
+
 
 def call_hello_method(addr, name):
     with grpc.insecure_channel(addr) as channel:
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: library.proto
+# Protobuf Python Version: 5.29.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    29,
+    0,
+    '',
+    'library.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import field_mask_pb2 as google_dot_protobuf_dot_field__mask__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\rlibrary.proto\x12\x07library\x1a google/protobuf/field_mask.proto\"1\n\x06\x41uthor\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\"r\n\x04\x42ook\x12\n\n\x02id\x18\x01 \x01(\x03\x12\r\n\x05title\x18\x02 \x01(\t\x12\r\n\x05pages\x18\x03 \x01(\x05\x12\x1f\n\x06\x61uthor\x18\x04 \x01(\x0b\x32\x0f.library.Author\x12\x1f\n\x06\x65\x64itor\x18\x05 \x01(\x0b\x32\x0f.library.Author\"P\n\nAuthorCard\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x14\n\x0c\x64isplay_name\x18\x02 \x01(\t\x12 \n\x05\x62ooks\x18\x03 \x03(\x0b\x32\x11.library.BookCard\"\x19\n\x08\x42ookCard\x12\r\n\x05label\x18\x01 \x01(\t\"l\n\x08\x43\x61tegory\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x0c\n\x04name\x18\x02 \x01(\t\x12!\n\x06parent\x18\x03 \x01(\x0b\x32\x11.library.Category\x12#\n\x08\x63hildren\x18\x04 \x03(\x0b\x32\x11.library.Category\"C\n\x07\x42ookRow\x12\n\n\x02id\x18\x01 \x01(\x03\x12\r\n\x05title\x18\x02 \x01(\t\x12\r\n\x05pages\x18\x03 \x01(\x05\x12\x0e\n\x06\x61uthor\x18\x04 \x01(\x03\"?\n\x0bIngestReply\x12\x10\n\x08received\x18\x01 \x01(\x03\x12\r\n\x05saved\x18\x02 \x01(\x03\x12\x0f\n\x07\x62\x61tches\x18\x03 \x01(\x03\"X\n\x0f\x41uthorWithBooks\x12\n\n\x02id\x18\x01 \x01(\x03\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\r\n\x05\x65mail\x18\x03 \x01(\t\x12\x1c\n\x05\x62ooks\x18\x04 \x03(\x0b\x32\r.library.Book\"N\n\x10GetAuthorRequest\x12\n\n\x02id\x18\x01 \x01(\x03\x12.\n\nfield_mask\x18\x02 \x01(\x0b\x32\x1a.google.protobuf.FieldMask\")\n\tBookChunk\x12\x1c\n\x05items\x18\x01 \x03(\x0b\x32\r.library.Book\")\n\tFileChunk\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'library_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_AUTHOR']._serialized_start=60
+  _globals['_AUTHOR']._serialized_end=109
+  _globals['_BOOK']._serialized_start=111
+  _globals['_BOOK']._serialized_end=225
+  _globals['_AUTHORCARD']._serialized_start=227
+  _globals['_AUTHORCARD']._serialized_end=307
+  _globals['_BOOKCARD']._serialized_start=309
+  _globals['_BOOKCARD']._serialized_end=334
+  _globals['_CATEGORY']._serialized_start=336
+  _globals['_CATEGORY']._serialized_end=444
+  _globals['_BOOKROW']._serialized_start=446
+  _globals['_BOOKROW']._serialized_end=513
+  _globals['_INGESTREPLY']._serialized_start=515
+  _globals['_INGESTREPLY']._serialized_end=578
+  _globals['_AUTHORWITHBOOKS']._serialized_start=580
+  _globals['_AUTHORWITHBOOKS']._serialized_end=668
+  _globals['_GETAUTHORREQUEST']._serialized_start=670
+  _globals['_GETAUTHORREQUEST']._serialized_end=748
+  _globals['_BOOKCHUNK']._serialized_start=750
+  _globals['_BOOKCHUNK']._serialized_end=791
+  _globals['_FILECHUNK']._serialized_start=793
+  _globals['_FILECHUNK']._serialized_end=834
+# @@protoc_insertion_point(module_scope)
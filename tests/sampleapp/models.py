@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.db import models
+
+
+class Author(models.Model):
+    name = models.CharField(max_length=100)
+    email = models.CharField(max_length=100, blank=True)
+
+
+class Book(models.Model):
+    title = models.CharField(max_length=100)
+    pages = models.IntegerField(default=0)
+    author = models.ForeignKey(Author, related_name='books', on_delete=models.CASCADE)
+    editor = models.ForeignKey(Author, related_name='edited_books', null=True, on_delete=models.SET_NULL)
+    published_at = models.DateTimeField(null=True)
+
+
+class ApiToken(models.Model):
+    key = models.CharField(max_length=40, unique=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='api_tokens', on_delete=models.CASCADE)
+
+
+class Category(models.Model):
+    name = models.CharField(max_length=100)
+    parent = models.ForeignKey('self', related_name='children', null=True, on_delete=models.CASCADE)
@@ -7,3 +7,18 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
             raise ValueError("Emulated error")
 
         return helloworld_pb2.HelloReply(message='Hello, %s!' % request.name)
+
+
+class AsyncGreeter(helloworld_pb2_grpc.GreeterServicer):
+    """
+    Mix of async and sync handlers served by async server
+    """
+    async def SayHello(self, request, context):
+        if request.name == 'ValueError':
+            raise ValueError("Emulated error")
+
+        return helloworld_pb2.HelloReply(message='Hello, %s!' % request.name)
+
+    def SayHelloStreamReply(self, request, context):
+        for i in range(3):
+            yield helloworld_pb2.HelloReply(message='Hello, %s %s!' % (request.name, i))
@@ -1,7 +1,12 @@
 from tests.sampleapp import helloworld_pb2_grpc
-from tests.sampleapp.servicer import Greeter
+from tests.sampleapp.servicer import Greeter, AsyncGreeter
 
 
 def register_servicer(server):
     """ Callback for django_grpc """
     helloworld_pb2_grpc.add_GreeterServicer_to_server(Greeter(), server)
+
+
+def register_async_servicer(server):
+    """ Callback for django_grpc in async mode """
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(AsyncGreeter(), server)
@@ -25,6 +25,8 @@ CACHES = {
 
 ROOT_URLCONF = "tests.urls"
 
+DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
+
 SITE_ID = 1
 
 if django.VERSION >= (1, 10):
@@ -34,6 +36,8 @@ else:
 
 
 INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
     'django_grpc',
     'tests.sampleapp',
 ]
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import grpc
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc import tracing
+from django_grpc.aio import LoopLagMonitor, new_event_loop
+from django_grpc.utils import create_server
+from tests.sampleapp import helloworld_pb2, helloworld_pb2_grpc
+
+
+@pytest.fixture
+def async_settings(settings):
+    settings.GRPCSERVER = {
+        'servicers': ['tests.sampleapp.utils.register_async_servicer'],
+        'async': True,
+    }
+
+
+async def call_async_server(*names):
+    server = create_server(2, 50082)
+    await server.start()
+    try:
+        async with grpc.aio.insecure_channel("localhost:50082") as channel:
+            stub = helloworld_pb2_grpc.GreeterStub(channel)
+            unary = await stub.SayHello(helloworld_pb2.HelloRequest(name=names[0]))
+            stream = [it.message async for it in stub.SayHelloStreamReply(helloworld_pb2.HelloRequest(name=names[1]))]
+            return unary.message, stream
+    finally:
+        await server.stop(None)
+
+
+def test_tracing(async_settings, settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, tracing={'sample_rate': 1.0})
+    try:
+        asyncio.run(call_async_server("Async", "Sync"))
+        tracing.tracer.processor.force_flush()
+        spans = tracing.tracer.processor.exporter.spans
+    finally:
+        tracing.teardown_tracing()
+    # Both async and sync handlers
+    assert sorted(span['name'] for span in spans) == [
+        '/helloworld.Greeter/SayHello', '/helloworld.Greeter/SayHelloStreamReply',
+    ]
+
+
+def test_mixed_sync_and_async_handlers(async_settings, mocker):
+    threads = {}
+    started = mocker.patch(
+        "django_grpc.signals.grpc_request_started.send",
+        side_effect=lambda sender, request, context: threads.setdefault(request.name, threading.current_thread()),
+    )
+    finished = mocker.patch("django_grpc.signals.grpc_request_finished.send")
+
+    unary, stream = asyncio.run(call_async_server("Async", "Sync"))
+
+    assert unary == "Hello, Async!"
+    assert stream == ["Hello, Sync 0!", "Hello, Sync 1!", "Hello, Sync 2!"]
+    assert started.call_count == 2
+    assert finished.call_count == 2
+    # Async handler runs in the loop, sync one in the dedicated pool
+    assert threads["Async"] is threading.main_thread()
+    assert threads["Sync"].name.startswith("grpc-sync")
+
+
+def test_exception_signal_in_async_handler(async_settings, mocker):
+    exception_signal = mocker.patch("django_grpc.signals.grpc_got_request_exception.send")
+
+    with pytest.raises(grpc.aio.AioRpcError):
+        asyncio.run(call_async_server("ValueError", "Sync"))
+
+    assert exception_signal.call_count == 1
+    assert isinstance(exception_signal.call_args[1]['exception'], ValueError)
+
+
+def test_loop_lag_monitor():
+    monitor = LoopLagMonitor(interval=0.01, threshold=10)
+
+    async def block_loop():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0)
+        # Blocking call, e.g. sync ORM query in async handler
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+        task.cancel()
+
+    asyncio.run(block_loop())
+    assert monitor.max_lag >= 0.05
+
+
+def test_unknown_event_loop():
+    with pytest.raises(ImproperlyConfigured):
+        new_event_loop("trio")
@@ -0,0 +1,75 @@
+import threading
+import time
+
+from django_grpc.batcher import BackgroundBatcher
+
+
+class ListBatcher(BackgroundBatcher):
+    name = 'grpc-test-batcher'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.processed = []
+
+    def process(self, batch: list):
+        self.processed += batch
+
+
+def test_thread_is_started_once():
+    batcher = ListBatcher(flush_interval=60)
+    barrier = threading.Barrier(8)
+
+    def append(item):
+        barrier.wait()
+        batcher.append(item)
+
+    producers = [threading.Thread(target=append, args=(i,)) for i in range(8)]
+    for producer in producers:
+        producer.start()
+    for producer in producers:
+        producer.join()
+
+    assert sum(thread.name == batcher.name for thread in threading.enumerate()) == 1
+    batcher.shutdown()
+    assert sorted(batcher.processed) == list(range(8))
+
+
+def test_force_flush_waits_for_items_appended_during_iteration():
+    entered = threading.Event()
+    proceed = threading.Event()
+
+    class SlowBatcher(ListBatcher):
+        def _report_dropped(self):
+            # Iteration has processed the buffer, but hasn't finished yet
+            if not entered.is_set():
+                entered.set()
+                proceed.wait(5)
+
+    batcher = SlowBatcher(batch_size=1, flush_interval=60)
+    batcher.append('first')
+    entered.wait(5)
+    batcher.append('second')
+
+    flusher = threading.Thread(target=batcher.force_flush)
+    flusher.start()
+    time.sleep(0.1)
+    proceed.set()
+    flusher.join()
+    assert batcher.processed == ['first', 'second']
+    batcher.shutdown()
+
+
+def test_failed_batch_does_not_stop_thread():
+    class FailingBatcher(ListBatcher):
+        def process(self, batch: list):
+            if 'bad' in batch:
+                raise ValueError(batch)
+            super().process(batch)
+
+    batcher = FailingBatcher(batch_size=1, flush_interval=60)
+    batcher.append('bad')
+    batcher.force_flush()
+    batcher.append('good')
+    batcher.force_flush()
+    assert batcher.processed == ['good']
+    batcher.shutdown()
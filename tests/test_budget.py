@@ -0,0 +1,130 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from asgiref.sync import sync_to_async
+
+from django_grpc_testtools import budget
+from django_grpc_testtools.budget import BudgetExceeded, call_rpc
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp import helloworld_pb2
+from tests.sampleapp.models import Author
+from tests.sampleapp.servicer import AsyncGreeter, Greeter
+
+
+class AuthorGreeter(Greeter):
+    def SayHello(self, request, context):
+        names = ', '.join(author.name for author in Author.objects.order_by('name'))
+        for author in Author.objects.all():
+            author.books.count()
+        return helloworld_pb2.HelloReply(message=names)
+
+
+class AsyncAuthorGreeter(AsyncGreeter):
+    async def SayHello(self, request, context):
+        count = await sync_to_async(Author.objects.count)()
+        return helloworld_pb2.HelloReply(message='%s authors' % count)
+
+    async def SayHelloStreamReply(self, request, context):
+        async for author in Author.objects.order_by('name'):
+            yield helloworld_pb2.HelloReply(message=author.name)
+
+
+@pytest.fixture
+def measurements(monkeypatch):
+    measurements = []
+    monkeypatch.setattr(budget, 'collector', measurements)
+    return measurements
+
+
+def test_within_budget(measurements):
+    request = helloworld_pb2.HelloRequest(name='Budget')
+    response = call_rpc(Greeter().SayHello, request, max_queries=0, max_time=1, max_response_size=20)
+    assert response.message == 'Hello, Budget!'
+    assert measurements[-1].method == 'Greeter.SayHello'
+    assert measurements[-1].response_size == 16
+
+    responses = call_rpc(AsyncGreeter().SayHelloStreamReply, request, max_response_size=100)
+    assert len(responses) == 3
+    assert measurements[-1].response_size == sum(it.ByteSize() for it in responses)
+
+
+def test_queries_budget(db):
+    Author.objects.create(name='Tolkien')
+    Author.objects.create(name='Pratchett')
+    with pytest.raises(BudgetExceeded) as e:
+        call_rpc(AuthorGreeter().SayHello, helloworld_pb2.HelloRequest(), max_queries=2)
+    # Queries are listed to find N+1 quickly
+    assert '4 queries executed, 2 expected at most' in str(e.value)
+    assert 'sampleapp_book' in str(e.value)
+
+
+def test_async_methods(db, measurements):
+    Author.objects.create(name='Tolkien')
+    Author.objects.create(name='Pratchett')
+    response = call_rpc(AsyncAuthorGreeter().SayHello, helloworld_pb2.HelloRequest(), max_queries=1)
+    assert response.message == '2 authors'
+    assert measurements[-1].method == 'AsyncAuthorGreeter.SayHello'
+    assert measurements[-1].response_size == response.ByteSize()
+
+    responses = call_rpc(AsyncAuthorGreeter().SayHelloStreamReply, helloworld_pb2.HelloRequest())
+    assert [it.message for it in responses] == ['Pratchett', 'Tolkien']
+    assert measurements[-1].queries == 1
+
+    with pytest.raises(BudgetExceeded, match='1 queries executed, 0 expected at most'):
+        call_rpc(AsyncAuthorGreeter().SayHello, helloworld_pb2.HelloRequest(), max_queries=0)
+
+
+def test_calls_are_not_recorded_without_plugin():
+    assert budget.collector is None
+    call_rpc(Greeter().SayHello, helloworld_pb2.HelloRequest())
+    assert budget.collector is None
+
+
+def test_size_and_time_budget():
+    with pytest.raises(BudgetExceeded, match='response is 16 bytes, 10 expected at most'):
+        call_rpc(Greeter().SayHello, helloworld_pb2.HelloRequest(name='Budget'), max_response_size=10)
+    with pytest.raises(BudgetExceeded, match='took'):
+        call_rpc(Greeter().SayHello, helloworld_pb2.HelloRequest(name='Budget'), max_time=0)
+
+
+def test_context_is_finished():
+    context = FakeServicerContext()
+    called = []
+    context.add_callback(lambda: called.append(True))
+    call_rpc(Greeter().SayHello, helloworld_pb2.HelloRequest(), context)
+    assert called == [True]
+
+
+def test_pytest_plugin(tmp_path):
+    (tmp_path / 'test_sample.py').write_text(
+        'from django_grpc_testtools.budget import call_rpc\n'
+        'from tests.sampleapp.helloworld_pb2 import HelloRequest\n'
+        'from tests.sampleapp.servicer import Greeter\n\n\n'
+        'def test_hello():\n'
+        '    call_rpc(Greeter().SayHello, HelloRequest(name="a"))\n'
+        '    call_rpc(Greeter().SayHello, HelloRequest(name="bb"))\n\n\n'
+        'def test_nothing():\n'
+        '    pass\n'
+    )
+    report = tmp_path / 'budget.json'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([root, os.path.join(root, 'django_grpc')]))
+    result = subprocess.run(
+        [
+            sys.executable, '-m', 'pytest', '-q', '-p', 'django_grpc_testtools.pytest_plugin',
+            '--grpc-budget-report', str(report), str(tmp_path / 'test_sample.py'),
+        ],
+        cwd=str(tmp_path), env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert 'gRPC budget report of 2 calls' in result.stdout
+
+    data = json.loads(report.read_text())
+    [(test, calls)] = data.items()
+    assert test.endswith('test_sample.py::test_hello')
+    assert [(it['method'], it['queries'], it['response_size']) for it in calls] == [
+        ('Greeter.SayHello', 0, 11), ('Greeter.SayHello', 0, 12),
+    ]
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+
+import grpc
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.bulkheads import Bulkhead, find_bulkhead, load_bulkheads
+from django_grpc.stats import registry
+from django_grpc.utils import create_server
+from tests.helpers import call_hello_method
+from tests.sampleapp import helloworld_pb2, helloworld_pb2_grpc
+
+
+@pytest.fixture
+def bulkhead_server(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, bulkheads={
+        'hello': {'methods': ['/helloworld.Greeter/SayHello'], 'max_workers': 1},
+        'greeter': {'methods': ['/helloworld.Greeter/*'], 'max_workers': 2, 'max_queue': 2},
+    })
+    server = create_server(2, 50085)
+    server.start()
+    yield 'localhost:50085'
+    server.stop(True)
+
+
+def test_find_bulkhead():
+    bulkheads = load_bulkheads({
+        'reports': {'methods': ['/reports.Reports/*']},
+        'users': {'methods': ['/users.Users/Get*', '/users.Users/List*']},
+    })
+    assert find_bulkhead(bulkheads, '/reports.Reports/Generate').name == 'reports'
+    assert find_bulkhead(bulkheads, '/users.Users/ListUsers').name == 'users'
+    assert find_bulkhead(bulkheads, '/users.Users/DeleteUser') is None
+
+
+def test_invalid_size():
+    with pytest.raises(ImproperlyConfigured):
+        Bulkhead('empty', max_workers=0)
+
+
+def test_queue_bound():
+    bulkhead = Bulkhead('test', max_workers=1, max_queue=1, timeout=5)
+    assert bulkhead.acquire()
+
+    waiter_result = []
+    waiter = threading.Thread(target=lambda: waiter_result.append(bulkhead.acquire()))
+    waiter.start()
+    while bulkhead.queued == 0:
+        pass
+    # Queue is full
+    assert not bulkhead.acquire()
+
+    bulkhead.release()
+    waiter.join()
+    assert waiter_result == [True]
+    assert bulkhead.state() == {
+        'max_workers': 1, 'active': 1, 'max_queue': 1, 'queued': 0, 'rejected': 1, 'completed': 1,
+    }
+
+
+def test_queue_timeout():
+    bulkhead = Bulkhead('test', max_workers=1, max_queue=1, timeout=0.01)
+    assert bulkhead.acquire()
+    assert not bulkhead.acquire()
+    assert bulkhead.rejected == 1
+
+
+def test_async_queue():
+    bulkhead = Bulkhead('test', max_workers=1, max_queue=1, timeout=5)
+
+    async def main():
+        assert await bulkhead.acquire_async()
+        # Coroutine waits for the slot released by a sync call of another thread
+        waiter = asyncio.ensure_future(bulkhead.acquire_async())
+        while bulkhead.queued == 0:
+            await asyncio.sleep(0)
+        assert not await bulkhead.acquire_async()
+        threading.Thread(target=bulkhead.release).start()
+        assert await waiter
+
+        bulkhead.timeout = 0.01
+        assert not await bulkhead.acquire_async()
+
+    asyncio.run(main())
+    assert bulkhead.state() == {
+        'max_workers': 1, 'active': 1, 'max_queue': 1, 'queued': 0, 'rejected': 2, 'completed': 1,
+    }
+    assert bulkhead._waiters == []
+
+
+def test_dispatch(bulkhead_server):
+    bulkhead = registry.bulkheads['hello']
+    assert call_hello_method(bulkhead_server, "Bulkhead") == "Hello, Bulkhead!"
+    assert bulkhead.completed == 1
+
+    # Occupy the only slot
+    bulkhead.acquire()
+    try:
+        with pytest.raises(grpc.RpcError) as e:
+            call_hello_method(bulkhead_server, "Bulkhead")
+    finally:
+        bulkhead.release()
+    assert e.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+    assert e.value.details() == "Bulkhead 'hello' is full. Try again later."
+    assert registry.snapshot()['bulkheads']['hello']['rejected'] == 1
+
+
+def test_async_dispatch(settings):
+    settings.GRPCSERVER = {
+        'servicers': ['tests.sampleapp.utils.register_async_servicer'],
+        'async': True,
+        'bulkheads': {'hello': {'methods': ['/helloworld.Greeter/*'], 'max_workers': 1}},
+    }
+
+    async def main():
+        server = create_server(2, 50092)
+        await server.start()
+        bulkhead = registry.bulkheads['hello']
+        try:
+            async with grpc.aio.insecure_channel('localhost:50092') as channel:
+                stub = helloworld_pb2_grpc.GreeterStub(channel)
+                assert (await stub.SayHello(helloworld_pb2.HelloRequest(name='Async'))).message == 'Hello, Async!'
+                assert bulkhead.completed == 1
+
+                bulkhead.acquire()
+                try:
+                    with pytest.raises(grpc.aio.AioRpcError) as e:
+                        await stub.SayHello(helloworld_pb2.HelloRequest(name='Async'))
+                finally:
+                    bulkhead.release()
+                return e.value.code()
+        finally:
+            await server.stop(None)
+
+    assert asyncio.run(main()) == grpc.StatusCode.RESOURCE_EXHAUSTED
@@ -0,0 +1,161 @@
+import time
+from io import StringIO
+
+import grpc
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from django_grpc.interceptors.capture import (
+    UNARY_STREAM, UNARY_UNARY, CaptureRecord, CaptureWriter, read_capture,
+)
+from django_grpc.replay import Replayer, read_captures
+from django_grpc.signals import grpc_shutdown
+from django_grpc.utils import create_server
+from tests.sampleapp import helloworld_pb2, helloworld_pb2_grpc
+
+pytestmark = pytest.mark.usefixtures('grpc_signals')
+
+
+def hello(name):
+    return helloworld_pb2.HelloRequest(name=name).SerializeToString()
+
+
+@pytest.fixture
+def capture_server(settings, tmp_path):
+    path = str(tmp_path / 'capture-{pid}.bin')
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, capture={'path': path, 'sample_rate': 1})
+    server = create_server(2, 50090)
+    server.start()
+    yield 'localhost:50090'
+    server.stop(None)
+
+
+def test_file_format(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    records = [
+        CaptureRecord(100.0, UNARY_UNARY, '/helloworld.Greeter/SayHello', (('x-tenant', 'a'),), hello('a')),
+        CaptureRecord(100.5, UNARY_STREAM, '/helloworld.Greeter/SayHelloStreamReply', (('x-id-bin', b'\0'),), b''),
+    ]
+    writer = CaptureWriter(path)
+    writer._ensure_thread = lambda: None
+    writer.append(records[0])
+    writer.force_flush()
+    # Second writer appends to the file keeping its start time
+    writer = CaptureWriter(path)
+    writer._ensure_thread = lambda: None
+    writer.append(records[1])
+    writer.force_flush()
+
+    assert list(read_capture(path)) == records
+
+    # Partially written record is ignored
+    with open(path, 'ab') as fp:
+        fp.write(b'\0\0\1\0partial')
+    assert len(list(read_capture(path))) == 2
+
+
+def test_invalid_record_is_skipped(tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    writer = CaptureWriter(path, batch_size=1, flush_interval=60)
+    records = [
+        CaptureRecord(1.0, UNARY_UNARY, '/helloworld.Greeter/SayHello', (('x-large', 'a' * 70000),), b''),
+        CaptureRecord(2.0, UNARY_UNARY, '/helloworld.Greeter/SayHello', (), hello('a')),
+    ]
+    # Metadata value doesn't fit into the length prefix, the writer keeps working
+    for record in records:
+        writer.append(record)
+        writer.force_flush()
+    assert list(read_capture(path)) == records[1:]
+    assert writer.state()['written'] == 1
+    writer.shutdown()
+
+
+def test_merge_files(tmp_path):
+    paths = [str(tmp_path / 'first.bin'), str(tmp_path / 'second.bin')]
+    for path, times in zip(paths, ((1.0, 3.0), (2.0, 4.0))):
+        writer = CaptureWriter(path)
+        writer._ensure_thread = lambda: None
+        for it in times:
+            writer.append(CaptureRecord(it, UNARY_UNARY, '/helloworld.Greeter/SayHello', (), b''))
+        writer.force_flush()
+    assert [record.time for record in read_captures(paths)] == [1.0, 2.0, 3.0, 4.0]
+
+
+def test_capture_and_replay(capture_server, tmp_path):
+    with grpc.insecure_channel(capture_server) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        stub.SayHello(helloworld_pb2.HelloRequest(name='first'), metadata=[('x-tenant', 'a'), ('authorization', 's')])
+        with pytest.raises(grpc.RpcError):
+            stub.SayHello(helloworld_pb2.HelloRequest(name='ValueError'))
+    grpc_shutdown.send(None)
+
+    [path] = tmp_path.glob('capture-*.bin')
+    first, error = read_capture(str(path))
+    assert first.method == '/helloworld.Greeter/SayHello'
+    assert first.kind == UNARY_UNARY
+    # Sensitive and reserved metadata is not captured
+    assert first.metadata == (('x-tenant', 'a'),)
+    assert helloworld_pb2.HelloRequest.FromString(first.request).name == 'first'
+    assert 0 <= error.time - first.time < 5
+
+    with grpc.insecure_channel(capture_server) as channel:
+        report = Replayer(channel, speed=None, concurrency=2).replay(read_capture(str(path))).as_dict()
+    assert report['calls'] == 2
+    assert report['codes'] == {'OK': 1, 'UNKNOWN': 1}
+    assert report['methods']['/helloworld.Greeter/SayHello']['calls'] == 2
+    assert report['latency']['max'] >= report['latency']['p50'] > 0
+
+
+def test_replay_speed():
+    records = [CaptureRecord(it, UNARY_UNARY, '/a.B/C', (), b'') for it in (10.0, 10.2, 10.4)]
+    calls = []
+    replayer = Replayer(None, speed=2)
+    replayer.call = lambda record, report, scheduled: calls.append(record)
+    report = replayer.replay(records)
+    assert calls == records
+    # 0.4s of traffic at 2x speed
+    assert 0.2 <= report.duration < 0.4
+
+
+def test_replay_latency_includes_queueing():
+    records = [CaptureRecord(10.0, UNARY_UNARY, '/a.B/C', (), b'')] * 3
+
+    class SlowReplayer(Replayer):
+        def _get_callable(self, record):
+            return lambda request, metadata, timeout: time.sleep(0.1)
+
+    # Calls are scheduled at once, but the only slot runs them one after another
+    report = SlowReplayer(None, speed=1, concurrency=1).replay(records)
+    latencies = sorted(report.latencies['/a.B/C'])
+    assert latencies[0] >= 0.1 and latencies[-1] >= 0.3
+
+
+def test_replay_counts_client_errors():
+    class BrokenReplayer(Replayer):
+        def _get_callable(self, record):
+            raise ValueError("Invalid metadata")
+
+    report = BrokenReplayer(None, speed=None).replay([CaptureRecord(1.0, UNARY_UNARY, '/a.B/C', (), b'')])
+    assert report.as_dict()['codes'] == {'CLIENT_ERROR': 1}
+
+
+def test_command(capture_server, tmp_path):
+    path = str(tmp_path / 'capture.bin')
+    writer = CaptureWriter(path)
+    writer._ensure_thread = lambda: None
+    for name in ('a', 'b', 'c'):
+        writer.append(CaptureRecord(1.0, UNARY_UNARY, '/helloworld.Greeter/SayHello', (), hello(name)))
+    writer.force_flush()
+
+    out = StringIO()
+    call_command('grpcreplay', path, target=capture_server, speed=None, limit=2, stdout=out)
+    output = out.getvalue()
+    assert output.startswith('2 calls in')
+    assert 'Status codes: OK=2' in output
+    assert '/helloworld.Greeter/SayHello' in output
+
+    with open(path, 'wb') as fp:
+        fp.write(b'garbage')
+    with pytest.raises(CommandError):
+        call_command('grpcreplay', path, target=capture_server, stdout=out)
@@ -0,0 +1,115 @@
+import asyncio
+
+import grpc
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.channels import channels, aio_channels, get_channel, _after_fork, _reset_channels
+from django_grpc.signals import grpc_shutdown
+from tests.sampleapp import helloworld_pb2_grpc, helloworld_pb2
+
+
+@pytest.fixture
+def channels_settings(settings):
+    settings.GRPCCHANNELS = {
+        'default': {'target': 'localhost:50080'},
+        'pooled': {'target': 'localhost:50080', 'subchannels': 2},
+    }
+    yield settings.GRPCCHANNELS
+    channels.close_all()
+
+
+def test_channel_is_reused(channels_settings):
+    assert get_channel() is get_channel()
+    assert channels['default'] is get_channel('default')
+
+
+def test_subchannels_round_robin(channels_settings):
+    first, second, third = channels['pooled'], channels['pooled'], channels['pooled']
+    assert first is not second
+    assert first is third
+
+
+def test_unknown_alias(channels_settings):
+    with pytest.raises(ImproperlyConfigured):
+        channels['unknown']
+
+
+def test_call_through_registry(channels_settings, local_grpc_server):
+    stub = helloworld_pb2_grpc.GreeterStub(get_channel())
+    response = stub.SayHello(helloworld_pb2.HelloRequest(name='Channel'))
+    assert response.message == 'Hello, Channel!'
+
+
+def test_channels_closed_on_shutdown(channels_settings):
+    channel = get_channel()
+    grpc_shutdown.send(None)
+
+    with pytest.raises(ValueError):
+        # Closed channel refuses to start new calls
+        channel.unary_unary('/helloworld.Greeter/SayHello')(b'')
+    assert get_channel() is not channel
+
+
+def test_channels_forgotten_after_fork(channels_settings, mocker):
+    channel = get_channel()
+    close = mocker.patch.object(channel, 'close')
+
+    _after_fork()
+
+    assert get_channel() is not channel
+    close.assert_not_called()
+
+
+def test_aio_channels(channels_settings, local_grpc_server):
+    async def call():
+        channel = aio_channels['default']
+        assert isinstance(channel, grpc.aio.Channel)
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        response = await stub.SayHello(helloworld_pb2.HelloRequest(name='Async'))
+        await aio_channels.close_all()
+        return response.message
+
+    assert asyncio.run(call()) == 'Hello, Async!'
+
+
+def test_aio_channels_closed_on_settings_change(channels_settings):
+    async def change_settings():
+        channel = aio_channels['default']
+        _reset_channels(setting='GRPCCHANNELS')
+        assert aio_channels['default'] is not channel
+        await asyncio.sleep(0.1)
+        await aio_channels.close_all()
+        return channel
+
+    channel = asyncio.run(change_settings())
+    assert channel._channel.closed()
+    assert not aio_channels._closing
+
+
+def test_aio_channels_per_event_loop(channels_settings, local_grpc_server):
+    async def call():
+        channel = aio_channels['default']
+        assert aio_channels['default'] is channel
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        await stub.SayHello(helloworld_pb2.HelloRequest(name='Async'))
+        return channel
+
+    # Channel of the finished loop is not reused
+    first = asyncio.run(call())
+    second = asyncio.run(call())
+    assert second is not first
+    assert len(aio_channels._pools) == 1
+    aio_channels.discard_all()
+
+
+def test_aio_channels_closed_on_shutdown(channels_settings):
+    async def shutdown():
+        channel = aio_channels['default']
+        grpc_shutdown.send(None)
+        await asyncio.sleep(0.1)
+        assert channel._channel.closed()
+        assert aio_channels['default'] is not channel
+        await aio_channels.close_all()
+
+    asyncio.run(shutdown())
@@ -0,0 +1,90 @@
+import os
+import shutil
+import subprocess
+
+import grpc
+import pytest
+
+from django_grpc.credentials import CertificateReloader
+from django_grpc.utils import create_server
+from tests.sampleapp import helloworld_pb2, helloworld_pb2_grpc
+
+
+def generate_certificate(directory, name):
+    if shutil.which('openssl') is None:
+        pytest.skip("openssl is required to generate certificates")
+    key, chain = os.path.join(directory, name + '.key'), os.path.join(directory, name + '.pem')
+    subprocess.run([
+        'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-subj', '/CN=localhost', '-addext', 'subjectAltName=DNS:localhost',
+        '-keyout', key, '-out', chain,
+    ], check=True, capture_output=True)
+    return key, chain
+
+
+def rotate(source, target):
+    # Atomic replacement, like certificate managers do
+    shutil.copy(source, target + '.tmp')
+    os.replace(target + '.tmp', target)
+    stat = os.stat(target)
+    os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def say_hello(root_certificates):
+    credentials = grpc.ssl_channel_credentials(root_certificates=root_certificates)
+    with grpc.secure_channel('localhost:50087', credentials) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        return stub.SayHello(helloworld_pb2.HelloRequest(name='TLS'), timeout=5).message
+
+
+@pytest.fixture
+def certificates(tmp_path):
+    old_key, old_chain = generate_certificate(tmp_path, 'old')
+    new_key, new_chain = generate_certificate(tmp_path, 'new')
+    key, chain = str(tmp_path / 'server.key'), str(tmp_path / 'server.pem')
+    shutil.copy(old_key, key)
+    shutil.copy(old_chain, chain)
+    return {'private_key': key, 'certificate_chain': chain, 'new': (new_key, new_chain), 'old': old_chain}
+
+
+def test_fetch_only_after_change(certificates):
+    reloader = CertificateReloader([certificates], check_interval=0)
+    reloader.load()
+    assert reloader.fetch() is None
+
+    rotate(certificates['new'][0], certificates['private_key'])
+    rotate(certificates['new'][1], certificates['certificate_chain'])
+    assert reloader.fetch() is not None
+    assert reloader.fetch() is None
+
+
+def test_missing_files_keep_current_certificates(certificates):
+    reloader = CertificateReloader([certificates], check_interval=0)
+    reloader.load()
+    os.remove(certificates['private_key'])
+    assert reloader.fetch() is None
+
+
+def test_server_picks_up_rotated_certificates(settings, certificates):
+    settings.GRPCSERVER = dict(
+        settings.GRPCSERVER,
+        credentials=[{k: certificates[k] for k in ('private_key', 'certificate_chain')}],
+        credentials_check_interval=0,
+    )
+    server = create_server(1, 50087)
+    server.start()
+    try:
+        with open(certificates['old'], 'rb') as f:
+            old_root = f.read()
+        with open(certificates['new'][1], 'rb') as f:
+            new_root = f.read()
+        assert say_hello(old_root) == 'Hello, TLS!'
+
+        rotate(certificates['new'][0], certificates['private_key'])
+        rotate(certificates['new'][1], certificates['certificate_chain'])
+        # New handshakes use rotated certificate
+        assert say_hello(new_root) == 'Hello, TLS!'
+        with pytest.raises(grpc.RpcError):
+            say_hello(old_root)
+    finally:
+        server.stop(None)
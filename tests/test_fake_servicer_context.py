@@ -9,3 +9,19 @@ def test_fake_servicer_context():
     assert isinstance(context, ServicerContext)
     with pytest.raises(RpcError):
         context.abort(StatusCode.UNAVAILABLE, 'test')
+
+
+def test_deadline_and_callbacks():
+    context = FakeServicerContext(timeout=10)
+    assert 9 < context.time_remaining() <= 10
+    assert FakeServicerContext().time_remaining() is None
+
+    called = []
+    assert context.add_callback(lambda: called.append(1))
+    assert context.is_active()
+    context.cancel()
+    assert not context.is_active()
+    assert called == [1]
+    # Callbacks can't be added to terminated RPC
+    assert not context.add_callback(lambda: called.append(2))
+    assert called == [1]
@@ -0,0 +1,145 @@
+import asyncio
+import threading
+
+import grpc
+import pytest
+from django.core.cache import cache
+
+from django_grpc.helpers import concurrencylimit
+from django_grpc.helpers.concurrencylimit import CacheBackend, LocalBackend
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp import helloworld_pb2
+
+
+@pytest.mark.parametrize("backend", [LocalBackend(), CacheBackend(lease_ttl=10)])
+def test_acquire_and_release(backend, clear_cache):
+    first = backend.acquire("key", 2, 0)
+    second = backend.acquire("key", 2, 0)
+    assert first and second
+    assert backend.acquire("key", 2, 0) is None
+    # Other keys have own slots
+    assert backend.acquire("other", 2, 0)
+
+    backend.release("key", first)
+    assert backend.acquire("key", 2, 0)
+
+
+def test_local_backend_waits_for_slot():
+    backend = LocalBackend()
+    token = backend.acquire("key", 1, 0)
+    threading.Timer(0.1, backend.release, args=("key", token)).start()
+
+    assert backend.acquire("key", 1, 2) is not None
+
+
+def test_local_backend_forgets_idle_keys():
+    backend = LocalBackend()
+    backend.release("key", backend.acquire("key", 1, 0))
+    assert backend._slots == {}
+
+
+def test_cache_lease_expires(clear_cache):
+    backend = CacheBackend(lease_ttl=10)
+    backend.acquire("key", 1, 0)
+    # Emulate lease expiration of crashed process
+    cache.delete("key:0")
+
+    token = backend.acquire("key", 1, 0)
+    assert token is not None
+    backend.release("key", token)
+    assert cache.get("key:0") is None
+
+
+@pytest.mark.parametrize("backend", ["local", "cache"])
+def test_excess_calls_rejected(backend, clear_cache):
+    entered = threading.Event()
+    proceed = threading.Event()
+
+    class FakeGRPCServer:
+        @concurrencylimit(max_calls=1, keys=["metadata:tenant"], backend=backend)
+        def Foo(self, request, context):
+            entered.set()
+            proceed.wait(5)
+            return True
+
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest()
+    context = FakeServicerContext()
+    context.set_invocation_metadata((("tenant", "acme"),))
+    thread = threading.Thread(target=server.Foo, args=(request, context))
+    thread.start()
+    entered.wait(5)
+
+    rejected = FakeServicerContext()
+    rejected.set_invocation_metadata((("tenant", "acme"),))
+    with pytest.raises(Exception):
+        server.Foo(request, rejected)
+    assert rejected.abort_status == grpc.StatusCode.RESOURCE_EXHAUSTED
+    assert rejected.abort_message == "Reached limit of 1 concurrent calls. Try again later."
+
+    proceed.set()
+    thread.join()
+    assert server.Foo(request, context)
+
+
+def test_streaming_rpc_holds_slot_until_exhausted():
+    class FakeGRPCServer:
+        @concurrencylimit(max_calls=1)
+        def Foo(self, request, context):
+            yield 1
+            yield 2
+
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest()
+    stream = server.Foo(request, FakeServicerContext())
+    assert next(stream) == 1
+
+    with pytest.raises(Exception):
+        next(server.Foo(request, FakeServicerContext()))
+
+    assert list(stream) == [2]
+    assert list(server.Foo(request, FakeServicerContext())) == [1, 2]
+
+
+@pytest.mark.parametrize("backend", ["local", "cache"])
+def test_async_handler_holds_slot(backend, clear_cache):
+    class FakeGRPCServer:
+        @concurrencylimit(max_calls=1, backend=backend)
+        async def Foo(self, request, context):
+            await asyncio.sleep(0.1)
+            return True
+
+        @concurrencylimit(max_calls=1, backend=backend, timeout=1)
+        async def Wait(self, request, context):
+            await asyncio.sleep(0.1)
+            return True
+
+        @concurrencylimit(max_calls=1, backend=backend)
+        async def Stream(self, request, context):
+            yield 1
+            await asyncio.sleep(0.1)
+            yield 2
+
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest()
+
+    async def main():
+        first = asyncio.ensure_future(server.Foo(request, FakeServicerContext()))
+        await asyncio.sleep(0.01)
+        rejected = FakeServicerContext()
+        with pytest.raises(Exception):
+            await server.Foo(request, rejected)
+        assert rejected.abort_status == grpc.StatusCode.RESOURCE_EXHAUSTED
+        assert await first
+
+        # Waiting calls get the slot one after another
+        assert await asyncio.gather(*(server.Wait(request, FakeServicerContext()) for _ in range(2))) == [True, True]
+
+        stream = server.Stream(request, FakeServicerContext())
+        assert await stream.__anext__() == 1
+        with pytest.raises(Exception):
+            await server.Stream(request, FakeServicerContext()).__anext__()
+        assert [it async for it in stream] == [2]
+        assert [it async for it in server.Stream(request, FakeServicerContext())] == [1, 2]
+
+    asyncio.run(main())
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage, InMemoryStorage
+
+from django_grpc.helpers import ChunkedFile, save_upload, stream_file
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp.library_pb2 import FileChunk
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = FileSystemStorage(location=str(tmp_path))
+    storage.save('document.bin', ContentFile(CONTENT))
+    return storage
+
+
+def download(*args, **kwargs):
+    chunks = list(stream_file(*args, **kwargs))
+    assert all(isinstance(chunk, FileChunk) for chunk in chunks)
+    return chunks
+
+
+def test_local_file(storage):
+    chunks = download('document.bin', FileChunk, storage=storage, chunk_size=4096)
+    assert [chunk.offset for chunk in chunks] == [0, 4096, 8192]
+    assert b''.join(chunk.data for chunk in chunks) == CONTENT
+
+    # Django File and resume from offset
+    with open(os.path.join(storage.location, 'document.bin'), 'rb') as fp:
+        chunks = download(File(fp), FileChunk, offset=10000, chunk_size=4096)
+        assert not fp.closed
+    assert [chunk.offset for chunk in chunks] == [10000]
+    assert chunks[0].data == CONTENT[10000:]
+
+
+def test_remote_storage():
+    # Files of in-memory storage have no descriptor, so they are read
+    storage = InMemoryStorage()
+    storage.save('document.bin', ContentFile(CONTENT))
+    chunks = download('document.bin', FileChunk, storage=storage, offset=100, chunk_size=5000)
+    assert [chunk.offset for chunk in chunks] == [100, 5100, 10100]
+    assert b''.join(chunk.data for chunk in chunks) == CONTENT[100:]
+
+
+def test_binary_field_value():
+    chunks = download(memoryview(CONTENT), FileChunk, chunk_size=6000, offset_field=None)
+    assert [len(chunk.data) for chunk in chunks] == [6000, 4240]
+    assert chunks[1].offset == 0
+    assert download(b'', FileChunk) == []
+    assert download(CONTENT, FileChunk, offset=len(CONTENT)) == []
+    with pytest.raises(ValueError):
+        download(CONTENT, FileChunk, offset=-1)
+
+
+def test_cancelled_rpc(storage):
+    context = FakeServicerContext()
+    stream = stream_file('document.bin', FileChunk, context, storage=storage, chunk_size=1000)
+    next(stream)
+    context.cancel()
+    assert list(stream) == []
+
+
+def test_upload(storage):
+    chunks = [FileChunk(data=CONTENT[i:i + 1000]) for i in range(0, len(CONTENT), 1000)]
+    name = save_upload(iter(chunks), 'uploads/copy.bin', storage=storage)
+    assert name == 'uploads/copy.bin'
+    with storage.open(name) as fp:
+        assert fp.read() == CONTENT
+
+    # Name is not overwritten
+    assert save_upload(iter(chunks), 'uploads/copy.bin', storage=storage) != name
+
+
+def test_upload_limit(storage):
+    chunks = [FileChunk(data=CONTENT)] * 3
+    with pytest.raises(ValueError):
+        save_upload(iter(chunks), 'too-large.bin', storage=storage, max_size=len(CONTENT) * 2)
+    assert not storage.exists('too-large.bin')
+
+
+def test_failed_upload_keeps_concurrent_file(tmp_path):
+    class RacingStorage(FileSystemStorage):
+        def get_available_name(self, name, max_length=None):
+            name = super().get_available_name(name, max_length)
+            if name == 'up.bin' and not self.exists(name):
+                # Concurrent upload takes the name before this one creates the file
+                with open(self.path(name), 'wb') as fp:
+                    fp.write(b'other')
+            return name
+
+    storage = RacingStorage(location=str(tmp_path))
+    with pytest.raises(ValueError):
+        save_upload(iter([FileChunk(data=CONTENT)] * 3), 'up.bin', storage=storage, max_size=len(CONTENT) * 2)
+    assert os.listdir(str(tmp_path)) == ['up.bin']
+    with storage.open('up.bin') as fp:
+        assert fp.read() == b'other'
+
+
+def test_chunked_file_read():
+    file = ChunkedFile(iter([b'abc', b'def', b'g']), 'letters.txt')
+    assert file.read(4) == b'abcd'
+    assert file.tell() == 4
+    assert file.read() == b'efg'
+    assert file.size == 7
+
+    storage = InMemoryStorage()
+    name = storage.save('letters.txt', ChunkedFile(iter([b'abc', b'def'])))
+    with storage.open(name) as fp:
+        assert fp.read() == b'abcdef'
@@ -0,0 +1,157 @@
+import asyncio
+import threading
+
+import grpc
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.helpers import idempotent
+from django_grpc.interceptors.auth import Principal, _current_principal
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp import helloworld_pb2
+
+
+def make_context(key=None, peer='ipv4:127.0.0.1:50000'):
+    context = FakeServicerContext(peer=peer)
+    if key is not None:
+        context.set_invocation_metadata((('idempotency-key', key),))
+    return context
+
+
+class FakeGRPCServer:
+    def __init__(self):
+        self.calls = []
+        self.entered = threading.Event()
+        self.proceed = threading.Event()
+        self.proceed.set()
+
+    @idempotent()
+    def Charge(self, request, context):
+        self.calls.append(request.name)
+        self.entered.set()
+        self.proceed.wait(5)
+        if request.name == 'declined':
+            context.set_code(grpc.StatusCode.FAILED_PRECONDITION)
+        return helloworld_pb2.HelloReply(message='Charged %s #%s' % (request.name, len(self.calls)))
+
+    @idempotent(key='request:name', wait_timeout=0.1)
+    def Create(self, request, context):
+        self.calls.append(request.name)
+        self.entered.set()
+        self.proceed.wait(5)
+        return helloworld_pb2.HelloReply(message='Created %s' % request.name)
+
+
+def test_response_is_replayed():
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest(name='order')
+    first = server.Charge(request, make_context('key-1'))
+
+    context = make_context('key-1')
+    assert server.Charge(request, context) == first
+    assert context.get_trailing_metadata('idempotency-replayed') == 'true'
+    assert server.calls == ['order']
+
+    # Other keys and calls without a key are executed
+    assert server.Charge(request, make_context('key-2')).message == 'Charged order #2'
+    server.Charge(request, make_context())
+    server.Charge(request, make_context())
+    assert len(server.calls) == 4
+
+
+def test_failed_calls_are_not_stored():
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest(name='declined')
+    server.Charge(request, make_context('key'))
+    server.Charge(request, make_context('key'))
+    assert server.calls == ['declined', 'declined']
+
+    server.Create = idempotent()(lambda self, request, context: context.abort(grpc.StatusCode.INTERNAL, 'Failed'))
+    for _ in range(2):
+        with pytest.raises(grpc.RpcError):
+            server.Create(server, request, make_context('key'))
+
+
+def test_concurrent_duplicate_waits_for_first_call():
+    server = FakeGRPCServer()
+    server.proceed.clear()
+    request = helloworld_pb2.HelloRequest(name='order')
+    results = []
+    first = threading.Thread(target=lambda: results.append(server.Charge(request, make_context('key'))))
+    first.start()
+    server.entered.wait(5)
+
+    threading.Timer(0.2, server.proceed.set).start()
+    duplicate = server.Charge(request, make_context('key'))
+    first.join()
+    assert results == [duplicate]
+    assert server.calls == ['order']
+
+
+def test_duplicate_is_aborted_after_timeout():
+    server = FakeGRPCServer()
+    server.proceed.clear()
+    request = helloworld_pb2.HelloRequest(name='user')
+    first = threading.Thread(target=server.Create, args=(request, make_context()))
+    first.start()
+    server.entered.wait(5)
+
+    context = make_context()
+    with pytest.raises(grpc.RpcError):
+        server.Create(request, context)
+    assert context.abort_status == grpc.StatusCode.ABORTED
+    server.proceed.set()
+    first.join()
+
+
+def test_keys_are_scoped_by_client():
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest(name='order')
+    server.Charge(request, make_context('key'))
+    # Another connection of the same host
+    server.Charge(request, make_context('key', peer='ipv4:127.0.0.1:50001'))
+    assert server.calls == ['order']
+    server.Charge(request, make_context('key', peer='ipv4:10.0.0.2:50000'))
+    assert server.calls == ['order', 'order']
+
+    token = _current_principal.set(Principal(1))
+    try:
+        server.Charge(request, make_context('key'))
+        server.Charge(request, make_context('key', peer='ipv4:10.0.0.3:50000'))
+    finally:
+        _current_principal.reset(token)
+    assert server.calls == ['order', 'order', 'order']
+
+
+def test_async_handler():
+    calls = []
+
+    @idempotent(group='async')
+    async def Charge(self, request, context):
+        calls.append(request.name)
+        await asyncio.sleep(0.1)
+        return helloworld_pb2.HelloReply(message='Charged %s' % request.name)
+
+    async def main():
+        request = helloworld_pb2.HelloRequest(name='order')
+        contexts = [make_context('key') for _ in range(2)]
+        # Duplicate waits for the first call without blocking the loop
+        responses = await asyncio.gather(*(Charge(None, request, context) for context in contexts))
+        return responses, contexts[1]
+
+    responses, duplicate = asyncio.run(main())
+    assert responses[0] == responses[1]
+    assert calls == ['order']
+    assert duplicate.get_trailing_metadata('idempotency-replayed') == 'true'
+
+
+def test_streaming_is_not_supported():
+    with pytest.raises(ImproperlyConfigured):
+        @idempotent()
+        def Stream(self, request, context):
+            yield request
+
+    with pytest.raises(ImproperlyConfigured):
+        @idempotent()
+        async def AsyncStream(self, request, context):
+            yield request
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+
+import pytest
+
+from django_grpc.helpers import get_rpc_cache, rpc_memoize
+from django_grpc.signals import grpc_request_started, grpc_request_finished, grpc_got_request_exception
+from django_grpc_testtools.context import FakeServicerContext
+
+pytestmark = pytest.mark.usefixtures('grpc_signals')
+
+calls = []
+
+
+@rpc_memoize
+def load(value, scale=1):
+    calls.append(value)
+    return value * scale
+
+
+@rpc_memoize(key=lambda items: tuple(items))
+def load_many(items):
+    calls.append(items)
+    return sum(items)
+
+
+@rpc_memoize
+async def aload(value):
+    calls.append(value)
+    return value
+
+
+def start_rpc():
+    grpc_request_started.send(None, request=None, context=FakeServicerContext())
+
+
+def finish_rpc():
+    grpc_request_finished.send(None, request=None, context=FakeServicerContext())
+
+
+def test_cached_within_rpc():
+    calls.clear()
+    start_rpc()
+    assert load(2) == 2
+    assert load(2) == 2
+    assert load(2, scale=3) == 6
+    assert load(3) == 3
+    assert calls == [2, 2, 3]
+    finish_rpc()
+
+    assert get_rpc_cache() is None
+    load(2)
+    assert calls == [2, 2, 3, 2]
+
+
+def test_not_cached_outside_of_rpc():
+    calls.clear()
+    load(1)
+    load(1)
+    assert calls == [1, 1]
+
+
+def test_cache_is_cleared_on_exception():
+    start_rpc()
+    load(1)
+    grpc_got_request_exception.send(None, request=None, context=FakeServicerContext(), exception=ValueError())
+    assert get_rpc_cache() is None
+
+
+def test_custom_and_unhashable_keys():
+    calls.clear()
+    start_rpc()
+    load_many([1, 2])
+    load_many([1, 2])
+    # List is not hashable, so it is not cached without `key`
+    load([1], scale=2)
+    load([1], scale=2)
+    finish_rpc()
+    assert calls == [[1, 2], [1], [1]]
+
+
+def test_threads_have_own_cache():
+    calls.clear()
+    start_rpc()
+    load(5)
+
+    def worker():
+        start_rpc()
+        load(5)
+        finish_rpc()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    load(5)
+    finish_rpc()
+    assert calls == [5, 5]
+
+
+def test_async():
+    calls.clear()
+
+    async def rpc(value):
+        start_rpc()
+        result = [await aload(value), await aload(value)]
+        finish_rpc()
+        return result
+
+    async def main():
+        return await asyncio.gather(rpc(1), rpc(1))
+
+    assert asyncio.run(main()) == [[1, 1], [1, 1]]
+    # Tasks don't share cache
+    assert calls == [1, 1]
@@ -1,4 +1,9 @@
-from django_grpc.helpers.ratelimit import get_keys_values
+from unittest import mock
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.helpers.ratelimit import get_keys_values, KeysExtractor
 from tests.sampleapp import helloworld_pb2
 
 from django_grpc_testtools.context import FakeServicerContext
@@ -39,3 +44,23 @@ def test_get_metadata_value():
     values = get_keys_values(request, context, ["metadata:user-agent"])
 
     assert values == ["Python 3.7 client"]
+
+
+def test_unsupported_key():
+    # Ignored like it always was, unless strict
+    request = helloworld_pb2.HelloRequest(name="Aleksandr")
+    assert get_keys_values(request, FakeServicerContext(), ["header:user-agent", "request:name"]) == ["Aleksandr"]
+    with pytest.raises(ImproperlyConfigured):
+        KeysExtractor(["header:user-agent"], strict=True)
+
+
+def test_metadata_converted_once():
+    request = helloworld_pb2.HelloRequest()
+    context = FakeServicerContext()
+    context.set_invocation_metadata((("user-agent", "Python 3.7 client"), ("tenant", "acme")))
+    extract = KeysExtractor(["metadata:user-agent", "metadata:tenant", "request:name"])
+
+    with mock.patch.object(context, "invocation_metadata", wraps=context.invocation_metadata) as metadata:
+        assert extract(request, context) == ["Python 3.7 client", "acme", ""]
+
+    assert metadata.call_count == 1
@@ -0,0 +1,100 @@
+import threading
+from datetime import datetime
+
+import grpc
+import pytest
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from freezegun import freeze_time
+
+from django_grpc.helpers import ratelimit_policies
+from django_grpc.helpers.ratelimit import RateLimitPolicy, create_cache_key, get_policy
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp import helloworld_pb2
+
+
+@pytest.fixture
+def policies(settings):
+    settings.RATELIMIT_POLICIES = {
+        "per-user": {"max_calls": 2, "time_period": 10, "keys": ["metadata:user"]},
+        "per-tenant": {"max_calls": 3, "time_period": 10, "keys": ["metadata:tenant"]},
+        "global": {"max_calls": 100, "time_period": 60},
+    }
+
+
+def make_context(user, tenant):
+    context = FakeServicerContext()
+    context.set_invocation_metadata((("user", user), ("tenant", tenant)))
+    return context
+
+
+def test_cache_key_is_compatible():
+    request = helloworld_pb2.HelloRequest(name="Aleksandr")
+    policy = RateLimitPolicy(1, 10, "group1", ["request:name"])
+    assert policy.cache_key(request, FakeServicerContext(), 20) == create_cache_key("group1", ["Aleksandr"], 20)
+
+
+def test_unknown_policy(policies):
+    with pytest.raises(ImproperlyConfigured):
+        get_policy("per-ip")
+
+
+def test_hierarchical_quotas(policies, clear_cache, mocker):
+    class FakeGRPCServer:
+        @ratelimit_policies("per-user", "per-tenant", "global")
+        def Foo(self, request, context):
+            return True
+
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest()
+
+    with freeze_time(datetime.utcfromtimestamp(14)):
+        assert server.Foo(request, make_context("alice", "acme"))
+        # Started windows cost a single increment per policy
+        incr = mocker.spy(type(caches["default"]), "incr")
+        add = mocker.spy(type(caches["default"]), "add")
+        assert server.Foo(request, make_context("alice", "acme"))
+        assert incr.call_count == 3
+        assert add.call_count == 0
+
+        # Per-user quota is exhausted
+        context = make_context("alice", "acme")
+        with pytest.raises(Exception):
+            server.Foo(request, context)
+        assert context.abort_status == grpc.StatusCode.RESOURCE_EXHAUSTED
+        assert context.abort_message == ("Reached limit of 2 calls per 10 seconds. "
+                                         "Resource will be available in 6 seconds.")
+
+        # Rejected call was not counted against tenant, so another user gets the last tenant's call
+        assert server.Foo(request, make_context("bob", "acme"))
+        context = make_context("carol", "acme")
+        with pytest.raises(Exception):
+            server.Foo(request, context)
+        assert context.abort_message == ("Reached limit of 3 calls per 10 seconds. "
+                                         "Resource will be available in 6 seconds.")
+
+
+def test_concurrent_calls_do_not_exceed_limit(policies, clear_cache):
+    class FakeGRPCServer:
+        @ratelimit_policies("per-user")
+        def Foo(self, request, context):
+            return True
+
+    server = FakeGRPCServer()
+    request = helloworld_pb2.HelloRequest()
+    barrier = threading.Barrier(10)
+    passed = []
+
+    def call():
+        barrier.wait()
+        try:
+            passed.append(server.Foo(request, make_context("alice", "acme")))
+        except grpc.RpcError:
+            pass
+
+    threads = [threading.Thread(target=call) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(passed) == 2
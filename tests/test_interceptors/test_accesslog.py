@@ -0,0 +1,76 @@
+import json
+
+import grpc
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.interceptors.accesslog import AccessLogWriter, AccessRecord, AccessLogInterceptor
+from django_grpc.signals import grpc_shutdown
+from django_grpc.utils import create_server
+from tests.helpers import call_hello_method
+
+pytestmark = pytest.mark.usefixtures('grpc_signals')
+
+
+def read_records(path):
+    with open(path) as fp:
+        return [json.loads(line) for line in fp]
+
+
+def make_record(status='OK'):
+    return AccessRecord(1.0, '/helloworld.Greeter/SayHello', status, 0.01, 5, 10, 'ipv6:[::1]:1234')
+
+
+def test_writer_batches_records(tmp_path):
+    path = str(tmp_path / 'access.jsonl')
+    writer = AccessLogWriter(path, batch_size=2, flush_interval=60)
+    for _ in range(3):
+        writer.append(make_record())
+    writer.force_flush()
+    assert read_records(path) == [make_record()._asdict()] * 3
+    assert writer.state() == {'buffered': 0, 'written': 3, 'dropped': 0}
+    writer.shutdown()
+
+
+def test_records_are_dropped_when_buffer_is_full(tmp_path):
+    path = str(tmp_path / 'access.jsonl')
+    writer = AccessLogWriter(path, buffer_size=2, batch_size=100, flush_interval=60)
+    writer._ensure_thread = lambda: None
+    for _ in range(5):
+        writer.append(make_record())
+    assert writer.state() == {'buffered': 2, 'written': 0, 'dropped': 3}
+    writer.force_flush()
+    assert len(read_records(path)) == 2
+
+
+def test_sampling_per_status_code():
+    interceptor = AccessLogInterceptor(sample_rate=0, sample_rates={'INTERNAL': 1})
+    assert interceptor.should_log('INTERNAL')
+    assert not interceptor.should_log('OK')
+
+
+def test_server_writes_access_log(settings, tmp_path):
+    path = str(tmp_path / 'access.jsonl')
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, access_log={'path': path, 'flush_interval': 60})
+    server = create_server(1, 50089)
+    server.start()
+    try:
+        assert call_hello_method('localhost:50089', 'Logger') == 'Hello, Logger!'
+        with pytest.raises(grpc.RpcError):
+            call_hello_method('localhost:50089', 'ValueError')
+    finally:
+        server.stop(None)
+    grpc_shutdown.send(None)
+
+    ok, error = read_records(path)
+    assert (ok['method'], ok['status'], ok['request_size'], ok['response_size']) == (
+        '/helloworld.Greeter/SayHello', 'OK', 8, 16,
+    )
+    assert ok['duration'] > 0 and ok['peer']
+    assert error['status'] == 'UNKNOWN'
+
+
+def test_async_server_is_not_supported(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, access_log={}, **{'async': True})
+    with pytest.raises(ImproperlyConfigured):
+        create_server(1, 50089)
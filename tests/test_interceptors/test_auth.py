@@ -0,0 +1,173 @@
+import time
+
+import grpc
+import pytest
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_save
+
+from django_grpc.interceptors.auth import AuthenticationInterceptor, Principal, PrincipalCache, get_principal
+from django_grpc.utils import create_server
+from django_grpc_testtools.context import FakeServicerContext
+from tests.helpers import HandlerCallDetails
+from tests.sampleapp.models import ApiToken
+
+TOKEN_AUTHENTICATOR = {
+    'class': 'django_grpc.interceptors.auth.ModelTokenAuthenticator',
+    'model': 'sampleapp.ApiToken',
+}
+
+
+@pytest.fixture
+def token(db):
+    user = User.objects.create(username='reader')
+    return ApiToken.objects.create(key='secret-token', user=user)
+
+
+def call(interceptor, metadata=(), method='/helloworld.Greeter/SayHello', streaming=False):
+    if streaming:
+        handler = grpc.unary_stream_rpc_method_handler(lambda request, context: iter([get_principal()]))
+    else:
+        handler = grpc.unary_unary_rpc_method_handler(lambda request, context: get_principal())
+    handler = interceptor.intercept_service(lambda details: handler, HandlerCallDetails(method, metadata))
+    if streaming:
+        return list(handler.unary_stream(None, FakeServicerContext()))
+    return handler.unary_unary(None, FakeServicerContext())
+
+
+def test_token_is_verified_once(token, django_assert_num_queries):
+    interceptor = AuthenticationInterceptor([TOKEN_AUTHENTICATOR], required=True)
+    metadata = (('authorization', 'Bearer secret-token'),)
+    with django_assert_num_queries(1):
+        principal = call(interceptor, metadata)
+        assert call(interceptor, metadata) == principal
+    assert principal == Principal(token.user_id, 'reader', 'bearer')
+    assert call(interceptor, metadata, streaming=True) == [principal]
+    # Principal is not leaked out of the call
+    assert get_principal() is None
+
+
+def test_invalid_and_missing_credentials(token):
+    optional = AuthenticationInterceptor([TOKEN_AUTHENTICATOR])
+    assert call(optional) is None
+    with pytest.raises(grpc.RpcError):
+        call(optional, (('authorization', 'Bearer wrong'),))
+
+    required = AuthenticationInterceptor([TOKEN_AUTHENTICATOR], required=True, exempt_methods=['/grpc.health.v1.*'])
+    with pytest.raises(grpc.RpcError):
+        call(required)
+    assert call(required, method='/grpc.health.v1.Health/Check') is None
+
+
+def test_invalidation_on_model_changes(token, django_assert_num_queries):
+    interceptor = AuthenticationInterceptor([TOKEN_AUTHENTICATOR])
+    metadata = (('authorization', 'Bearer secret-token'),)
+    call(interceptor, metadata)
+
+    token.user.is_active = False
+    token.user.save()
+    with pytest.raises(grpc.RpcError):
+        call(interceptor, metadata)
+
+    token.user.is_active = True
+    token.user.save()
+    assert call(interceptor, metadata).username == 'reader'
+    token.delete()
+    with pytest.raises(grpc.RpcError):
+        call(interceptor, metadata)
+
+
+def test_cache_lru_and_ttl():
+    cache = PrincipalCache(max_size=2, ttl=60)
+    for user_id in (1, 2):
+        cache.set('key%s' % user_id, Principal(user_id))
+    # Recently used entry survives eviction
+    cache.get('key1')
+    cache.set('key3', Principal(3))
+    assert cache.get('key2') is None
+    assert cache.get('key1') == Principal(1)
+
+    cache.set('short', Principal(4), ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get('short') is None
+    # Expired tokens are not cached
+    cache.set('expired', Principal(5), ttl=-1)
+    assert cache.get('expired') is None
+
+
+def test_shared_cache():
+    first = PrincipalCache(ttl=60, shared_cache='default')
+    second = PrincipalCache(ttl=60, shared_cache='default')
+    first.set('key', Principal(1, 'reader'))
+    assert second.get('key') == Principal(1, 'reader')
+
+    second.clear()
+    first.invalidate_user(1)
+    assert second.get('key') is None
+
+
+def test_shared_invalidation_drops_local_entries():
+    first = PrincipalCache(ttl=60, shared_cache='default')
+    second = PrincipalCache(ttl=60, shared_cache='default')
+    first.set('key', Principal(1, 'reader'))
+    first.set('other', Principal(2, 'writer'))
+    # Both processes have the entries locally
+    assert second.get('key') == Principal(1, 'reader')
+    assert second.get('other') == Principal(2, 'writer')
+
+    first.invalidate_user(1)
+    assert second.get('key') is None
+    assert second.get('other') == Principal(2, 'writer')
+
+    # Credentials verified after the invalidation are cached again
+    second.set('key', Principal(1, 'reader'))
+    assert first.get('key') == Principal(1, 'reader')
+
+
+def test_shared_entry_expiration_is_kept_locally(monkeypatch):
+    clock = [time.time(), time.monotonic()]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[1])
+
+    def advance(seconds):
+        clock[0] += seconds
+        clock[1] += seconds
+
+    first = PrincipalCache(ttl=60, shared_cache='default')
+    second = PrincipalCache(ttl=60, shared_cache='default')
+    first.set('key', Principal(1, 'reader'))
+    advance(50)
+    assert second.get('key') == Principal(1, 'reader')
+
+    # Local copy expires with the shared entry instead of 60 seconds after it was read
+    caches['default'].clear()
+    advance(5)
+    assert second.get('key') == Principal(1, 'reader')
+    advance(6)
+    assert second.get('key') is None
+
+
+def test_receivers_are_connected_once(token):
+    interceptors = [AuthenticationInterceptor([TOKEN_AUTHENTICATOR]) for _ in range(3)]
+    assert [receiver[0][0] for receiver in post_save.receivers].count('django_grpc.auth.token') == 1
+
+    for interceptor in interceptors:
+        call(interceptor, [('authorization', 'Bearer secret-token')])
+    token.save()
+    assert all(not interceptor.cache._entries for interceptor in interceptors)
+
+
+def test_async_server_is_not_supported(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, authentication={'authenticators': []}, **{'async': True})
+    with pytest.raises(ImproperlyConfigured):
+        create_server(1, 50086)
+
+
+def test_jwt():
+    jwt = pytest.importorskip('jwt')
+    interceptor = AuthenticationInterceptor([{'class': 'django_grpc.interceptors.auth.JWTAuthenticator'}])
+    encoded = jwt.encode({'sub': '42', 'username': 'reader', 'exp': time.time() + 60}, settings.SECRET_KEY)
+    principal = call(interceptor, (('authorization', 'Bearer %s' % encoded),))
+    assert (principal.user_id, principal.username, principal.scheme) == ('42', 'reader', 'jwt')
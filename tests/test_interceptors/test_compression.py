@@ -0,0 +1,113 @@
+import grpc
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.interceptors.compression import CompressionInterceptor
+from django_grpc.stats import registry
+from django_grpc.utils import create_server
+from django_grpc_testtools.context import FakeServicerContext
+from tests.helpers import HandlerCallDetails
+from tests.sampleapp import helloworld_pb2, helloworld_pb2_grpc
+
+
+class CompressionContext(FakeServicerContext):
+    def __init__(self):
+        super().__init__()
+        self.compression = None
+        self.disabled = 0
+
+    def set_compression(self, compression):
+        self.compression = compression
+
+    def disable_next_message_compression(self):
+        self.disabled += 1
+
+
+def reply(size):
+    return helloworld_pb2.HelloReply(message='x' * size)
+
+
+def call(interceptor, method, responses, streaming=False):
+    context = CompressionContext()
+    if streaming:
+        handler = grpc.unary_stream_rpc_method_handler(lambda request, context: iter(responses))
+    else:
+        handler = grpc.unary_unary_rpc_method_handler(lambda request, context: responses[0])
+    handler = interceptor.intercept_service(lambda details: handler, HandlerCallDetails(method, ()))
+    if streaming:
+        list(handler.unary_stream(None, context))
+    else:
+        handler.unary_unary(None, context)
+    return context
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_policy_per_method():
+    interceptor = CompressionInterceptor(
+        methods={'/library.Library/List*': {'algorithm': 'gzip', 'min_size': 100}, '/library.Library/Get': {}},
+        default={'algorithm': 'deflate', 'min_size': 1000},
+    )
+    assert interceptor.find_policy('/library.Library/ListBooks').min_size == 100
+    assert interceptor.find_policy('/library.Library/Get').min_size == 0
+    assert interceptor.find_policy('/helloworld.Greeter/SayHello').algorithm == 'deflate'
+
+    with pytest.raises(ImproperlyConfigured):
+        CompressionInterceptor(methods={'*': {'algorithm': 'brotli'}})
+
+
+def test_unary_threshold():
+    interceptor = CompressionInterceptor(methods={'*': {'algorithm': 'gzip', 'min_size': 100}}, sample_rate=1)
+    context = call(interceptor, '/library.Library/ListBooks', [reply(1000)])
+    assert context.compression == grpc.Compression.Gzip
+
+    context = call(interceptor, '/library.Library/ListBooks', [reply(10)])
+    assert context.compression is None
+    assert context.disabled == 1
+
+    stats = registry.snapshot()['compression']['/library.Library/ListBooks']
+    assert (stats['compressed'], stats['skipped'], stats['sampled']) == (1, 1, 1)
+    # Repeated characters compress well
+    assert stats['ratio'] < 0.1
+    assert stats['cpu_seconds_per_mb'] >= 0
+
+
+def test_streaming_skips_small_messages():
+    interceptor = CompressionInterceptor(methods={'*': {'algorithm': 'deflate', 'min_size': 100}}, sample_rate=0)
+    context = call(interceptor, '/library.Library/ListBooks', [reply(1000), reply(1), reply(2)], streaming=True)
+    assert context.compression == grpc.Compression.Deflate
+    assert context.disabled == 2
+    stats = registry.snapshot()['compression']['/library.Library/ListBooks']
+    assert (stats['compressed'], stats['skipped'], stats['ratio']) == (1, 2, None)
+
+
+def test_no_policy():
+    interceptor = CompressionInterceptor(methods={'/library.*': {'algorithm': 'gzip'}, '*': {'algorithm': 'none'}})
+    context = call(interceptor, '/helloworld.Greeter/SayHello', [reply(1000)])
+    assert context.compression is None
+    assert registry.snapshot()['compression'] == {}
+
+
+def test_compressed_responses_are_received(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, compression={'methods': {'*': {'min_size': 50}}})
+    server = create_server(1, 50088)
+    server.start()
+    try:
+        with grpc.insecure_channel('localhost:50088') as channel:
+            stub = helloworld_pb2_grpc.GreeterStub(channel)
+            assert stub.SayHello(helloworld_pb2.HelloRequest(name='a' * 100)).message == 'Hello, %s!' % ('a' * 100)
+            assert stub.SayHello(helloworld_pb2.HelloRequest(name='a')).message == 'Hello, a!'
+    finally:
+        server.stop(None)
+    assert registry.snapshot()['compression']['/helloworld.Greeter/SayHello']['skipped'] == 1
+
+
+def test_async_server_is_not_supported(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, compression={}, **{'async': True})
+    with pytest.raises(ImproperlyConfigured):
+        create_server(1, 50088)
@@ -0,0 +1,85 @@
+import grpc
+import pytest
+
+from django_grpc.utils import create_server
+from django_grpc.interceptors.loadshedding import LoadSheddingInterceptor, CoDelController, LatencyWindow
+from django_grpc_testtools.context import FakeServicerContext
+from tests.helpers import HandlerCallDetails, call_hello_method
+
+
+def intercept(interceptor, priority=None):
+    metadata = (('x-priority', priority),) if priority else ()
+    handler = interceptor.intercept_service(
+        lambda details: grpc.unary_unary_rpc_method_handler(lambda request, context: 'OK'),
+        HandlerCallDetails('/helloworld.Greeter/SayHello', metadata),
+    )
+    return handler.unary_unary
+
+
+def make_context(time_remaining=None):
+    context = FakeServicerContext()
+    context.time_remaining = lambda: time_remaining
+    return context
+
+
+def test_latency_window():
+    window = LatencyWindow(size=3)
+    assert window.p50 is None
+    for it in (5, 1, 3, 100):
+        window.add(it)
+    # Oldest sample was evicted
+    assert window.p50 == 3
+
+
+def test_codel_detects_standing_queue():
+    codel = CoDelController(target_delay=0.005, interval=0.1)
+    assert codel.observe(0.5, codel._interval_end - 0.05) is False
+    # Minimal delay over the interval was above target
+    assert codel.observe(0.01, codel._interval_end) is True
+    # Queue drained during next interval
+    assert codel.observe(0.001, codel._interval_end) is False
+
+
+def test_drop_when_deadline_is_too_short():
+    interceptor = LoadSheddingInterceptor()
+    interceptor._get_latency_window('/helloworld.Greeter/SayHello').add(1.0)
+    context = make_context(time_remaining=0.1)
+
+    with pytest.raises(Exception):
+        intercept(interceptor)(None, context)
+
+    assert context.abort_status == grpc.StatusCode.DEADLINE_EXCEEDED
+    assert interceptor.shed_deadline == 1
+    assert intercept(interceptor)(None, make_context(time_remaining=5)) == 'OK'
+    assert intercept(interceptor)(None, make_context()) == 'OK'
+
+
+def test_priorities_under_overload():
+    interceptor = LoadSheddingInterceptor(priorities={'interactive': 10, 'batch': 0})
+    interceptor.codel.observe(1, interceptor.codel._interval_end)
+    assert interceptor.codel.overloaded
+
+    batch = intercept(interceptor, 'batch')
+    interactive = intercept(interceptor, 'interactive')
+    context = make_context()
+    with pytest.raises(Exception):
+        batch(None, context)
+
+    assert context.abort_status == grpc.StatusCode.UNAVAILABLE
+    assert interactive(None, make_context()) == 'OK'
+
+
+def test_latency_recorded():
+    interceptor = LoadSheddingInterceptor()
+    intercept(interceptor)(None, make_context())
+    assert len(interceptor.latencies['/helloworld.Greeter/SayHello'].samples) == 1
+
+
+def test_enabled_in_settings(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, load_shedding={'target_delay': 0.01})
+    server = create_server(1, 50081)
+    server.start()
+    try:
+        assert call_hello_method("localhost:50081", "Shedding") == "Hello, Shedding!"
+    finally:
+        server.stop(True)
@@ -0,0 +1,84 @@
+import threading
+
+import grpc
+from google.protobuf import empty_pb2, struct_pb2
+
+from django_grpc.introspection import start_introspection_server, get_threads
+from django_grpc.signals import grpc_shutdown
+from django_grpc.stats import registry, MethodStats, StatsRegistry
+from tests.helpers import call_hello_method
+
+
+def call_introspection(addr, method):
+    with grpc.insecure_channel(addr) as channel:
+        rpc = channel.unary_unary(
+            '/django_grpc.Introspection/%s' % method,
+            request_serializer=empty_pb2.Empty.SerializeToString,
+            response_deserializer=struct_pb2.Struct.FromString,
+        )
+        return rpc(empty_pb2.Empty())
+
+
+def test_method_stats_percentiles():
+    stats = MethodStats()
+    local_registry = StatsRegistry()
+    local_registry.methods['/Foo'] = stats
+    for duration in (0.001, 0.002, 0.003, 0.2):
+        call = local_registry.start('/Foo')
+        call.started -= duration
+        local_registry.finish(call)
+
+    assert stats.calls == 4
+    assert stats.in_flight == 0
+    assert stats.percentile(0.5) == 0.0025
+    assert stats.percentile(0.99) == stats.max_time
+    # Finishing twice is ignored
+    local_registry.finish(call)
+    assert stats.calls == 4
+
+
+def test_stats_collected_by_wrapper(local_grpc_server):
+    registry.reset()
+    call_hello_method(local_grpc_server, "Stats")
+    try:
+        call_hello_method(local_grpc_server, "ValueError")
+    except grpc.RpcError:
+        pass
+
+    stats = registry.snapshot()
+    assert stats['methods']['/helloworld.Greeter/SayHello']['calls'] == 2
+    assert stats['methods']['/helloworld.Greeter/SayHello']['errors'] == 1
+    assert stats['methods']['/helloworld.Greeter/SayHello']['in_flight'] == 0
+    # Registered but never called methods are listed as well
+    assert stats['methods']['/helloworld.Greeter/SayHelloStreamReply']['calls'] == 0
+    assert stats['pools']['default']['max_workers'] == 1
+    assert stats['active_calls'] == []
+
+
+def test_active_call_is_visible_in_threads():
+    call = registry.start('/helloworld.Greeter/Slow')
+    try:
+        threads = get_threads()['threads']
+    finally:
+        registry.finish(call)
+
+    current = [it for it in threads if it['thread_id'] == threading.get_ident()][0]
+    assert current['method'] == '/helloworld.Greeter/Slow'
+    assert 'get_threads' in current['stack'][-1]
+
+
+def test_introspection_service(local_grpc_server):
+    start_introspection_server('localhost:50083')
+    try:
+        call_hello_method(local_grpc_server, "Stats")
+
+        stats = call_introspection('localhost:50083', 'GetStats')
+        assert stats['methods']['/helloworld.Greeter/SayHello']['calls'] >= 1
+        assert 'loop_lag' in stats
+
+        threads = call_introspection('localhost:50083', 'GetThreads')
+        assert any(it['name'] == threading.main_thread().name for it in threads['threads'])
+    finally:
+        grpc_shutdown.send(None)
+    # Receiver that stopped the server is disconnected
+    assert not any(str(key[0]).startswith('django_grpc.introspection') for key, *_ in grpc_shutdown.receivers)
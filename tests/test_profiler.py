@@ -0,0 +1,83 @@
+import sys
+import threading
+
+from django_grpc.profiler import SamplingProfiler, TRUNCATED, collapse_stack
+from django_grpc.stats import registry
+
+
+def busy_handler(started, release):
+    call = registry.start('/helloworld.Greeter/SayHello')
+    started.set()
+    release.wait(5)
+    registry.finish(call)
+
+
+def test_samples_are_attributed_to_method(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=busy_handler, args=(started, release))
+    thread.start()
+    started.wait(5)
+
+    profiler = SamplingProfiler(str(tmp_path))
+    try:
+        profiler.sample()
+        profiler.sample()
+    finally:
+        release.set()
+        thread.join()
+
+    path, = profiler.write()
+    assert path == str(tmp_path / 'helloworld.Greeter.SayHello.collapsed')
+    stack, count = open(path).read().splitlines()[0].rsplit(' ', 1)
+    assert count == '2'
+    assert 'busy_handler (%s);wait (%s)' % (__file__, threading.__file__) in stack
+    # Collected samples are flushed
+    assert profiler.samples == {}
+
+
+def test_idle_threads_are_not_sampled(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path))
+    profiler.sample()
+    assert profiler.samples == {}
+
+
+def test_memory_is_bounded(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), max_stacks=2)
+    for stack in ('a', 'b', 'c', 'd', 'a'):
+        profiler.add('/Foo', stack)
+    assert profiler.samples['/Foo'] == {'a': 2, 'b': 1, TRUNCATED: 2}
+
+
+def test_collapse_stack_depth():
+    def inner():
+        return collapse_stack(sys._getframe(), max_depth=2)
+
+    assert inner().split(';') == [
+        'test_collapse_stack_depth (%s)' % __file__,
+        'inner (%s)' % __file__,
+    ]
+
+
+def test_toggle(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001)
+    profiler.toggle()
+    assert profiler.is_running
+    assert profiler.stop() == []
+    assert not profiler.is_running
+
+
+def test_toggle_quickly(tmp_path):
+    profiler = SamplingProfiler(str(tmp_path), interval=0.001)
+    for _ in range(3):
+        profiler.toggle()
+    # Started, stopped in background and started again
+    assert profiler.is_running
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(profiler.stop())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [[]] * 5
+    assert not profiler.is_running
@@ -0,0 +1,62 @@
+import pytest
+from asgiref.sync import async_to_sync
+
+from django_grpc.serializers import aiter_serialized, aserialize_model, aserialize_queryset
+from django_grpc.serializers.aio import get_relation_lookups
+from tests.sampleapp import library_pb2
+from tests.sampleapp.models import Author, Book, Category
+
+
+@pytest.fixture
+def authors(db):
+    result = []
+    for i in range(3):
+        author = Author.objects.create(name="Author %s" % i)
+        Book.objects.create(title="Book %s" % i, pages=i, author=author, editor=author)
+        result.append(author)
+    return result
+
+
+def test_relation_lookups():
+    assert get_relation_lookups(library_pb2.AuthorWithBooks, Author) == ['books', 'books__author', 'books__editor']
+    assert get_relation_lookups(library_pb2.AuthorWithBooks, Author, ['name', 'books.title']) == ['books']
+
+
+def test_self_referential_relation_lookups():
+    assert get_relation_lookups(library_pb2.Category, Category) == ['parent', 'children']
+    # Deeper levels are followed as far as the mask goes
+    assert get_relation_lookups(library_pb2.Category, Category, ['parent.parent.name']) == ['parent', 'parent__parent']
+
+
+def test_aserialize_model(authors, django_assert_num_queries):
+    # Books, then editors of books; authors of books are set by the reverse relation prefetch
+    with django_assert_num_queries(2):
+        message = async_to_sync(aserialize_model)(library_pb2.AuthorWithBooks, authors[0])
+
+    author = library_pb2.Author(id=authors[0].id, name="Author 0")
+    assert message == library_pb2.AuthorWithBooks(
+        id=authors[0].id, name="Author 0",
+        books=[library_pb2.Book(id=authors[0].books.get().id, title="Book 0", author=author, editor=author)],
+    )
+
+
+def test_aserialize_queryset(authors, django_assert_num_queries):
+    with django_assert_num_queries(2):
+        messages = async_to_sync(aserialize_queryset)(
+            library_pb2.AuthorWithBooks, Author.objects.order_by('id'), field_mask=['name', 'books.title'],
+        )
+    assert messages == [
+        library_pb2.AuthorWithBooks(name="Author %s" % i, books=[library_pb2.Book(title="Book %s" % i)])
+        for i in range(3)
+    ]
+
+
+def test_aiter_serialized(authors, django_assert_num_queries):
+    async def collect():
+        queryset = Author.objects.order_by('id').prefetch_related('edited_books')
+        return [message async for message in aiter_serialized(library_pb2.Author, queryset, chunk_size=2)]
+
+    # Authors are read from one cursor, edited books are prefetched for each of two chunks
+    with django_assert_num_queries(3):
+        messages = async_to_sync(collect)()
+    assert [message.name for message in messages] == ["Author 0", "Author 1", "Author 2"]
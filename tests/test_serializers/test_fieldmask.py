@@ -0,0 +1,121 @@
+import pytest
+from django.db.models import Prefetch
+from google.protobuf.field_mask_pb2 import FieldMask
+
+from django_grpc.serializers import apply_field_mask, get_field_mask, parse_field_mask, serialize_model
+from django_grpc.serializers.base import BaseModelSerializer
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp import library_pb2
+from tests.sampleapp.models import Author, Book, Category
+
+
+@pytest.fixture
+def author(db):
+    author = Author.objects.create(name="Leo Tolstoy", email="leo@example.com")
+    editor = Author.objects.create(name="Editor")
+    Book.objects.create(title="War and Peace", pages=1225, author=author, editor=editor)
+    Book.objects.create(title="Anna Karenina", pages=864, author=author)
+    return author
+
+
+@pytest.mark.parametrize('field_mask,expected', [
+    (FieldMask(paths=['title', 'author.name']), {'title': {}, 'author': {'name': {}}}),
+    ('title, author.name,author.email', {'title': {}, 'author': {'name': {}, 'email': {}}}),
+    (['author', 'author.name'], {'author': {}}),
+    (['author.name', 'author'], {'author': {}}),
+    (None, None),
+])
+def test_parse_field_mask(field_mask, expected):
+    assert parse_field_mask(field_mask) == expected
+
+
+def test_get_field_mask():
+    context = FakeServicerContext()
+    request = library_pb2.GetAuthorRequest(id=1, field_mask=FieldMask(paths=['name']))
+    assert get_field_mask(request, context) == {'name': {}}
+
+    context.set_invocation_metadata([('x-field-mask', 'books.title')])
+    assert get_field_mask(library_pb2.GetAuthorRequest(id=1), context) == {'books': {'title': {}}}
+    assert get_field_mask(library_pb2.Author(id=1), FakeServicerContext()) is None
+
+
+def test_serialize_model_with_mask(author, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        message = serialize_model(library_pb2.AuthorWithBooks, author, [], field_mask=['name'])
+    assert message == library_pb2.AuthorWithBooks(name="Leo Tolstoy")
+
+
+def test_apply_field_mask(author, django_assert_num_queries):
+    mask = ['name', 'books.title', 'books.editor.name']
+    queryset = apply_field_mask(
+        Author.objects.filter(id=author.id).prefetch_related('edited_books'), library_pb2.AuthorWithBooks, mask,
+    )
+
+    # Author, books with editors joined
+    with django_assert_num_queries(2) as captured:
+        instance, = queryset
+        message = serialize_model(library_pb2.AuthorWithBooks, instance, [], field_mask=mask)
+
+    assert 'email' not in captured.captured_queries[0]['sql']
+    assert 'pages' not in captured.captured_queries[1]['sql']
+    assert 'edited_books' not in str(queryset._prefetch_related_lookups)
+    assert message == library_pb2.AuthorWithBooks(
+        name="Leo Tolstoy",
+        books=[
+            library_pb2.Book(title="War and Peace", editor=library_pb2.Author(name="Editor")),
+            library_pb2.Book(title="Anna Karenina", editor=library_pb2.Author()),
+        ],
+    )
+
+
+class AuthorCardSerializer(BaseModelSerializer):
+    def get_display_name(self, instance):
+        return '%s <%s>' % (instance.name, instance.email) if instance.email else instance.name
+
+
+class BookCardSerializer(BaseModelSerializer):
+    def get_label(self, instance):
+        return '%s, %s pages' % (instance.title, instance.pages)
+
+
+def test_apply_field_mask_of_computed_fields(author, django_assert_num_queries):
+    mask = ['display_name', 'books.label']
+    queryset = apply_field_mask(Author.objects.filter(id=author.id), library_pb2.AuthorCard, mask)
+    serializers = [AuthorCardSerializer(Author), BookCardSerializer(Book)]
+    # Columns the methods read are loaded with rows, not queried for each of them
+    with django_assert_num_queries(2):
+        instance, = queryset
+        message = serialize_model(library_pb2.AuthorCard, instance, serializers, field_mask=mask)
+    assert message.display_name == "Leo Tolstoy <leo@example.com>"
+    assert [book.label for book in message.books] == ["War and Peace, 1225 pages", "Anna Karenina, 864 pages"]
+
+
+def test_apply_field_mask_keeps_masked_prefetch(author):
+    prefetch = Prefetch('books', queryset=Book.objects.order_by('title'))
+    queryset = apply_field_mask(Author.objects.prefetch_related(prefetch), library_pb2.AuthorWithBooks, ['books'])
+    assert queryset._prefetch_related_lookups == (prefetch,)
+
+
+def test_apply_field_mask_of_self_referential_relations(db, django_assert_num_queries):
+    root = Category.objects.create(name='Root')
+    Category.objects.create(name='Child', parent=root)
+
+    # Whole parent is loaded one level deep
+    queryset = apply_field_mask(Category.objects.order_by('id'), library_pb2.Category, ['name', 'parent'])
+    assert queryset.query.select_related == {'parent': {}}
+    with django_assert_num_queries(1):
+        assert [(it.name, it.parent and it.parent.name) for it in queryset] == [('Root', None), ('Child', 'Root')]
+
+    queryset = apply_field_mask(Category.objects.order_by('id'), library_pb2.Category, ['children'])
+    assert [lookup.prefetch_through for lookup in queryset._prefetch_related_lookups] == ['children']
+    with django_assert_num_queries(2):
+        assert [[child.name for child in it.children.all()] for it in queryset] == [['Child'], []]
+
+    # Deeper levels are followed as far as the mask goes
+    queryset = apply_field_mask(Category.objects.all(), library_pb2.Category, ['parent.parent.name'])
+    assert queryset.query.select_related == {'parent': {'parent': {}}}
+
+
+def test_apply_empty_mask():
+    queryset = Author.objects.all()
+    assert apply_field_mask(queryset, library_pb2.AuthorWithBooks, None) is queryset
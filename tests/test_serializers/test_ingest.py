@@ -0,0 +1,78 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_grpc.serializers import bulk_ingest, BulkIngest, IngestSummary
+from tests.sampleapp import library_pb2
+from tests.sampleapp.models import Author, Book
+
+
+@pytest.fixture
+def author(db):
+    return Author.objects.create(name="Leo Tolstoy")
+
+
+def rows(author, count):
+    for i in range(count):
+        yield library_pb2.BookRow(title="Book %s" % i, pages=i, author=author.id)
+
+
+def test_bulk_create_in_batches(author, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        summary = bulk_ingest(rows(author, 5), Book, batch_size=2)
+
+    assert summary == IngestSummary(received=5, saved=5, batches=3)
+    assert list(Book.objects.order_by('pages').values_list('title', 'pages', 'author_id')) == [
+        ("Book %s" % i, i, author.id) for i in range(5)
+    ]
+
+
+def test_summary_response(author):
+    response = bulk_ingest(rows(author, 3), Book, response_class=library_pb2.IngestReply)
+    assert response == library_pb2.IngestReply(received=3, saved=3, batches=1)
+
+
+def test_upsert(author):
+    book = Book.objects.create(title="Old title", pages=1, author=author)
+    messages = [
+        library_pb2.BookRow(id=book.id, title="New title", pages=2, author=author.id),
+        library_pb2.BookRow(title="Another", author=author.id),
+    ]
+
+    bulk_ingest(messages, Book, update_conflicts=True, unique_fields=['id'], update_fields=['title', 'pages'])
+
+    book.refresh_from_db()
+    assert (book.title, book.pages) == ("New title", 2)
+    assert Book.objects.count() == 2
+
+
+def test_bulk_update(author):
+    books = [Book.objects.create(title="Title %s" % i, author=author) for i in range(3)]
+    messages = [library_pb2.BookRow(id=it.id, pages=100) for it in books]
+
+    summary = bulk_ingest(messages, Book, mode='update', update_fields=['pages'], batch_size=2)
+
+    assert summary == IngestSummary(received=3, saved=3, batches=2)
+    assert set(Book.objects.values_list('pages', flat=True)) == {100}
+
+
+def test_field_mapping():
+    ingest = BulkIngest(Book)
+    instance = ingest.to_instance(library_pb2.BookRow(title="Title", author=7))
+    assert (instance.title, instance.author_id, instance.pk) == ("Title", 7, None)
+
+
+def test_zero_values_are_saved(author, monkeypatch):
+    monkeypatch.setattr(Book._meta.get_field('pages'), 'default', 10)
+    book = Book.objects.create(title="Title", pages=5, author=author)
+    # Proto3 doesn't tell zero from unset, the value client sent is written over the model default
+    bulk_ingest([library_pb2.BookRow(id=book.id, pages=0)], Book, mode='update', update_fields=['title', 'pages'])
+    book.refresh_from_db()
+    assert (book.title, book.pages) == ("", 0)
+
+    instance = BulkIngest(Book).to_instance(library_pb2.BookRow(pages=0))
+    assert (instance.pages, instance.pk, instance.author_id) == (0, None, None)
+
+
+def test_invalid_mode():
+    with pytest.raises(ImproperlyConfigured):
+        BulkIngest(Book, mode='delete')
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from django_grpc.serializers import apack_messages, aunpack_messages, pack_messages, unpack_messages
+from django_grpc.serializers.packing import get_max_message_length, DEFAULT_MAX_MESSAGE_LENGTH
+from tests.sampleapp import library_pb2
+
+
+def make_books(count, title_length=10):
+    return [library_pb2.Book(id=i + 1, title='x' * title_length, pages=i) for i in range(count)]
+
+
+def test_row_budget():
+    chunks = list(pack_messages(make_books(25), library_pb2.BookChunk, max_rows=10))
+    assert [len(chunk.items) for chunk in chunks] == [10, 10, 5]
+    assert list(unpack_messages(chunks)) == make_books(25)
+
+
+def test_byte_budget():
+    books = make_books(100, title_length=100)
+    max_bytes = 1000
+    chunks = list(pack_messages(books, library_pb2.BookChunk, max_bytes=max_bytes))
+    assert all(chunk.ByteSize() <= max_bytes for chunk in chunks)
+    # Budget is filled up to the last item that fits
+    assert chunks[0].ByteSize() + books[0].ByteSize() + 3 > max_bytes
+    assert list(unpack_messages(chunks)) == books
+
+
+def test_oversized_item_is_sent_alone():
+    books = make_books(1, title_length=10) + make_books(1, title_length=500) + make_books(1, title_length=10)
+    chunks = list(pack_messages(books, library_pb2.BookChunk, max_bytes=100))
+    assert [len(chunk.items) for chunk in chunks] == [1, 1, 1]
+
+
+def test_empty_stream():
+    assert list(pack_messages([], library_pb2.BookChunk)) == []
+
+
+def test_async_packing():
+    async def books():
+        for book in make_books(5):
+            yield book
+
+    async def roundtrip():
+        return [book async for book in aunpack_messages(apack_messages(books(), library_pb2.BookChunk, max_rows=2))]
+
+    assert asyncio.run(roundtrip()) == make_books(5)
+
+
+@pytest.mark.parametrize('options,expected', [
+    ([], DEFAULT_MAX_MESSAGE_LENGTH),
+    ([('grpc.max_send_message_length', 1024)], 1024),
+    ([('grpc.max_send_message_length', -1)], DEFAULT_MAX_MESSAGE_LENGTH),
+])
+def test_max_message_length(settings, options, expected):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, options=options)
+    assert get_max_message_length() == expected
@@ -0,0 +1,84 @@
+import datetime
+import itertools
+
+import pytest
+from django.utils import timezone
+
+from django_grpc.serializers import InvalidPageToken, KeysetPaginator, paginate
+from tests.sampleapp import library_pb2
+from tests.sampleapp.models import Author, Book
+
+
+@pytest.fixture
+def books(db):
+    author = Author.objects.create(name="Author")
+    # Duplicated page counts make primary key the tie breaker
+    return [
+        Book.objects.create(title="Book %s" % i, pages=100 * (i // 2), author=author)
+        for i in range(7)
+    ]
+
+
+def collect_pages(ordering, page_size):
+    titles = []
+    page_token = ''
+    while True:
+        page = paginate(Book.objects.all(), library_pb2.Book, ordering, page_token=page_token, page_size=page_size)
+        titles += [message.title for message in page.items]
+        if not page.next_page_token:
+            return titles
+        page_token = page.next_page_token
+
+
+def test_pages(books, django_assert_num_queries):
+    expected = [book.title for book in sorted(books, key=lambda it: (-it.pages, it.id))]
+    assert collect_pages(['-pages'], 3) == expected
+    assert collect_pages(['-pages'], 7) == expected
+
+    with django_assert_num_queries(1):
+        page = paginate(Book.objects.all(), library_pb2.Book, ['-pages'], page_size=2)
+    assert page.items[0] == library_pb2.Book(
+        id=books[6].id, title="Book 6", pages=300,
+        author=library_pb2.Author(id=books[6].author_id, name="Author"),
+    )
+
+
+def test_tampered_token(books):
+    page = paginate(Book.objects.all(), library_pb2.Book, ['pages'], page_size=2)
+    with pytest.raises(InvalidPageToken):
+        paginate(Book.objects.all(), library_pb2.Book, ['pages'], page_token=page.next_page_token + 'x')
+    with pytest.raises(InvalidPageToken):
+        paginate(Book.objects.all(), library_pb2.Book, ['title'], page_token=page.next_page_token)
+
+
+def test_max_page_size(books):
+    paginator = KeysetPaginator(Book.objects.all(), library_pb2.Book, ['id'], max_page_size=4)
+    assert len(paginator.page(page_size=100).items) == 4
+
+
+def test_iterator(books, django_assert_num_queries):
+    paginator = KeysetPaginator(Book.objects.all(), library_pb2.Book, ['title'])
+    # Two full chunks and the last one
+    with django_assert_num_queries(3):
+        titles = [message.title for message in paginator.iterator(chunk_size=3)]
+    assert titles == sorted(book.title for book in books)
+
+
+def test_microsecond_keys(db, django_assert_num_queries):
+    author = Author.objects.create(name="Author")
+    published_at = timezone.now().replace(microsecond=0)
+    # Every row is within the same millisecond
+    books = [
+        Book.objects.create(title="Book %s" % i, author=author, published_at=published_at + datetime.timedelta(
+            microseconds=7 - i,
+        ))
+        for i in range(7)
+    ]
+    expected = [book.title for book in reversed(books)]
+
+    paginator = KeysetPaginator(Book.objects.all(), library_pb2.Book, ['published_at'])
+    assert paginator.decode_token(paginator.encode_token([books[0].published_at, 1]))[0].endswith('.000007+00:00')
+    assert collect_pages(['published_at'], 2) == expected
+    with django_assert_num_queries(4):
+        titles = [message.title for message in itertools.islice(paginator.iterator(chunk_size=2), 10)]
+    assert titles == expected
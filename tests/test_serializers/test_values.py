@@ -0,0 +1,64 @@
+import pytest
+
+from django_grpc.serializers import serialize_values, get_values_serializer
+from tests.sampleapp import library_pb2
+from tests.sampleapp.models import Author, Book, Category
+
+
+@pytest.fixture
+def books(db):
+    author = Author.objects.create(name="Leo Tolstoy", email="leo@example.com")
+    editor = Author.objects.create(name="Editor")
+    return [
+        Book.objects.create(title="War and Peace", pages=1225, author=author, editor=editor),
+        Book.objects.create(title="Anna Karenina", pages=864, author=author),
+    ]
+
+
+def test_columns_from_descriptor():
+    serializer = get_values_serializer(library_pb2.Book, Book)
+    assert serializer.columns == [
+        'id', 'title', 'pages',
+        'author', 'author__id', 'author__name', 'author__email',
+        'editor', 'editor__id', 'editor__name', 'editor__email',
+    ]
+
+
+def test_serialize_values(books, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        result = serialize_values(library_pb2.Book, Book.objects.order_by('id'))
+
+    assert result == [
+        library_pb2.Book(
+            id=books[0].id, title="War and Peace", pages=1225,
+            author=library_pb2.Author(id=books[0].author_id, name="Leo Tolstoy", email="leo@example.com"),
+            editor=library_pb2.Author(id=books[0].editor_id, name="Editor"),
+        ),
+        library_pb2.Book(
+            id=books[1].id, title="Anna Karenina", pages=864,
+            author=library_pb2.Author(id=books[1].author_id, name="Leo Tolstoy", email="leo@example.com"),
+        ),
+    ]
+    assert not result[1].HasField('editor')
+
+
+def test_iterator(books):
+    serializer = get_values_serializer(library_pb2.Author, Author)
+    result = list(serializer.iterator(Author.objects.order_by('id'), chunk_size=1))
+    assert [it.name for it in result] == ["Leo Tolstoy", "Editor"]
+
+
+def test_self_referential_relation(db, django_assert_num_queries):
+    serializer = get_values_serializer(library_pb2.Category, Category)
+    # Parent is filled one level deep instead of recursing forever
+    assert serializer.columns == ['id', 'name', 'parent', 'parent__id', 'parent__name']
+
+    root = Category.objects.create(name="Books")
+    child = Category.objects.create(name="Novels", parent=root)
+    leaf = Category.objects.create(name="Classics", parent=child)
+    with django_assert_num_queries(1):
+        result = serialize_values(library_pb2.Category, Category.objects.order_by('id'))
+    assert result[2] == library_pb2.Category(
+        id=leaf.id, name="Classics", parent=library_pb2.Category(id=child.id, name="Novels"),
+    )
+    assert not result[0].HasField('parent')
@@ -0,0 +1,152 @@
+import asyncio
+
+import grpc
+import pytest
+from django.db import connection
+
+from django_grpc import tracing
+from django_grpc.utils import create_server
+from django_grpc_testtools.context import FakeServicerContext
+from tests.sampleapp import helloworld_pb2_grpc, helloworld_pb2
+from tests.sampleapp.models import Author
+
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+ADDR = 'localhost:50091'
+
+
+@pytest.fixture
+def tracer():
+    tracer = tracing.setup_tracing({'sample_rate': 1.0})
+    yield tracer
+    tracing.teardown_tracing()
+
+
+@pytest.fixture
+def traced_server(settings):
+    settings.GRPCSERVER = dict(settings.GRPCSERVER, tracing={'sample_rate': 1.0})
+    server = create_server(1, 50091)
+    server.start()
+    yield tracing.tracer
+    server.stop(True)
+    tracing.teardown_tracing()
+
+
+def call_with_metadata(addr, metadata):
+    with grpc.insecure_channel(addr) as channel:
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        return stub.SayHello(helloworld_pb2.HelloRequest(name="Trace"), metadata=metadata)
+
+
+@pytest.mark.parametrize('value,expected', [
+    ('00-%s-%s-01' % (TRACE_ID, PARENT_ID), (TRACE_ID, PARENT_ID, True)),
+    ('00-%s-%s-00' % (TRACE_ID, PARENT_ID), (TRACE_ID, PARENT_ID, False)),
+    ('00-%s-%s-01' % ('0' * 32, PARENT_ID), None),
+    ('ff-%s-%s-01' % (TRACE_ID, PARENT_ID), None),
+    ('00-%s-xyz-01' % TRACE_ID, None),
+    ('garbage', None),
+])
+def test_parse_traceparent(value, expected):
+    assert tracing.parse_traceparent(value) == expected
+
+
+def test_span_continues_remote_trace(traced_server):
+    tracer = traced_server
+    call_with_metadata(ADDR, [('traceparent', '00-%s-%s-01' % (TRACE_ID, PARENT_ID))])
+    tracer.processor.force_flush()
+
+    span, = tracer.processor.exporter.spans
+    assert span['traceId'] == TRACE_ID
+    assert span['parentSpanId'] == PARENT_ID
+    assert span['name'] == '/helloworld.Greeter/SayHello'
+    assert span['kind'] == tracing.SPAN_KIND_SERVER
+    assert span['status'] == {'code': 'STATUS_CODE_OK'}
+    assert span['endTimeUnixNano'] >= span['startTimeUnixNano']
+
+
+def test_not_sampled_parent_is_respected(traced_server):
+    tracer = traced_server
+    call_with_metadata(ADDR, [('traceparent', '00-%s-%s-00' % (TRACE_ID, PARENT_ID))])
+    tracer.processor.force_flush()
+    assert tracer.processor.exporter.spans == []
+
+
+def test_head_sampling(traced_server):
+    tracer = traced_server
+    tracer.sample_rate = 0.0
+    call_with_metadata(ADDR, [])
+    tracer.sample_rate = 1.0
+    call_with_metadata(ADDR, [])
+    tracer.processor.force_flush()
+
+    span, = tracer.processor.exporter.spans
+    assert len(span['traceId']) == 32
+    assert span['parentSpanId'] == ''
+
+
+def test_query_child_spans(tracer, db):
+    behavior = tracer.wrap(lambda request, context: Author.objects.filter(name="Nobody").exists(), '/test/Query')
+    behavior(None, FakeServicerContext())
+    # Queries outside of request are not traced
+    Author.objects.exists()
+    tracer.processor.force_flush()
+
+    query, server = tracer.processor.exporter.spans
+    assert query['name'] == 'db.query'
+    assert query['kind'] == tracing.SPAN_KIND_CLIENT
+    assert query['parentSpanId'] == server['spanId']
+    assert query['traceId'] == server['traceId']
+    assert 'sampleapp_author' in query['attributes']['db.statement']
+
+
+def test_closed_stream_ends_span(tracer, db):
+    def stream(request, context):
+        for _ in range(3):
+            Author.objects.exists()
+            yield request
+
+    wrappers = list(connection.execute_wrappers)
+    responses = tracer.wrap(stream, '/test/Stream', streaming=True)(None, FakeServicerContext())
+    next(responses)
+    assert len(connection.execute_wrappers) == len(wrappers) + 1
+
+    # Client went away, neither finished nor exception signal is sent
+    responses.close()
+    assert connection.execute_wrappers == wrappers
+    assert tracing.current_span.get() is None
+    tracer.processor.force_flush()
+    query, server = tracer.processor.exporter.spans
+    assert server['name'] == '/test/Stream'
+    assert server['status']['code'] == 'STATUS_CODE_ERROR'
+
+
+def test_async_handler(tracer):
+    async def handler(request, context):
+        return tracing.current_span.get().name
+
+    behavior = tracer.wrap(handler, '/test/Async')
+    assert asyncio.run(behavior(None, FakeServicerContext())) == '/test/Async'
+    tracer.processor.force_flush()
+    assert [span['name'] for span in tracer.processor.exporter.spans] == ['/test/Async']
+
+
+def test_batch_processor_drops_when_full():
+    exporter = tracing.InMemoryExporter()
+    processor = tracing.BatchSpanProcessor(exporter, batch_size=2, queue_size=2)
+    processor._ensure_thread = lambda: None
+    processor.on_end(tracing.Span('s', TRACE_ID))
+    processor.on_end(tracing.Span('s', TRACE_ID))
+    processor.on_end(tracing.Span('dropped', TRACE_ID))
+    assert processor.dropped == 1
+
+    processor.shutdown()
+    assert [span['name'] for span in exporter.spans] == ['s', 's']
+
+
+def test_file_exporter(tmp_path):
+    path = tmp_path / 'spans.jsonl'
+    exporter = tracing.FileExporter(str(path))
+    exporter.export([tracing.Span('a', TRACE_ID), tracing.Span('b', TRACE_ID)])
+    assert len(path.read_text().splitlines()) == 2
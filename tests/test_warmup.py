@@ -0,0 +1,75 @@
+import threading
+from concurrent import futures
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from django_grpc import warmup
+from django_grpc.stats import registry
+from django_grpc.utils import create_server
+from tests.sampleapp import helloworld_pb2
+
+
+def hello_request():
+    return helloworld_pb2.HelloRequest(name="Warmup")
+
+
+def test_warm_connections_uses_every_worker(mocker):
+    threads = set()
+    mocker.patch.object(warmup, '_ensure_connections', lambda: threads.add(threading.get_ident()))
+    pool = futures.ThreadPoolExecutor(max_workers=3)
+    try:
+        assert warmup.warm_connections(pool) == 3
+    finally:
+        pool.shutdown()
+    assert len(threads) == 3
+
+
+@pytest.fixture
+def server():
+    # Server is not started, but its port must be released
+    server = create_server(1, 50084)
+    yield server
+    server.stop(None)
+
+
+def test_run_warmup(mocker, db, server):
+    hook = mocker.patch('tests.test_warmup.hello_request', wraps=hello_request)
+    registry.reset()
+
+    warmup.run_warmup(server, {
+        'hooks': ['tests.test_warmup.hello_request'],
+        'requests': [
+            ('/helloworld.Greeter/SayHello', 'tests.test_warmup.hello_request'),
+            ('/helloworld.Greeter/SayHello', helloworld_pb2.HelloRequest(name='ValueError')),
+        ],
+    })
+
+    # Hook and request factory
+    assert hook.call_count == 2
+    # Replayed requests are not counted
+    assert registry.methods['/helloworld.Greeter/SayHello'].calls == 0
+
+
+def test_unknown_method(server):
+    with pytest.raises(ImproperlyConfigured):
+        warmup.run_warmup(server, {'requests': [('/helloworld.Greeter/Unknown', hello_request())]})
+
+
+def test_replay_request_runs_wrapped_handler(mocker, db, server):
+    spy = mocker.spy(registry, 'start')
+    warmup.replay_request(server, '/helloworld.Greeter/SayHello', hello_request())
+    spy.assert_called_once_with('/helloworld.Greeter/SayHello')
+
+
+def test_non_persistent_connections_are_skipped(mocker, caplog, server):
+    ensure_connection = mocker.patch.object(type(connections['default']), 'ensure_connection')
+    mocker.patch.dict(connections.settings['default'], CONN_MAX_AGE=0)
+    warmup.run_warmup(server, {'connections': True})
+    ensure_connection.assert_not_called()
+    assert 'CONN_MAX_AGE=0' in caplog.text
+
+    mocker.patch.dict(connections.settings['default'], CONN_MAX_AGE=60)
+    warmup.run_warmup(server, {'connections': True})
+    assert ensure_connection.called